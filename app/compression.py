@@ -0,0 +1,146 @@
+"""
+Response compression.
+
+`CompressionMiddleware` is pure ASGI, like the other middlewares here. It
+compresses text, JSON and JavaScript responses of at least
+COMPRESSION_MIN_BYTES. It uses Brotli when the client accepts it and the
+optional `brotli` package is installed, and gzip otherwise. Streaming
+responses are compressed chunk by chunk. Responses that already have a
+Content-Encoding, such as the precompressed page shells, pass through.
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml'
+)
+
+
+def accepted_encoding(headers: Headers) -> Optional[str]:
+    """'br', 'gzip' or None for a request's Accept-Encoding header"""
+    accepted = set()
+    for part in headers.get('accept-encoding', '').split(','):
+        name, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+class Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            # wbits=31 writes a gzip header and trailer
+            self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    compressor = Compressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+
+def _compressible(headers: MutableHeaders) -> bool:
+    if 'content-encoding' in headers:
+        return False
+    content_type = headers.get('content-type', '')
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] == 'HEAD':
+            await self.app(scope, receive, send)
+            return
+        encoding = accepted_encoding(Headers(scope=scope))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        # The start message is held back until the first body chunk shows whether to compress
+        pending_start = None
+        compressor: Optional[Compressor] = None
+
+        async def send_wrapper(message):
+            nonlocal pending_start, compressor
+            if message['type'] == 'http.response.start':
+                pending_start = message
+                return
+            if message['type'] != 'http.response.body':
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+            if pending_start is not None:
+                start, pending_start = pending_start, None
+                start['headers'] = list(start.get('headers', []))
+                headers = MutableHeaders(raw=start['headers'])
+                big_enough = more_body or len(body) >= self.minimum_size
+                if start['status'] not in (200, 201) or not big_enough or not _compressible(headers):
+                    await send(start)
+                    await send(message)
+                    return
+
+                compressor = Compressor(encoding)
+                headers['content-encoding'] = encoding
+                headers.add_vary_header('Accept-Encoding')
+                etag = headers.get('etag')
+                if etag and not etag.startswith('W/'):
+                    headers['etag'] = f"W/{etag}"
+                body = compressor.compress(body)
+                if more_body:
+                    del headers['content-length']
+                else:
+                    body += compressor.finish()
+                    headers['content-length'] = str(len(body))
+                await send(start)
+                await send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+                return
+
+            if compressor is None:
+                await send(message)
+                return
+            body = compressor.compress(body)
+            if not more_body:
+                body += compressor.finish()
+            await send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -10,6 +10,19 @@ class Settings(BaseSettings):
     # Database settings
     DATABASE_URL: str = "postgresql://dashboard_user:dashboard_pass@db:5432/dashboard_db"
 
+    # Connection pool, per process: every uvicorn worker and `python -m app.worker`
+    # holds up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = -1  # replace connections older than this; -1 never does
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # Postgres statement_timeout; 0 disables
+    # Behind PgBouncer in transaction mode: no prepared statements or startup
+    # options, and the timeout is set per transaction. DB_NULL_POOL opens a
+    # connection per checkout and leaves pooling to PgBouncer
+    DB_PGBOUNCER: bool = False
+    DB_NULL_POOL: bool = False
+
     # Security settings
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
@@ -23,6 +36,109 @@ class Settings(BaseSettings):
     FINNHUB_API_KEY: str = ""
     MARKETAUX_API_KEY: str = ""
 
+    # News providers to query, and their endpoints (overridable for local fakes)
+    NEWS_PROVIDERS: List[str] = ["yfinance", "alphavantage", "finnhub", "marketaux"]
+    ALPHAVANTAGE_URL: str = "https://www.alphavantage.co/query"
+    FINNHUB_URL: str = "https://finnhub.io/api/v1/company-news"
+    MARKETAUX_URL: str = "https://api.marketaux.com/v1/news/all"
+    ANTHROPIC_BASE_URL: str = ""  # empty uses the SDK default
+
+    # Refresh scheduling: 'priority' adapts per-ticker intervals, 'fixed' refreshes all every 4 hours
+    REFRESH_MODE: str = "priority"
+    REFRESH_TICK_MINUTES: int = 5
+    REFRESH_BUDGET_PER_HOUR: float = 60.0  # ticker refreshes per hour across all tickers
+    REFRESH_MIN_INTERVAL_MINUTES: float = 30.0
+    REFRESH_MAX_INTERVAL_MINUTES: float = 1440.0
+    REFRESH_VELOCITY_HOURS: int = 24
+
+    # Scheduler coordination: 'lease' runs each job in one process across all
+    # replicas, 'local' runs every job in every process, 'off' disables it
+    SCHEDULER_MODE: str = "lease"
+    SCHEDULER_SHARDS: int = 1  # news refresh jobs split by ticker id
+
+    # Job queue: with EMBEDDED_WORKER the API process also runs the scheduler
+    # and a worker thread; otherwise run `python -m app.worker` separately
+    EMBEDDED_WORKER: bool = True
+    WORKER_POLL_SECONDS: float = 2.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_TIMEOUT_MINUTES: int = 30  # running jobs older than this are requeued
+    JOB_RETENTION_DAYS: int = 7
+
+    # News provider circuit breakers
+    BREAKER_WINDOW: int = 20  # recent calls considered
+    BREAKER_MIN_CALLS: int = 5
+    BREAKER_FAILURE_RATE: float = 0.5  # errors and slow calls
+    BREAKER_SLOW_CALL_SECONDS: float = 5.0
+    BREAKER_OPEN_SECONDS: float = 60.0
+    BREAKER_HALF_OPEN_CALLS: int = 1
+    PROVIDER_TIMEOUT_SECONDS: float = 10.0
+    YFINANCE_HEDGE_SECONDS: float = 2.0  # start a second request after this long; 0 disables
+
+    # Startup: tables and the search index are set up after the server starts
+    # listening, and /health/ready returns 503 until they are. The scheduler
+    # starts once ready; its first refresh waits STARTUP_REFRESH_DELAY_SECONDS
+    CREATE_TABLES_ON_STARTUP: bool = True  # off when the schema is managed elsewhere
+    STARTUP_REFRESH_DELAY_SECONDS: float = 30.0
+
+    # Prometheus metrics at /metrics; workers serve them on WORKER_METRICS_PORT (0 disables)
+    METRICS_ENABLED: bool = True
+    WORKER_METRICS_PORT: int = 9100
+
+    # Per-request DB query budgets: 'log' or 'fail' when a route exceeds its
+    # declared budget or repeats one statement (an N+1); DEBUG adds X-DB-* headers
+    QUERY_BUDGET_ACTION: str = "log"  # off | log | fail
+    QUERY_BUDGET_REPEAT_LIMIT: int = 5
+
+    # Refresh tracing: spans go to TRACE_FILE (JSON lines) and, if set, an OTLP/HTTP endpoint
+    TRACE_FILE: str = "traces/spans.jsonl"
+    TRACE_FILE_MAX_MB: int = 100
+    TRACE_OTLP_ENDPOINT: str = ""  # e.g. http://localhost:4318/v1/traces
+    REFRESH_TIMING_RETENTION_DAYS: int = 30
+
+    # Near-duplicate detection: estimated Jaccard similarity of title + summary
+    DEDUPE_SIMILARITY_THRESHOLD: float = 0.5
+
+    # Retention settings (days; 0 keeps rows forever)
+    NEWS_RETENTION_DAYS: int = 365
+    INSIGHT_RETENTION_DAYS: int = 30  # older insights are compacted into daily rollups
+    INSIGHT_ROLLUP_RETENTION_DAYS: int = 0
+    ARCHIVE_DIR: str = "archive"
+    RETENTION_BATCH_SIZE: int = 10000
+    NEWS_PARTITION_MONTHS_AHEAD: int = 3
+
+    # Price cache settings
+    PRICE_CACHE_DIR: str = "price_cache"
+    PRICE_DOWNLOAD_BATCH_SIZE: int = 50
+    PRICE_REFRESH_MINUTES: int = 60
+    INDICATOR_MEMO_SIZE: int = 5000
+    INDICATOR_SNAPSHOT_MAX_SYMBOLS: int = 200  # per /indicators/{name}/latest request
+
+    # Live quote settings
+    QUOTE_POLL_SECONDS: float = 15.0
+    QUOTE_MAX_SYMBOLS_PER_CLIENT: int = 50
+
+    # Price-sentiment correlation settings
+    CORRELATION_LOOKBACK_DAYS: int = 365
+    CORRELATION_WINDOW_DAYS: int = 60
+    CORRELATION_HORIZONS: List[int] = [1, 5]
+    CORRELATION_EVENT_THRESHOLD: float = 0.35
+    CORRELATION_BATCH_SIZE: int = 500
+
+    # Export settings
+    EXPORT_DIR: str = "exports"
+    EXPORT_BATCH_SIZE: int = 50000
+
+    # Watchlist settings: yfinance validation results are cached per symbol
+    TICKER_VALIDATION_CACHE_HOURS: int = 24
+    TICKER_VALIDATION_CONCURRENCY: int = 8
+    WATCHLIST_MAX_SYMBOLS: int = 200  # per bulk add or CSV import
+
+    # Response compression (Brotli needs the optional `brotli` package) and static asset caching
+    COMPRESSION_MIN_BYTES: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; low levels are fast enough for per-request use
+    STATIC_MAX_AGE_SECONDS: int = 31536000  # for content-hashed asset URLs
+
     class Config:
         env_file = ".env"
         case_sensitive = True
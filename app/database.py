@@ -1,14 +1,58 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
 from app.config import settings
+from app.metrics import timed_checkout
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
+
+def engine_options(database_url: str) -> dict:
+    """create_engine arguments from the DB_* settings"""
+    url = make_url(database_url)
+    if settings.DB_NULL_POOL:
+        # A fresh connection per checkout, so there is nothing to ping or recycle
+        options = {'poolclass': timed_checkout(NullPool)}
+    else:
+        options = {
+            'poolclass': timed_checkout(QueuePool),
+            'pool_pre_ping': True,
+            'pool_size': settings.DB_POOL_SIZE,
+            'max_overflow': settings.DB_MAX_OVERFLOW,
+            'pool_timeout': settings.DB_POOL_TIMEOUT_SECONDS,
+            'pool_recycle': settings.DB_POOL_RECYCLE_SECONDS,
+        }
+    if url.get_backend_name() != 'postgresql':
+        return options
+
+    connect_args = {}
+    if settings.DB_PGBOUNCER:
+        # psycopg2 never prepares statements; psycopg 3 does after 5 runs of a query
+        if url.get_driver_name() == 'psycopg':
+            connect_args['prepare_threshold'] = None
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args['options'] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    if connect_args:
+        options['connect_args'] = connect_args
+    return options
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+
+# Connections the pool can hand out at once, for the saturation metric; 0 is unbounded
+POOL_CAPACITY = 0 if settings.DB_NULL_POOL else settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+
+if settings.DB_PGBOUNCER and settings.DB_STATEMENT_TIMEOUT_MS and engine.dialect.name == 'postgresql':
+    @event.listens_for(engine, 'begin')
+    def _set_statement_timeout(conn):
+        # PgBouncer rejects startup options and may switch server connections
+        # between transactions, so each transaction sets its own timeout. A raw
+        # cursor keeps it out of query metrics and budgets
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+        finally:
+            cursor.close()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -21,4 +65,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,22 @@
+"""
+Error descriptions that are safe to store, log and export.
+
+Provider request URLs carry API keys in their query strings, and `requests`
+puts the URL into exception messages. Breakers, logs and trace spans record
+`describe_error(e)` instead of `str(e)`.
+"""
+
+
+def describe_error(error: BaseException) -> str:
+    """Exception class, HTTP status and URL without its query string"""
+    response = getattr(error, 'response', None)
+    request = getattr(error, 'request', None)
+    status = getattr(response, 'status_code', None)
+    url = getattr(response, 'url', None) or getattr(request, 'url', None)
+
+    parts = [type(error).__name__]
+    if status:
+        parts.append(f"HTTP {status}")
+    if url:
+        parts.append(str(url).split('?', 1)[0])
+    return ' '.join(parts)
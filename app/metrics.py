@@ -0,0 +1,277 @@
+"""
+Prometheus metrics.
+
+- HTTP: latency histogram per route template, plus DB query count and time
+  per request. `MetricsMiddleware` is plain ASGI and keeps the per-request DB
+  counters in a contextvar, which SQLAlchemy cursor events update.
+- DB: duration of every query by statement type. Connection pool checkout
+  time, timeouts, and connections in use against the pool's capacity.
+- News providers and the LLM: fetch latency, errors, breaker skips, tokens.
+- Scheduler and job queue: run duration and lag behind the scheduled time.
+- Caches: indicator memo and price cache hit/miss counts.
+
+With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR so /metrics
+aggregates all of them.
+"""
+
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST, REGISTRY
+)
+from prometheus_client.core import CounterMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS
+)
+HTTP_DB_QUERIES = Histogram(
+    'http_request_db_queries', 'DB queries issued while serving a request',
+    ['route'], buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250)
+)
+HTTP_DB_SECONDS = Histogram(
+    'http_request_db_seconds', 'Time spent in DB queries while serving a request',
+    ['route'], buckets=LATENCY_BUCKETS
+)
+DB_QUERY_SECONDS = Histogram(
+    'db_query_duration_seconds', 'DB query latency', ['operation'], buckets=LATENCY_BUCKETS
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    'db_pool_checkout_seconds', 'Time to get a pooled connection, including waiting for a free one',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+DB_POOL_TIMEOUTS = Counter('db_pool_timeouts', 'Checkouts that gave up waiting for a free connection')
+# With PROMETHEUS_MULTIPROC_DIR, in-use and capacity are summed over live processes
+DB_POOL_CHECKED_OUT = Gauge('db_pool_checked_out', 'Pooled connections in use', multiprocess_mode='livesum')
+DB_POOL_CAPACITY = Gauge(
+    'db_pool_capacity', 'Pool size plus max overflow; 0 when unbounded', multiprocess_mode='livesum'
+)
+DB_POOL_SATURATION = Gauge(
+    'db_pool_saturation', 'Fraction of pool capacity in use, highest across processes', multiprocess_mode='livemax'
+)
+
+PROVIDER_FETCH_SECONDS = Histogram(
+    'news_provider_fetch_seconds', 'News provider fetch latency', ['provider'], buckets=SLOW_BUCKETS[:7]
+)
+PROVIDER_FETCH_ERRORS = Counter('news_provider_errors', 'News provider fetch errors', ['provider'])
+PROVIDER_FETCH_SKIPPED = Counter(
+    'news_provider_skipped', 'Fetches skipped because the circuit breaker was open', ['provider']
+)
+
+LLM_REQUEST_SECONDS = Histogram('llm_request_seconds', 'LLM request latency', ['model'], buckets=SLOW_BUCKETS[:8])
+LLM_TOKENS = Counter('llm_tokens', 'LLM tokens used', ['model', 'kind'])
+LLM_ERRORS = Counter('llm_errors', 'LLM request errors', ['model'])
+
+SCHEDULER_JOB_SECONDS = Histogram(
+    'scheduler_job_seconds', 'Scheduled job run time', ['job'], buckets=SLOW_BUCKETS
+)
+SCHEDULER_JOB_LAG_SECONDS = Histogram(
+    'scheduler_job_lag_seconds', 'Delay between a job\'s scheduled and actual start', ['job'],
+    buckets=(0.01, 0.1, 1.0, 5.0, 30.0, 60.0, 300.0)
+)
+SCHEDULER_JOB_RUNS = Counter('scheduler_job_runs', 'Scheduled job runs by lease outcome', ['job', 'outcome'])
+
+QUEUE_JOB_WAIT_SECONDS = Histogram(
+    'queue_job_wait_seconds', 'Time from a job becoming runnable to a worker claiming it', ['kind'],
+    buckets=SLOW_BUCKETS
+)
+QUEUE_JOB_SECONDS = Histogram('queue_job_seconds', 'Queued job run time', ['kind', 'status'], buckets=SLOW_BUCKETS)
+
+PRICE_CACHE_LOOKUPS = Counter('price_cache_lookups', 'Price cache reads by result', ['result'])
+
+
+class CacheCollector:
+    """Reports counters that caches already keep, read at scrape time"""
+
+    def describe(self):
+        # Without describe(), registering calls collect() and imports the indicator engine at startup
+        yield self._memo_family()
+
+    def _memo_family(self):
+        return CounterMetricFamily('indicator_memo_lookups', 'Indicator memo lookups by result', labels=['result'])
+
+    def collect(self):
+        from app.services import indicators
+
+        memo = self._memo_family()
+        engine = indicators._indicator_engine
+        if engine is not None:
+            memo.add_metric(['hit'], engine.hits)
+            memo.add_metric(['partial_hit'], engine.partial_hits)
+            memo.add_metric(['miss'], engine.misses)
+        yield memo
+
+
+CACHE_COLLECTOR = CacheCollector()
+REGISTRY.register(CACHE_COLLECTOR)
+
+
+class RequestDBStats:
+    """DB work done while serving one request"""
+    __slots__ = ('queries', 'seconds', 'statements')
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements: Dict[str, int] = {}
+
+
+# Stats for the request being served, if any
+_request_db: ContextVar[Optional[RequestDBStats]] = ContextVar('request_db', default=None)
+_instrumented = set()
+
+
+def begin_request_db():
+    """
+    Start counting DB work for the current request: (stats, token).
+    Middlewares share one stats object; only the one that created it gets a
+    token to pass to `end_request_db`.
+    """
+    stats = _request_db.get()
+    if stats is not None:
+        return stats, None
+    stats = RequestDBStats()
+    return stats, _request_db.set(stats)
+
+
+def end_request_db(token):
+    if token is not None:
+        _request_db.reset(token)
+
+
+def _operation(statement: str) -> str:
+    word = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ''
+    return word if word in ('select', 'insert', 'update', 'delete') else 'other'
+
+
+def instrument_engine(engine: Engine):
+    """Time every query on `engine` and attribute it to the current request"""
+    if id(engine) in _instrumented:
+        return
+    _instrumented.add(id(engine))
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start'].pop()
+        DB_QUERY_SECONDS.labels(_operation(statement)).observe(elapsed)
+        stats = _request_db.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+
+def timed_checkout(pool_class):
+    """`pool_class` recording how long each checkout takes, and timeouts"""
+
+    class TimedPool(pool_class):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                return super().connect()
+            except PoolTimeoutError:
+                DB_POOL_TIMEOUTS.inc()
+                raise
+            finally:
+                DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{pool_class.__name__}"
+    return TimedPool
+
+
+def instrument_pool(engine: Engine, capacity: int):
+    """Track connections in use on `engine`'s pool against `capacity` (0 if unbounded)"""
+    if ('pool', id(engine)) in _instrumented:
+        return
+    _instrumented.add(('pool', id(engine)))
+
+    lock = threading.Lock()
+    in_use = 0
+    DB_POOL_CAPACITY.set(capacity)
+
+    def update(delta: int):
+        nonlocal in_use
+        with lock:
+            in_use += delta
+            DB_POOL_CHECKED_OUT.set(in_use)
+            if capacity:
+                DB_POOL_SATURATION.set(in_use / capacity)
+
+    @event.listens_for(engine, 'checkout')
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        update(1)
+
+    @event.listens_for(engine, 'checkin')
+    def _checkin(dbapi_connection, connection_record):
+        update(-1)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so it adds no per-request task or body buffering"""
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Optional[Dict] = None
+
+    def _route_label(self, scope) -> str:
+        route = scope.get('route')
+        if route is not None:
+            return route.path
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return 'other'
+        if self._routes is None:
+            # Starlette leaves the matched endpoint in the scope; map it back to its path template
+            app = scope['app']
+            self._routes = {r.endpoint: r.path for r in app.routes if hasattr(r, 'endpoint')}
+        return self._routes.get(endpoint, 'other')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        stats, token = begin_request_db()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            end_request_db(token)
+            route = self._route_label(scope)
+            HTTP_REQUEST_SECONDS.labels(scope['method'], route, str(status[0])).observe(elapsed)
+            HTTP_DB_QUERIES.labels(route).observe(stats.queries)
+            HTTP_DB_SECONDS.labels(route).observe(stats.seconds)
+
+
+def render_metrics():
+    """(body, content type) for the /metrics endpoint"""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        # Read at scrape time, so these are the answering process's counts
+        registry.register(CACHE_COLLECTOR)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -1,5 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Table, Text, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column, Integer, String, DateTime, Date, ForeignKey, Boolean, Table, Text, Float, JSON, BigInteger,
+    LargeBinary, Index, UniqueConstraint, text
+)
+from sqlalchemy.orm import relationship, backref
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -74,4 +77,171 @@ class AIInsight(Base):
 
     # Relationships
     ticker = relationship("Ticker", backref="ai_insights")
-    news_article = relationship("NewsArticle", back_populates="ai_insights")
\ No newline at end of file
+    news_article = relationship("NewsArticle", back_populates="ai_insights")
+
+
+class TickerSentimentSummary(Base):
+    """One row per ticker, maintained incrementally by save_news_and_insights"""
+    __tablename__ = "ticker_sentiment_summary"
+
+    ticker_id = Column(Integer, ForeignKey('tickers.id', ondelete='CASCADE'), primary_key=True)
+    overall_sentiment = Column(String, nullable=False, default='neutral')  # from recent_insights
+    article_count = Column(Integer, nullable=False, default=0)
+    sentiment_score_sum = Column(Float, nullable=False, default=0.0)
+    sentiment_score_count = Column(Integer, nullable=False, default=0)
+    provider_last_seen = Column(JSON, nullable=False, default=dict)  # provider -> latest published_at (ISO, UTC)
+    recent_insights = Column(JSON, nullable=False, default=list)  # newest first: [{'sentiment', 'created_at'}]
+    last_article_at = Column(DateTime(timezone=True))
+    last_insight_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    ticker = relationship("Ticker", backref=backref("sentiment_summary", uselist=False, passive_deletes=True))
+
+
+class ArticleFingerprint(Base):
+    """Normalized URL and MinHash signature used for near-duplicate detection"""
+    __tablename__ = "article_fingerprints"
+
+    article_id = Column(Integer, ForeignKey('news_articles.id', ondelete='CASCADE'), primary_key=True)
+    ticker_id = Column(Integer, ForeignKey('tickers.id', ondelete='CASCADE'), nullable=False)
+    normalized_url = Column(String, index=True)
+    signature = Column(LargeBinary, nullable=False)  # MinHash values as uint32 bytes
+
+
+class ArticleLSHBucket(Base):
+    """LSH band keys of article signatures; candidate lookup is an index scan"""
+    __tablename__ = "article_lsh_buckets"
+    __table_args__ = (
+        Index('ix_article_lsh_buckets_ticker_key', 'ticker_id', 'lsh_key'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    article_id = Column(Integer, ForeignKey('news_articles.id', ondelete='CASCADE'), nullable=False, index=True)
+    ticker_id = Column(Integer, ForeignKey('tickers.id', ondelete='CASCADE'), nullable=False)
+    lsh_key = Column(BigInteger, nullable=False)
+
+
+class AIInsightDailyRollup(Base):
+    """Compacted form of AI insights older than the raw retention window"""
+    __tablename__ = "ai_insight_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint('ticker_id', 'day', name='uq_ai_insight_daily_rollups_ticker_day'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticker_id = Column(Integer, ForeignKey('tickers.id', ondelete='CASCADE'), nullable=False)
+    day = Column(Date, nullable=False)
+    insight_count = Column(Integer, nullable=False, default=0)
+    bullish_count = Column(Integer, nullable=False, default=0)
+    bearish_count = Column(Integer, nullable=False, default=0)
+    neutral_count = Column(Integer, nullable=False, default=0)
+    avg_confidence = Column(Float)
+    confidence_count = Column(Integer, nullable=False, default=0)  # insights with a confidence score
+    avg_sources_analyzed = Column(Float)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class SentimentPriceCorrelation(Base):
+    """Latest price-sentiment analytics per ticker, provider and return horizon"""
+    __tablename__ = "sentiment_price_correlations"
+    __table_args__ = (
+        UniqueConstraint('ticker_id', 'provider', 'horizon_days', name='uq_sentiment_price_correlations_key'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticker_id = Column(Integer, ForeignKey('tickers.id', ondelete='CASCADE'), nullable=False)
+    provider = Column(String, nullable=False)  # news provider, 'all' or 'ai_insight'
+    horizon_days = Column(Integer, nullable=False)  # forward return horizon in trading days
+    window_days = Column(Integer, nullable=False)  # rolling correlation window
+    n_obs = Column(Integer, nullable=False, default=0)
+    correlation = Column(Float)  # full-sample correlation of sentiment vs forward return
+    rolling_correlation = Column(Float)  # correlation over the latest window
+    positive_events = Column(Integer, nullable=False, default=0)
+    positive_event_return = Column(Float)  # mean forward return after strongly positive days
+    negative_events = Column(Integer, nullable=False, default=0)
+    negative_event_return = Column(Float)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class TickerRefreshState(Base):
+    """Adaptive refresh schedule per ticker, maintained by the priority scheduler"""
+    __tablename__ = "ticker_refresh_state"
+
+    ticker_id = Column(Integer, ForeignKey('tickers.id', ondelete='CASCADE'), primary_key=True)
+    priority_score = Column(Float, nullable=False, default=0.0)
+    subscriber_count = Column(Integer, nullable=False, default=0)
+    article_velocity = Column(Float, nullable=False, default=0.0)  # new articles per day
+    interval_minutes = Column(Float)
+    last_refreshed_at = Column(DateTime(timezone=True))
+    next_refresh_at = Column(DateTime(timezone=True), index=True)
+
+
+class SchedulerLease(Base):
+    """Claim on a scheduled job so only one process runs it per period"""
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(100), primary_key=True)
+    owner = Column(String(200), nullable=False)
+    acquired_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class Job(Base):
+    """Background job queue shared by the API (producer) and workers"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index('ix_jobs_claim', 'status', 'priority', 'run_after'),
+        # At most one open job per dedupe key, even when two producers race
+        Index('uq_jobs_open_dedupe_key', 'dedupe_key', unique=True,
+              postgresql_where=text("status IN ('queued', 'running')"),
+              sqlite_where=text("status IN ('queued', 'running')")),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    dedupe_key = Column(String(200), index=True)  # at most one open job per key
+    status = Column(String(20), nullable=False, default='queued')  # queued, running, done, failed
+    priority = Column(Integer, nullable=False, default=0)  # higher runs first
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), nullable=False)
+    locked_by = Column(String(200))
+    locked_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+
+
+class ProviderHealth(Base):
+    """Latest circuit breaker snapshot per news provider and process"""
+    __tablename__ = "provider_health"
+
+    provider = Column(String(50), primary_key=True)
+    instance = Column(String(200), primary_key=True)
+    state = Column(String(20), nullable=False)
+    snapshot = Column(JSON, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class RefreshTiming(Base):
+    """Per-stage timing of one ticker refresh, from its trace"""
+    __tablename__ = "refresh_timings"
+    __table_args__ = (
+        Index('ix_refresh_timings_ticker_started', 'ticker_id', 'started_at'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticker_id = Column(Integer, ForeignKey('tickers.id', ondelete='CASCADE'), nullable=False)
+    trace_id = Column(String(32), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    total_ms = Column(Float, nullable=False)
+    fetch_ms = Column(Float, nullable=False, default=0.0)
+    dedupe_ms = Column(Float, nullable=False, default=0.0)
+    db_ms = Column(Float, nullable=False, default=0.0)
+    llm_ms = Column(Float, nullable=False, default=0.0)
+    provider_ms = Column(JSON)  # provider -> fetch milliseconds
+    articles_fetched = Column(Integer, nullable=False, default=0)
+    articles_saved = Column(Integer, nullable=False, default=0)
+    status = Column(String(20), nullable=False, default='ok')
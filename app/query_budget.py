@@ -0,0 +1,90 @@
+"""
+Per-request DB query budgets and N+1 detection.
+
+Declare a budget under the route decorator:
+
+    @router.get("/ticker/{ticker_symbol}/news")
+    @query_budget(4)
+    async def get_ticker_news(...):
+
+`QueryBudgetMiddleware` counts the statements and DB time of each request
+through the engine events installed by `app.metrics.instrument_engine`. A
+request breaks its budget when it runs more queries (or DB milliseconds) than
+its route declares, or runs one statement QUERY_BUDGET_REPEAT_LIMIT times,
+which is the shape of an N+1 loop. QUERY_BUDGET_ACTION decides whether that
+is logged or raises QueryBudgetExceeded. With DEBUG on, every response gets
+X-DB-Queries and X-DB-Time-Ms headers.
+"""
+
+from typing import List, Optional
+
+from app.config import settings
+from app.metrics import RequestDBStats, begin_request_db, end_request_db
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+def query_budget(queries: int, ms: Optional[float] = None):
+    """Declare the most DB queries (and optionally DB time) a route may use"""
+    def decorator(func):
+        func.query_budget = (queries, ms)
+        return func
+    return decorator
+
+
+def budget_violations(stats: RequestDBStats, budget) -> List[str]:
+    problems = []
+    if budget is not None:
+        queries, ms = budget
+        if stats.queries > queries:
+            problems.append(f"{stats.queries} queries (budget {queries})")
+        if ms is not None and stats.seconds * 1000 > ms:
+            problems.append(f"{stats.seconds * 1000:.1f} ms in DB (budget {ms:g})")
+    for statement, count in stats.statements.items():
+        if count >= settings.QUERY_BUDGET_REPEAT_LIMIT:
+            problems.append(f"possible N+1: {count}x {' '.join(statement.split())[:200]}")
+    return problems
+
+
+class QueryBudgetMiddleware:
+    """Pure ASGI, like MetricsMiddleware; checks the budget as the response starts"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = begin_request_db()
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                # The endpoint has returned, so its queries are all counted
+                if settings.QUERY_BUDGET_ACTION != 'off':
+                    self._check(scope, stats)
+                if settings.DEBUG:
+                    message['headers'] = list(message.get('headers', [])) + [
+                        (b'x-db-queries', str(stats.queries).encode()),
+                        (b'x-db-time-ms', f"{stats.seconds * 1000:.2f}".encode()),
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_request_db(token)
+
+    def _check(self, scope, stats: RequestDBStats):
+        endpoint = scope.get('endpoint')
+        problems = budget_violations(stats, getattr(endpoint, 'query_budget', None))
+        if not problems:
+            return
+        name = getattr(endpoint, '__name__', 'unknown')
+        detail = f"{scope['method']} {scope['path']} ({name}): {'; '.join(problems)}"
+        if settings.QUERY_BUDGET_ACTION == 'fail':
+            raise QueryBudgetExceeded(detail)
+        print(f"Query budget exceeded: {detail}")
@@ -13,11 +13,13 @@ from app.auth import (
     get_current_active_user
 )
 from app.config import settings
+from app.query_budget import query_budget
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED)
+@query_budget(4)
 async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
     # Check if user already exists
@@ -49,6 +51,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
+@query_budget(1)
 async def login(
         form_data: OAuth2PasswordRequestForm = Depends(),
         db: Session = Depends(get_db)
@@ -78,6 +81,7 @@ async def login(
 
 
 @router.get("/me", response_model=User)
+@query_budget(1)
 async def get_me(current_user: UserModel = Depends(get_current_active_user)):
     """Get current user information"""
     return current_user
\ No newline at end of file
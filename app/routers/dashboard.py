@@ -6,30 +6,30 @@ from app.database import get_db
 from app.models import User as UserModel, Ticker as TickerModel
 from app.schemas import DashboardResponse, TickerBase, User
 from app.auth import get_current_active_user
+from app.query_budget import query_budget
+from app.services.watchlist import user_ticker_rows
 
 router = APIRouter()
 
 
 @router.get("/", response_model=DashboardResponse)
+@query_budget(2)
 async def get_dashboard(
         current_user: UserModel = Depends(get_current_active_user),
         db: Session = Depends(get_db)
 ):
     """Get user's dashboard with all their tickers"""
-    # Refresh user to get updated tickers relationship
-    db.refresh(current_user)
-
     return {
         "user": current_user,
-        "tickers": current_user.tickers
+        "tickers": user_ticker_rows(db, current_user.id)
     }
 
 
 @router.get("/tickers", response_model=List[TickerBase])
+@query_budget(2)
 async def get_user_tickers(
         current_user: UserModel = Depends(get_current_active_user),
         db: Session = Depends(get_db)
 ):
     """Get all tickers for the current user"""
-    db.refresh(current_user)
-    return current_user.tickers
\ No newline at end of file
+    return user_ticker_rows(db, current_user.id)
\ No newline at end of file
@@ -1,18 +1,55 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func as sql_func
+from sqlalchemy import desc, func
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 from app.database import get_db
-from app.models import User, Ticker, NewsArticle, AIInsight
-from app.schemas import TickerDashboardData, NewsArticleSchema, AIInsightSchema
+from app.models import User, NewsArticle, AIInsight, TickerSentimentSummary, SentimentPriceCorrelation, Job, RefreshTiming
+from app.schemas import (
+    TickerDashboardData, NewsArticleSchema, AIInsightSchema, TickerSentimentRollup, NewsSearchResult,
+    SentimentPriceCorrelationSchema, JobSchema, RefreshTimingSchema
+)
 from app.auth import get_current_active_user
-from app.services.news_service import NewsService
+from app.query_budget import query_budget
+from app.responses import ORJSONResponse, rows_as_dicts
+from app.services.summary_service import summary_for_window
+from app.timeutils import as_utc
+from app.services.search_service import search_articles
+from app.services.watchlist import followed_ticker, follows_ticker, user_ticker_rows
+from app.tasks.news_tasks import enqueue_ticker_refresh
 
 router = APIRouter()
 
+
+# Columns selected for the dashboard, named exactly like the response schema fields
+NEWS_FIELDS = tuple(NewsArticleSchema.model_fields)
+INSIGHT_FIELDS = tuple(AIInsightSchema.model_fields)
+
+
+def _latest_per_ticker(db: Session, model, fields, time_column, ticker_ids: List[int], since: datetime, limit: int):
+    """
+    Newest `limit` rows per ticker since `since` as dicts of `fields`, in one
+    query rather than one per ticker
+    """
+    rank = func.row_number().over(partition_by=model.ticker_id, order_by=desc(time_column)).label('rank')
+    ranked = db.query(model.id.label('id'), rank).filter(
+        model.ticker_id.in_(ticker_ids),
+        time_column >= since
+    ).subquery()
+
+    rows = db.query(*[getattr(model, f) for f in fields]).join(ranked, model.id == ranked.c.id).filter(
+        ranked.c.rank <= limit
+    ).order_by(desc(time_column)).all()
+
+    grouped = {ticker_id: [] for ticker_id in ticker_ids}
+    for row in rows_as_dicts(fields, rows):
+        grouped[row['ticker_id']].append(row)
+    return grouped
+
+
 @router.get("/dashboard-news", response_model=List[TickerDashboardData])
+@query_budget(5)
 async def get_dashboard_with_news(
         hours: int = Query(24, description="Hours of news to fetch"),
         db: Session = Depends(get_db),
@@ -20,48 +57,76 @@ async def get_dashboard_with_news(
 ):
     """Get all user tickers with latest news and AI insights"""
     dashboards = []
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+
+    tickers = user_ticker_rows(db, current_user.id)
+    ticker_ids = [t.id for t in tickers]
+    # Read-only: rows missing here are backfilled at startup and by the reconcile job
+    summaries = {
+        s.ticker_id: s for s in db.query(TickerSentimentSummary).filter(
+            TickerSentimentSummary.ticker_id.in_(ticker_ids)
+        ).all()
+    }
+
+    latest_news = _latest_per_ticker(db, NewsArticle, NEWS_FIELDS, NewsArticle.published_at, ticker_ids, since, 10)
+    latest_insights = _latest_per_ticker(db, AIInsight, INSIGHT_FIELDS, AIInsight.created_at, ticker_ids, since, 3)
+
+    for ticker in tickers:
+        overall_sentiment, sources_count = summary_for_window(summaries.get(ticker.id), since)
+
+        dashboards.append({
+            'ticker_symbol': ticker.symbol,
+            'ticker_name': ticker.name,
+            'ticker_type': ticker.type,
+            'latest_news': latest_news[ticker.id],
+            'ai_insights': latest_insights[ticker.id],
+            'overall_sentiment': overall_sentiment,
+            'news_sources_count': sources_count
+        })
+
+    # Trusted DB rows: serialize directly instead of validating through TickerDashboardData
+    return ORJSONResponse(dashboards)
+
+
+@router.get("/search", response_model=List[NewsSearchResult])
+@query_budget(3)
+async def search_news(
+        q: str = Query(..., min_length=2, max_length=200, description="Search terms"),
+        ticker: Optional[str] = Query(None, description="Restrict to one of your tickers"),
+        provider: Optional[str] = Query(None),
+        start: Optional[datetime] = Query(None, description="Published at or after"),
+        end: Optional[datetime] = Query(None, description="Published before"),
+        limit: int = Query(20, ge=1, le=100),
+        offset: int = Query(0, ge=0),
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_active_user)
+):
+    """Full-text search over news for your tickers, ranked with highlighted snippets"""
+    tickers = user_ticker_rows(db, current_user.id)
+
+    if ticker:
+        ticker = ticker.upper()
+        tickers = [t for t in tickers if t.symbol == ticker]
+        if not tickers:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Ticker not in your list"
+            )
 
-    for ticker in current_user.tickers:
-        latest_news = db.query(NewsArticle).filter(
-            NewsArticle.ticker_id == ticker.id,
-            NewsArticle.published_at >= datetime.now() - timedelta(hours=hours)
-        ).order_by(desc(NewsArticle.published_at)).limit(10).all()
-
-        latest_insights = db.query(AIInsight).filter(
-            AIInsight.ticker_id == ticker.id,
-            AIInsight.created_at >= datetime.now() - timedelta(hours=hours)
-        ).order_by(desc(AIInsight.created_at)).limit(3).all()
-
-        sources_count = db.query(
-            sql_func.count(sql_func.distinct(NewsArticle.news_provider))
-        ).filter(
-            NewsArticle.ticker_id == ticker.id,
-            NewsArticle.published_at >= datetime.now() - timedelta(hours=hours)
-        ).scalar() or 0
-
-        # Calculate sentiment
-        overall_sentiment = 'neutral'
-        if latest_insights:
-            sentiments = [i.sentiment for i in latest_insights if i.sentiment]
-            if sentiments:
-                bullish = sum(1 for s in sentiments if 'bullish' in s.lower())
-                bearish = sum(1 for s in sentiments if 'bearish' in s.lower())
-                overall_sentiment = 'bullish' if bullish > bearish else ('bearish' if bearish > bullish else 'neutral')
-
-        dashboards.append(TickerDashboardData(
-            ticker_symbol=ticker.symbol,
-            ticker_name=ticker.name,
-            ticker_type=ticker.type,
-            latest_news=latest_news,
-            ai_insights=latest_insights,
-            overall_sentiment=overall_sentiment,
-            news_sources_count=sources_count
-        ))
-
-    return dashboards
+    return search_articles(
+        db,
+        q,
+        [t.id for t in tickers],
+        provider=provider,
+        start=start,
+        end=end,
+        limit=limit,
+        offset=offset
+    )
 
 
 @router.get("/ticker/{ticker_symbol}/news", response_model=List[NewsArticleSchema])
+@query_budget(3)
 async def get_ticker_news(
         ticker_symbol: str,
         limit: int = Query(20, ge=1, le=100),
@@ -72,8 +137,8 @@ async def get_ticker_news(
     """Get news for specific ticker"""
     ticker_symbol = ticker_symbol.upper()
 
-    ticker = db.query(Ticker).filter(Ticker.symbol == ticker_symbol).first()
-    if not ticker or ticker not in current_user.tickers:
+    ticker = followed_ticker(db, current_user.id, ticker_symbol)
+    if not ticker:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Ticker not in your list"
@@ -89,6 +154,7 @@ async def get_ticker_news(
 
 
 @router.get("/ticker/{ticker_symbol}/insights", response_model=List[AIInsightSchema])
+@query_budget(3)
 async def get_ticker_insights(
         ticker_symbol: str,
         limit: int = Query(10, ge=1, le=50),
@@ -98,8 +164,8 @@ async def get_ticker_insights(
     """Get AI insights for specific ticker"""
     ticker_symbol = ticker_symbol.upper()
 
-    ticker = db.query(Ticker).filter(Ticker.symbol == ticker_symbol).first()
-    if not ticker or ticker not in current_user.tickers:
+    ticker = followed_ticker(db, current_user.id, ticker_symbol)
+    if not ticker:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Ticker not in your list"
@@ -112,7 +178,106 @@ async def get_ticker_insights(
     return insights
 
 
+@router.get("/ticker/{ticker_symbol}/sentiment", response_model=TickerSentimentRollup)
+@query_budget(4)
+async def get_ticker_sentiment(
+        ticker_symbol: str,
+        bucket: str = Query('1d', description="Bucket size: 1h, 4h, 1d or 1w"),
+        hours: int = Query(168, ge=1, le=24 * 365, description="Window length when start is not given"),
+        start: Optional[datetime] = Query(None),
+        end: Optional[datetime] = Query(None),
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_active_user)
+):
+    """Get time-bucketed sentiment rollups for a specific ticker"""
+    # Imported here so pandas loads on first use, not at startup
+    from app.services.sentiment_analytics import BUCKETS, rollup_ticker
+
+    ticker_symbol = ticker_symbol.upper()
+
+    if bucket not in BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid bucket {bucket}. Use one of: {', '.join(BUCKETS)}"
+        )
+
+    ticker = followed_ticker(db, current_user.id, ticker_symbol)
+    if not ticker:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticker not in your list"
+        )
+
+    end = as_utc(end) or datetime.now(timezone.utc)
+    start = as_utc(start) or end - timedelta(hours=hours)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+
+    rollups = rollup_ticker(db, ticker.id, start, end, bucket)
+
+    return TickerSentimentRollup(
+        ticker_symbol=ticker.symbol,
+        bucket_size=bucket,
+        start=start,
+        end=end,
+        buckets=rollups['buckets'],
+        providers=rollups['providers']
+    )
+
+
+@router.get("/ticker/{ticker_symbol}/correlation", response_model=List[SentimentPriceCorrelationSchema])
+@query_budget(3)
+async def get_ticker_correlation(
+        ticker_symbol: str,
+        provider: Optional[str] = Query(None, description="News provider, 'all' or 'ai_insight'"),
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_active_user)
+):
+    """Get precomputed price-sentiment correlations and event-study returns for a ticker"""
+    ticker_symbol = ticker_symbol.upper()
+
+    ticker = followed_ticker(db, current_user.id, ticker_symbol)
+    if not ticker:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticker not in your list"
+        )
+
+    query = db.query(SentimentPriceCorrelation).filter(SentimentPriceCorrelation.ticker_id == ticker.id)
+    if provider:
+        query = query.filter(SentimentPriceCorrelation.provider == provider)
+
+    return query.order_by(SentimentPriceCorrelation.provider, SentimentPriceCorrelation.horizon_days).all()
+
+
+@router.get("/ticker/{ticker_symbol}/refresh-timings", response_model=List[RefreshTimingSchema])
+@query_budget(3)
+async def get_refresh_timings(
+        ticker_symbol: str,
+        limit: int = Query(20, ge=1, le=200),
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_active_user)
+):
+    """Per-stage timings of the latest refreshes for a ticker"""
+    ticker_symbol = ticker_symbol.upper()
+
+    ticker = followed_ticker(db, current_user.id, ticker_symbol)
+    if not ticker:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticker not in your list"
+        )
+
+    return db.query(RefreshTiming).filter(
+        RefreshTiming.ticker_id == ticker.id
+    ).order_by(desc(RefreshTiming.started_at)).limit(limit).all()
+
+
 @router.post("/ticker/{ticker_symbol}/refresh")
+@query_budget(5)
 async def refresh_ticker_news(
         ticker_symbol: str,
         db: Session = Depends(get_db),
@@ -121,14 +286,33 @@ async def refresh_ticker_news(
     """Manually refresh news for a ticker"""
     ticker_symbol = ticker_symbol.upper()
 
-    ticker = db.query(Ticker).filter(Ticker.symbol == ticker_symbol).first()
-    if not ticker or ticker not in current_user.tickers:
+    ticker = followed_ticker(db, current_user.id, ticker_symbol)
+    if not ticker:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Ticker not in your list"
         )
 
-    news_service = NewsService()
-    news_service.save_news_and_insights(ticker.id, ticker.symbol, db)
+    # A worker does the fetching; manual refreshes jump ahead of scheduled ones
+    job = enqueue_ticker_refresh(db, ticker.id, priority=10)
+
+    return {"message": f"News refresh queued for {ticker_symbol}", "job_id": job.id}
+
 
-    return {"message": f"News refreshed for {ticker_symbol}"}
\ No newline at end of file
+@router.get("/jobs/{job_id}", response_model=JobSchema)
+@query_budget(3)
+async def get_job_status(
+        job_id: int,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_active_user)
+):
+    """Status of a queued refresh job for one of your tickers"""
+    job = db.get(Job, job_id)
+    ticker_id = (job.payload or {}).get('ticker_id') if job else None
+    # Other users' jobs look the same as missing ones
+    if ticker_id is None or not follows_ticker(db, current_user.id, ticker_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
\ No newline at end of file
@@ -0,0 +1,111 @@
+from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect, Query
+from starlette.websockets import WebSocketState
+from typing import List, Optional, Tuple
+import asyncio
+import re
+
+from app.database import SessionLocal
+from app.models import User
+from app.auth import get_current_active_user, get_user_from_token
+from app.config import settings
+from app.query_budget import query_budget
+from app.services.quote_hub import quote_hub, QuoteSubscriber
+
+router = APIRouter()
+
+# Yahoo-style symbols: AAPL, BRK-B, BTC-USD, 0700.HK, EURUSD=X, ^GSPC
+SYMBOL_PATTERN = re.compile(r'^\^?[A-Z0-9][A-Z0-9.=-]{0,19}$')
+
+
+def parse_client_message(message) -> Tuple[Optional[str], List[str], Optional[str]]:
+    """(action, symbols, error) from a decoded client message"""
+    if not isinstance(message, dict):
+        return None, [], "Messages must be JSON objects"
+    symbols = message.get("symbols", [])
+    if not isinstance(symbols, list) or not all(isinstance(s, str) for s in symbols):
+        return None, [], "symbols must be a list of strings"
+    symbols = [s.strip().upper() for s in symbols]
+    invalid = [s for s in symbols if not SYMBOL_PATTERN.match(s)]
+    if invalid:
+        return None, [], f"Invalid symbols: {', '.join(invalid[:10])}"
+    return message.get("action"), symbols, None
+
+
+@router.get("/{symbol}")
+@query_budget(1)
+async def get_latest_quote(
+        symbol: str,
+        current_user: User = Depends(get_current_active_user)
+):
+    """Get the latest cached quote for a symbol someone is streaming"""
+    quote = quote_hub.latest.get(symbol.upper())
+    if not quote:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No live quote for {symbol.upper()}. Subscribe via /api/quotes/ws first."
+        )
+    return quote
+
+
+@router.websocket("/ws")
+async def stream_quotes(websocket: WebSocket, token: str = Query(...)):
+    """
+    Stream live quotes. Browsers cannot set headers on WebSockets, so the
+    access token is passed as a query parameter.
+
+    Client messages: {"action": "subscribe" | "unsubscribe", "symbols": ["AAPL", ...]}
+    Server messages: {"type": "quotes", "quotes": [...], "dropped": n}
+    """
+    db = SessionLocal()
+    try:
+        user = get_user_from_token(token, db)
+    finally:
+        db.close()
+
+    if not user or not user.is_active:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscriber = QuoteSubscriber()
+
+    async def send_quotes():
+        while True:
+            batch = await subscriber.next_batch()
+            await websocket.send_json({"type": "quotes", "quotes": batch, "dropped": subscriber.dropped})
+
+    sender = asyncio.create_task(send_quotes())
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except (ValueError, TypeError, KeyError):
+                # Malformed JSON or a binary frame
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON text"})
+                continue
+            action, symbols, error = parse_client_message(message)
+            if error:
+                await websocket.send_json({"type": "error", "detail": error})
+                continue
+
+            if action == "subscribe":
+                allowed = settings.QUOTE_MAX_SYMBOLS_PER_CLIENT - len(subscriber.symbols)
+                new_symbols = [s for s in symbols if s not in subscriber.symbols]
+                if len(new_symbols) > allowed:
+                    await websocket.send_json({
+                        "type": "error",
+                        "detail": f"At most {settings.QUOTE_MAX_SYMBOLS_PER_CLIENT} symbols per connection"
+                    })
+                    new_symbols = new_symbols[:max(allowed, 0)]
+                quote_hub.subscribe(subscriber, new_symbols)
+            elif action == "unsubscribe":
+                quote_hub.unsubscribe(subscriber, symbols)
+            else:
+                await websocket.send_json({"type": "error", "detail": f"Unknown action {action}"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        quote_hub.remove(subscriber)
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.close()
@@ -1,17 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
+
+import numpy as np
 
 from app.database import get_db
-from app.models import User as UserModel, Ticker as TickerModel
-from app.schemas import AddTickerRequest, RemoveTickerRequest, Ticker, TickerCreate
+from app.models import User as UserModel
+from app.schemas import (
+    AddTickerRequest, RemoveTickerRequest, BulkTickerRequest, BulkTickerResult, Ticker, TickerCreate,
+    PriceSeries, IndicatorSeries, IndicatorSnapshot
+)
 from app.auth import get_current_active_user
+from app.config import settings
+from app.query_budget import query_budget
+from app.timeutils import as_utc
 from app.ticker_validator import validate_ticker
+from app.services.price_service import INTERVAL_LOOKBACK, PRICE_COLUMNS, get_price_service
+from app.services.summary_service import create_empty_summaries
+from app.services.indicators import INDICATORS, resolve_params, get_indicator_engine
+from app.services.watchlist import (
+    ticker_rows, ticker_by_symbol, ticker_with_membership, insert_ticker, add_user_ticker, remove_user_ticker,
+    normalize_symbols, add_symbols, parse_symbols_csv, watchlist_csv
+)
 
 router = APIRouter()
 
+# Room for a header plus WATCHLIST_MAX_SYMBOLS rows of our own export format
+IMPORT_MAX_ROW_BYTES = 256
+
 
 @router.post("/add", response_model=Ticker)
+@query_budget(3)
 async def add_ticker_to_dashboard(
         request: AddTickerRequest,
         current_user: UserModel = Depends(get_current_active_user),
@@ -24,8 +48,8 @@ async def add_ticker_to_dashboard(
     """
     symbol = request.symbol.upper()
 
-    # Check if ticker exists in database
-    ticker = db.query(TickerModel).filter(TickerModel.symbol == symbol).first()
+    # Check if ticker exists in database and whether the user already has it
+    ticker = ticker_with_membership(db, current_user.id, symbol)
 
     if not ticker:
         raise HTTPException(
@@ -33,22 +57,21 @@ async def add_ticker_to_dashboard(
             detail=f"Ticker {symbol} not found. Please validate ticker first."
         )
 
-    # Check if user already has this ticker
-    if ticker in current_user.tickers:
+    if ticker.followed:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Ticker {symbol} is already in your dashboard"
         )
 
     # Add ticker to user's dashboard
-    current_user.tickers.append(ticker)
+    add_user_ticker(db, current_user.id, ticker.id)
     db.commit()
-    db.refresh(current_user)
 
     return ticker
 
 
 @router.post("/create", response_model=Ticker, status_code=status.HTTP_201_CREATED)
+@query_budget(5)
 async def create_ticker(
         ticker_data: TickerCreate,
         db: Session = Depends(get_db),
@@ -61,43 +84,38 @@ async def create_ticker(
     symbol = ticker_data.symbol.upper()
 
     # Check if ticker already exists in database
-    existing_ticker = db.query(TickerModel).filter(TickerModel.symbol == symbol).first()
+    existing_ticker = ticker_with_membership(db, current_user.id, symbol)
     if existing_ticker:
         # Check if user already has this ticker
-        if existing_ticker in current_user.tickers:
+        if existing_ticker.followed:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"You already have ticker {symbol} in your list"
             )
 
         # Ticker exists but user doesn't have it - add to user's list
-        current_user.tickers.append(existing_ticker)
+        add_user_ticker(db, current_user.id, existing_ticker.id)
         db.commit()
-        db.refresh(existing_ticker)
         return existing_ticker
 
-    # Validate ticker exists in market data
+    # Validate ticker exists in market data. Don't hold a connection open
+    # while Yahoo is queried; read the user id first so the rollback doesn't
+    # cost a refresh
+    user_id = current_user.id
+    db.rollback()
     validated_data = await validate_ticker(symbol)
 
-    # Create new ticker with validated data
-    new_ticker = TickerModel(
-        symbol=symbol,
-        name=validated_data['name'],
-        type=validated_data['type']
-    )
-
-    db.add(new_ticker)
-    db.commit()
-    db.refresh(new_ticker)
-
-    # Add ticker to user's list
-    current_user.tickers.append(new_ticker)
+    # Create the ticker and add it to the user's list in one transaction
+    new_ticker = insert_ticker(db, symbol, validated_data['name'], validated_data['type'])
+    create_empty_summaries(db, [new_ticker.id])
+    add_user_ticker(db, user_id, new_ticker.id)
     db.commit()
 
     return new_ticker
 
 
 @router.delete("/remove/{symbol}")
+@query_budget(3)
 async def remove_ticker_from_dashboard(
         symbol: str,
         current_user: UserModel = Depends(get_current_active_user),
@@ -107,7 +125,7 @@ async def remove_ticker_from_dashboard(
     symbol = symbol.upper()
 
     # Find the ticker
-    ticker = db.query(TickerModel).filter(TickerModel.symbol == symbol).first()
+    ticker = ticker_by_symbol(db, symbol)
 
     if not ticker:
         raise HTTPException(
@@ -115,15 +133,13 @@ async def remove_ticker_from_dashboard(
             detail=f"Ticker {symbol} not found"
         )
 
-    # Check if user has this ticker
-    if ticker not in current_user.tickers:
+    # Remove ticker from user's dashboard; nothing to delete means they didn't have it
+    if not remove_user_ticker(db, current_user.id, ticker.id):
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Ticker {symbol} is not in your dashboard"
         )
-
-    # Remove ticker from user's dashboard
-    current_user.tickers.remove(ticker)
     db.commit()
 
     return {
@@ -132,24 +148,102 @@ async def remove_ticker_from_dashboard(
     }
 
 
+def _check_bulk_size(symbols: List[str]):
+    if len(symbols) > settings.WATCHLIST_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.WATCHLIST_MAX_SYMBOLS} symbols per request"
+        )
+
+
+async def _add_symbols(db: Session, user_id: int, symbols: List[str]):
+    try:
+        return await add_symbols(db, user_id, symbols)
+    except IntegrityError:
+        # Another request added one of these tickers or links in the meantime
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Your list changed while adding; please retry"
+        )
+
+
+@router.post("/bulk", response_model=List[BulkTickerResult])
+@query_budget(6)
+async def add_tickers_bulk(
+        request: BulkTickerRequest,
+        current_user: UserModel = Depends(get_current_active_user),
+        db: Session = Depends(get_db)
+):
+    """
+    Add many tickers to user's dashboard at once.
+    Unknown symbols are validated and created; each symbol gets a status of
+    added, created, exists or invalid.
+    """
+    symbols = normalize_symbols(request.symbols)
+    _check_bulk_size(symbols)
+    return await _add_symbols(db, current_user.id, symbols)
+
+
+@router.post("/import", response_model=List[BulkTickerResult])
+@query_budget(6)
+async def import_watchlist(
+        file: UploadFile = File(..., description="CSV with a symbol column, or one symbol per line"),
+        current_user: UserModel = Depends(get_current_active_user),
+        db: Session = Depends(get_db)
+):
+    """Add the tickers listed in a CSV file to user's dashboard"""
+    max_bytes = (settings.WATCHLIST_MAX_SYMBOLS + 1) * IMPORT_MAX_ROW_BYTES
+    content = await file.read(max_bytes + 1)
+    if len(content) > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"CSV larger than {max_bytes} bytes"
+        )
+    try:
+        symbols = normalize_symbols(parse_symbols_csv(content))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not read CSV: {e}"
+        )
+    _check_bulk_size(symbols)
+    return await _add_symbols(db, current_user.id, symbols)
+
+
+@router.get("/export")
+@query_budget(2)
+async def export_watchlist(
+        current_user: UserModel = Depends(get_current_active_user),
+        db: Session = Depends(get_db)
+):
+    """Download user's tickers as CSV"""
+    return Response(
+        content=watchlist_csv(db, current_user.id),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="watchlist.csv"'}
+    )
+
+
 @router.get("/all", response_model=List[Ticker])
+@query_budget(1)
 async def get_all_tickers(
         db: Session = Depends(get_db),
         skip: int = 0,
         limit: int = 100
 ):
     """Get all available tickers in the system"""
-    tickers = db.query(TickerModel).offset(skip).limit(limit).all()
-    return tickers
+    return ticker_rows(db, skip, limit)
 
 
 @router.get("/search/{symbol}", response_model=Ticker)
+@query_budget(1)
 async def get_ticker_by_symbol(
         symbol: str,
         db: Session = Depends(get_db)
 ):
     """Get ticker information by symbol"""
-    ticker = db.query(TickerModel).filter(TickerModel.symbol == symbol.upper()).first()
+    ticker = ticker_by_symbol(db, symbol.upper())
 
     if not ticker:
         raise HTTPException(
@@ -157,4 +251,149 @@ async def get_ticker_by_symbol(
             detail=f"Ticker {symbol} not found"
         )
 
-    return ticker
\ No newline at end of file
+    return ticker
+
+
+@router.get("/{symbol}/prices", response_model=PriceSeries)
+@query_budget(2)
+async def get_ticker_prices(
+        symbol: str,
+        interval: str = Query('1d', description=f"Bar size: {', '.join(INTERVAL_LOOKBACK)}"),
+        start: Optional[datetime] = Query(None),
+        end: Optional[datetime] = Query(None),
+        db: Session = Depends(get_db),
+        current_user: UserModel = Depends(get_current_active_user)
+):
+    """Get OHLCV bars for a ticker from the price cache"""
+    symbol = symbol.upper()
+
+    if interval not in INTERVAL_LOOKBACK:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid interval {interval}. Use one of: {', '.join(INTERVAL_LOOKBACK)}"
+        )
+
+    ticker = ticker_by_symbol(db, symbol)
+    if not ticker:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Ticker {symbol} not found"
+        )
+
+    # Cache misses download from Yahoo, so keep them off the event loop
+    bars = await run_in_threadpool(get_price_service().get_prices, symbol, interval, as_utc(start), as_utc(end))
+    if bars is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No price data available for {symbol}"
+        )
+
+    return PriceSeries(
+        symbol=symbol,
+        interval=interval,
+        timestamps=bars['ts'].tolist(),
+        **{column: _nan_to_none(bars[column]) for column in PRICE_COLUMNS}
+    )
+
+
+def _nan_to_none(values: np.ndarray) -> list:
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def _check_indicator_request(name: str, interval: str):
+    if name not in INDICATORS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown indicator {name}. Available: {', '.join(INDICATORS)}"
+        )
+    if interval not in INTERVAL_LOOKBACK:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid interval {interval}. Use one of: {', '.join(INTERVAL_LOOKBACK)}"
+        )
+
+
+@router.get("/indicators/{name}/latest", response_model=IndicatorSnapshot)
+@query_budget(1)
+async def get_indicator_snapshot(
+        name: str,
+        symbols: str = Query(..., description="Comma-separated symbols"),
+        interval: str = Query('1d'),
+        period: Optional[int] = Query(None, ge=2, le=500),
+        fast: Optional[int] = Query(None, ge=2, le=500),
+        slow: Optional[int] = Query(None, ge=2, le=500),
+        signal: Optional[int] = Query(None, ge=2, le=500),
+        std: Optional[float] = Query(None, gt=0, le=10),
+        current_user: UserModel = Depends(get_current_active_user)
+):
+    """Get the latest value of an indicator for many cached symbols at once"""
+    _check_indicator_request(name, interval)
+    params = resolve_params(name, {'period': period, 'fast': fast, 'slow': slow, 'signal': signal, 'std': std})
+    symbol_list = normalize_symbols(symbols.split(','))
+    if len(symbol_list) > settings.INDICATOR_SNAPSHOT_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.INDICATOR_SNAPSHOT_MAX_SYMBOLS} symbols per request"
+        )
+
+    values = await run_in_threadpool(
+        get_indicator_engine().compute_universe, symbol_list, interval, name, params
+    )
+    return IndicatorSnapshot(interval=interval, indicator=name, params=params, values=values)
+
+
+@router.get("/{symbol}/indicators/{name}", response_model=IndicatorSeries)
+@query_budget(2)
+async def get_ticker_indicator(
+        symbol: str,
+        name: str,
+        interval: str = Query('1d'),
+        start: Optional[datetime] = Query(None),
+        end: Optional[datetime] = Query(None),
+        period: Optional[int] = Query(None, ge=2, le=500),
+        fast: Optional[int] = Query(None, ge=2, le=500),
+        slow: Optional[int] = Query(None, ge=2, le=500),
+        signal: Optional[int] = Query(None, ge=2, le=500),
+        std: Optional[float] = Query(None, gt=0, le=10),
+        db: Session = Depends(get_db),
+        current_user: UserModel = Depends(get_current_active_user)
+):
+    """Get a technical indicator (sma, ema, rsi, macd, bollinger, volatility) for a ticker"""
+    symbol = symbol.upper()
+    _check_indicator_request(name, interval)
+
+    ticker = ticker_by_symbol(db, symbol)
+    if not ticker:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Ticker {symbol} not found"
+        )
+
+    params = resolve_params(name, {'period': period, 'fast': fast, 'slow': slow, 'signal': signal, 'std': std})
+
+    def compute():
+        # Make sure the series is cached before computing over it
+        if get_price_service().get_prices(symbol, interval) is None:
+            return None
+        return get_indicator_engine().get(symbol, interval, name, params)
+
+    result = await run_in_threadpool(compute)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No price data available for {symbol}"
+        )
+
+    # Indicators are computed over full history so warm-up is correct; slice afterwards
+    ts = result.pop('ts')
+    lo = 0 if start is None else int(np.searchsorted(ts, int(as_utc(start).timestamp()), side='left'))
+    hi = len(ts) if end is None else int(np.searchsorted(ts, int(as_utc(end).timestamp()), side='left'))
+
+    return IndicatorSeries(
+        symbol=symbol,
+        interval=interval,
+        indicator=name,
+        params=params,
+        timestamps=ts[lo:hi].tolist(),
+        values={k: _nan_to_none(v[lo:hi]) for k, v in result.items()}
+    )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 
@@ -69,6 +69,17 @@ class RemoveTickerRequest(BaseModel):
     symbol: str
 
 
+class BulkTickerRequest(BaseModel):
+    symbols: List[str]
+
+
+class BulkTickerResult(BaseModel):
+    symbol: str
+    status: str  # 'added', 'created', 'exists' or 'invalid'
+    detail: Optional[str] = None
+    ticker: Optional[Ticker] = None
+
+
 # Token Schemas
 class Token(BaseModel):
     access_token: str
@@ -126,4 +137,115 @@ class TickerDashboardData(BaseModel):
     news_sources_count: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class SentimentBucket(BaseModel):
+    bucket: datetime
+    article_count: int
+    providers_count: int
+    mean_sentiment: Optional[float] = None
+    weighted_sentiment: Optional[float] = None
+    provider_disagreement: Optional[float] = None
+    insight_count: int
+    insight_sentiment: Optional[float] = None
+    insight_confidence: Optional[float] = None
+
+
+class ProviderSentimentBucket(BaseModel):
+    bucket: datetime
+    provider: str
+    article_count: int
+    mean_sentiment: Optional[float] = None
+
+
+class TickerSentimentRollup(BaseModel):
+    ticker_symbol: str
+    bucket_size: str
+    start: datetime
+    end: datetime
+    buckets: List[SentimentBucket]
+    providers: List[ProviderSentimentBucket]
+
+
+class NewsSearchResult(NewsArticleSchema):
+    ticker_symbol: str
+    rank: float
+    snippet: Optional[str] = None
+
+
+class PriceSeries(BaseModel):
+    """Columnar OHLCV bars; timestamps are epoch seconds (UTC)"""
+    symbol: str
+    interval: str
+    timestamps: List[int]
+    open: List[Optional[float]]
+    high: List[Optional[float]]
+    low: List[Optional[float]]
+    close: List[Optional[float]]
+    volume: List[Optional[float]]
+
+
+class IndicatorSeries(BaseModel):
+    """Columnar indicator values aligned with `timestamps` (epoch seconds, UTC)"""
+    symbol: str
+    interval: str
+    indicator: str
+    params: Dict[str, float]
+    timestamps: List[int]
+    values: Dict[str, List[Optional[float]]]
+
+
+class IndicatorSnapshot(BaseModel):
+    """Latest indicator values for many symbols"""
+    interval: str
+    indicator: str
+    params: Dict[str, float]
+    values: Dict[str, Dict[str, Optional[float]]]
+
+
+class SentimentPriceCorrelationSchema(BaseModel):
+    provider: str
+    horizon_days: int
+    window_days: int
+    n_obs: int
+    correlation: Optional[float] = None
+    rolling_correlation: Optional[float] = None
+    positive_events: int
+    positive_event_return: Optional[float] = None
+    negative_events: int
+    negative_event_return: Optional[float] = None
+    computed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class JobSchema(BaseModel):
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class RefreshTimingSchema(BaseModel):
+    trace_id: str
+    started_at: datetime
+    total_ms: float
+    fetch_ms: float
+    dedupe_ms: float
+    db_ms: float
+    llm_ms: float
+    provider_ms: Optional[Dict[str, float]] = None
+    articles_fetched: int
+    articles_saved: int
+    status: str
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,206 @@
+"""
+Circuit breakers and hedged calls for external news providers.
+
+A breaker tracks the last BREAKER_WINDOW calls to a provider. Calls that
+raise or take longer than BREAKER_SLOW_CALL_SECONDS count as failures. Once
+at least BREAKER_MIN_CALLS are recorded and the failure rate reaches
+BREAKER_FAILURE_RATE, the breaker opens and calls are skipped for
+BREAKER_OPEN_SECONDS. It then goes half-open: a limited number of probe calls
+go through, and the first result either closes the breaker or reopens it.
+
+Breakers are per process. Workers publish snapshots to `provider_health` so
+the API can report on all of them.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.errors import describe_error
+from app.models import ProviderHealth
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_rate: Optional[float] = None, min_calls: Optional[int] = None,
+                 window: Optional[int] = None, slow_call_seconds: Optional[float] = None,
+                 open_seconds: Optional[float] = None, half_open_calls: Optional[int] = None):
+        self.name = name
+        self.failure_rate = failure_rate or settings.BREAKER_FAILURE_RATE
+        self.min_calls = min_calls or settings.BREAKER_MIN_CALLS
+        self.slow_call_seconds = slow_call_seconds or settings.BREAKER_SLOW_CALL_SECONDS
+        self.open_seconds = open_seconds or settings.BREAKER_OPEN_SECONDS
+        self.half_open_calls = half_open_calls or settings.BREAKER_HALF_OPEN_CALLS
+
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.total_calls = 0
+        self.rejected_calls = 0
+        self._outcomes = deque(maxlen=window or settings.BREAKER_WINDOW)  # (ok, latency)
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; counts a probe slot when half-open"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    self.rejected_calls += 1
+                    return False
+                self.state = HALF_OPEN
+                self._probes = 0
+
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    self.rejected_calls += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def record(self, ok: bool, latency: float, error: Optional[str] = None):
+        ok = ok and latency <= self.slow_call_seconds
+        with self._lock:
+            self.total_calls += 1
+            self._outcomes.append((ok, latency))
+            if not ok:
+                self.last_error = error or f"Slow call ({latency:.1f}s)"
+
+            if self.state == HALF_OPEN:
+                if ok:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._trip()
+            elif self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for outcome, _ in self._outcomes if not outcome)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._trip()
+
+    def _trip(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        print(f"Circuit breaker for {self.name} opened: {self.last_error}")
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Run `func` through the breaker; raises CircuitOpenError when skipped"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        start = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record(False, time.monotonic() - start, describe_error(e))
+            raise
+        self.record(True, time.monotonic() - start)
+        return result
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            latencies = [latency for _, latency in self._outcomes]
+            failures = sum(1 for ok, _ in self._outcomes if not ok)
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+            return {
+                'state': self.state,
+                'recent_calls': len(self._outcomes),
+                'failure_rate': failures / len(self._outcomes) if self._outcomes else 0.0,
+                'p50_latency': float(np.percentile(latencies, 50)) if latencies else None,
+                'p95_latency': float(np.percentile(latencies, 95)) if latencies else None,
+                'total_calls': self.total_calls,
+                'rejected_calls': self.rejected_calls,
+                'retry_in_seconds': retry_in,
+                'last_error': self.last_error,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def breaker_states() -> Dict[str, Dict]:
+    return {name: breaker.snapshot() for name, breaker in sorted(_breakers.items())}
+
+
+_hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+
+
+def hedged(func: Callable, *args, delay: float, timeout: float, attempts: int = 2):
+    """
+    Call `func`, starting a duplicate call each time `delay` passes without
+    a result, up to `attempts` calls in total. Returns the first successful
+    result and raises the last error if every call fails, or TimeoutError
+    after `timeout`. Late calls finish in the background and are ignored.
+    """
+    if delay <= 0:
+        attempts = 1
+    deadline = time.monotonic() + timeout
+    pending = {_hedge_pool.submit(func, *args)}
+    started = 1
+    last_error: Optional[BaseException] = None
+
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        wait_for = min(delay, remaining) if started < attempts else remaining
+        done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            last_error = future.exception()
+        if started < attempts and (not done or not pending):
+            pending.add(_hedge_pool.submit(func, *args))
+            started += 1
+
+    if last_error is not None and not pending:
+        raise last_error
+    raise TimeoutError(f"No result within {timeout:.1f}s")
+
+
+def publish_breaker_states(db: Session, instance: str):
+    """Store this process's breaker snapshots for the health endpoint"""
+    now = datetime.now(timezone.utc)
+    for name, snapshot in breaker_states().items():
+        row = db.get(ProviderHealth, (name, instance))
+        if row is None:
+            row = ProviderHealth(provider=name, instance=instance)
+            db.add(row)
+        row.state = snapshot['state']
+        row.snapshot = snapshot
+        row.updated_at = now
+    db.commit()
+
+
+def provider_health(db: Session, max_age_minutes: int = 5) -> List[Dict]:
+    """Recent breaker snapshots from all processes"""
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=max_age_minutes)
+    rows = db.query(ProviderHealth).filter(ProviderHealth.updated_at >= cutoff).order_by(
+        ProviderHealth.provider, ProviderHealth.instance
+    ).all()
+    return [
+        {'provider': row.provider, 'instance': row.instance, 'updated_at': row.updated_at, **row.snapshot}
+        for row in rows
+    ]
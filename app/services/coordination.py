@@ -0,0 +1,160 @@
+"""
+Coordination between processes that all run the scheduler.
+
+A lease is a row in `scheduler_leases` naming a job, the process that owns
+it and when the claim expires. Claiming is one conditional UPDATE, or an
+INSERT for a lease never seen before, so it is atomic on Postgres and on
+SQLite, where every local process shares the same database file.
+
+Interval jobs claim a lease a little shorter than their interval and keep
+it after finishing. Replicas whose timers fire later in the same period see
+the claim and skip; the first one to fire after it expires runs the next
+period. A live claim cannot be renewed, not even by its owner.
+
+Ticker shards are separate jobs with separate leases. Each process running
+them keeps a `member:<instance>` row fresh, and shard k is assigned to the
+k-th live member (modulo their count, sorted by id), so the shards split
+evenly across processes. The shard lease still guards the run, which covers
+the handover when processes join or leave.
+"""
+
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+from sqlalchemy import true
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import SchedulerLease
+from app.metrics import SCHEDULER_JOB_SECONDS, SCHEDULER_JOB_RUNS
+
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Share of the job interval a run holds its lease for
+LEASE_FRACTION = 0.9
+
+MEMBER_PREFIX = "member:"
+
+
+def acquire_lease(db: Session, name: str, ttl_seconds: float, owner: str = INSTANCE_ID) -> bool:
+    """Claim `name` if it is free or expired"""
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(seconds=ttl_seconds)
+
+    claimed = db.query(SchedulerLease).filter(
+        SchedulerLease.name == name,
+        SchedulerLease.expires_at <= now
+    ).update(
+        {'owner': owner, 'acquired_at': now, 'expires_at': expires_at},
+        synchronize_session=False
+    )
+    if claimed:
+        db.commit()
+        return True
+
+    # Either nobody has claimed it yet or another process holds it
+    try:
+        db.add(SchedulerLease(name=name, owner=owner, acquired_at=now, expires_at=expires_at))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+
+def release_lease(db: Session, name: str, owner: str = INSTANCE_ID):
+    db.query(SchedulerLease).filter(
+        SchedulerLease.name == name,
+        SchedulerLease.owner == owner
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+def claim(db: Session, name: str, ttl_seconds: float) -> bool:
+    """Whether this process should do the work for `name` this period"""
+    if settings.SCHEDULER_MODE != 'lease':
+        return True
+    return acquire_lease(db, name, ttl_seconds)
+
+
+def run_exclusive(name: str, ttl_seconds: float, func: Callable, *args, **kwargs):
+    """Run a scheduled job only if this process wins its lease"""
+    db = SessionLocal()
+    try:
+        won = claim(db, name, ttl_seconds)
+    except Exception as e:
+        print(f"Error claiming lease {name}: {e}")
+        won = False
+    finally:
+        db.close()
+
+    if not won:
+        SCHEDULER_JOB_RUNS.labels(name, 'skipped').inc()
+        return None
+
+    SCHEDULER_JOB_RUNS.labels(name, 'ran').inc()
+    with SCHEDULER_JOB_SECONDS.labels(name).time():
+        return func(*args, **kwargs)
+
+
+def heartbeat(db: Session, ttl_seconds: float, owner: str = INSTANCE_ID):
+    """Mark `owner` as a live member for `ttl_seconds`"""
+    now = datetime.now(timezone.utc)
+    name = f"{MEMBER_PREFIX}{owner}"
+    values = {'owner': owner, 'acquired_at': now, 'expires_at': now + timedelta(seconds=ttl_seconds)}
+
+    if not db.query(SchedulerLease).filter(SchedulerLease.name == name).update(values, synchronize_session=False):
+        db.add(SchedulerLease(name=name, **values))
+    # Members that stopped a day ago are not coming back under the same id
+    db.query(SchedulerLease).filter(
+        SchedulerLease.name.like(f"{MEMBER_PREFIX}%"),
+        SchedulerLease.expires_at < now - timedelta(days=1)
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+def live_members(db: Session) -> List[str]:
+    now = datetime.now(timezone.utc)
+    return sorted(owner for (owner,) in db.query(SchedulerLease.owner).filter(
+        SchedulerLease.name.like(f"{MEMBER_PREFIX}%"),
+        SchedulerLease.expires_at > now
+    ).all())
+
+
+def shard_assignee(db: Session, shard: int) -> Optional[str]:
+    """The live member that should run `shard`, or None if there are none"""
+    members = live_members(db)
+    return members[shard % len(members)] if members else None
+
+
+def run_shard(name: str, ttl_seconds: float, func: Callable, shard: int, shards: int, **kwargs):
+    """run_exclusive for one of `shards` shard jobs, skipped unless the shard is assigned to us"""
+    if settings.SCHEDULER_MODE == 'lease' and shards > 1:
+        db = SessionLocal()
+        try:
+            # Two lease periods, so one late tick does not drop us from the members
+            heartbeat(db, 2 * ttl_seconds)
+            assignee = shard_assignee(db, shard)
+        except Exception as e:
+            print(f"Error checking shard assignment for {name}: {e}")
+            assignee = None
+        finally:
+            db.close()
+
+        if assignee is not None and assignee != INSTANCE_ID:
+            SCHEDULER_JOB_RUNS.labels(name, 'skipped').inc()
+            return None
+
+    return run_exclusive(name, ttl_seconds, func, shard=shard, shards=shards, **kwargs)
+
+
+def in_shard(column, shard: int, shards: int):
+    """Filter on an integer id column for one of `shards` buckets"""
+    if shards <= 1:
+        return true()
+    return column % shards == shard
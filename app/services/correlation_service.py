@@ -0,0 +1,181 @@
+"""
+Price-sentiment correlation analytics.
+
+For every ticker, daily sentiment series (per news provider, all providers
+combined, and AI insight verdicts) are aligned with forward returns from the
+daily price cache. Per (ticker, provider, horizon) the job computes:
+
+- the full-sample correlation of sentiment with the forward return,
+- the correlation over the latest rolling window,
+- event-study averages: the mean forward return after strongly positive and
+  strongly negative sentiment days.
+
+Tickers are processed in batches; within a batch each statistic is a single
+column-wise operation over a (days x tickers) matrix. Results replace the
+previous rows in `sentiment_price_correlations`.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Ticker, SentimentPriceCorrelation
+from app.services.price_service import PriceCache, get_price_service
+from app.services.sentiment_analytics import load_articles, load_insights, insight_sentiment_scores
+
+ALL_PROVIDERS = 'all'
+AI_INSIGHT = 'ai_insight'
+
+
+def close_matrix(cache: PriceCache, symbols: Dict[int, str]) -> pd.DataFrame:
+    """Daily closes as a (trading day x ticker_id) matrix"""
+    columns = {}
+    for ticker_id, symbol in symbols.items():
+        bars = cache.read_range(symbol, '1d')
+        if bars is None or not len(bars['ts']):
+            continue
+        days = pd.to_datetime(bars['ts'], unit='s', utc=True).normalize()
+        columns[ticker_id] = pd.Series(bars['close'], index=days)
+    if not columns:
+        return pd.DataFrame()
+    frame = pd.DataFrame(columns).sort_index()
+    return frame[~frame.index.duplicated(keep='last')]
+
+
+def forward_returns(closes: pd.DataFrame, horizon: int) -> pd.DataFrame:
+    """Return from the close of day t to the close of day t + horizon"""
+    return closes.shift(-horizon) / closes - 1.0
+
+
+def sentiment_matrices(articles: pd.DataFrame, insights: pd.DataFrame,
+                       trading_days: pd.DatetimeIndex) -> Dict[str, pd.DataFrame]:
+    """
+    Mean sentiment per provider as (trading day x ticker_id) matrices.
+    News published on a non-trading day counts towards the next session.
+    """
+    frames = []
+    scored = articles[articles['sentiment_score'].notna()]
+    if not scored.empty:
+        frames.append(scored[['ticker_id', 'provider', 'published_at', 'sentiment_score']].rename(
+            columns={'published_at': 'at', 'sentiment_score': 'score'}))
+        frames.append(frames[-1].assign(provider=ALL_PROVIDERS))
+    if not insights.empty:
+        frames.append(pd.DataFrame({
+            'ticker_id': insights['ticker_id'],
+            'provider': AI_INSIGHT,
+            'at': insights['created_at'],
+            'score': insight_sentiment_scores(insights['sentiment']),
+        }).dropna(subset=['score']))
+    if not frames or not len(trading_days):
+        return {}
+
+    events = pd.concat(frames, ignore_index=True)
+    positions = np.searchsorted(trading_days.values, events['at'].dt.normalize().values, side='left')
+    in_range = positions < len(trading_days)
+    events = events[in_range].assign(day=trading_days[positions[in_range]])
+
+    daily = events.groupby(['provider', 'day', 'ticker_id'])['score'].mean()
+    return {
+        provider: daily.loc[provider].unstack('ticker_id').reindex(trading_days)
+        for provider in daily.index.get_level_values('provider').unique()
+    }
+
+
+def columnwise_corr(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    """Pearson correlation of matching columns over rows where both are present"""
+    mask = a.notna() & b.notna()
+    a = a.where(mask)
+    b = b.where(mask)
+    n = mask.sum()
+    a_centered = a - a.mean()
+    b_centered = b - b.mean()
+    cov = (a_centered * b_centered).sum()
+    denom = np.sqrt((a_centered ** 2).sum() * (b_centered ** 2).sum())
+    corr = (cov / denom).where((n > 2) & (denom > 0))
+    return pd.DataFrame({'correlation': corr, 'n_obs': n})
+
+
+def analyze_batch(sentiment: pd.DataFrame, returns: pd.DataFrame, window: int, threshold: float) -> pd.DataFrame:
+    """All statistics for one provider and horizon, one row per ticker_id"""
+    returns = returns.reindex(columns=sentiment.columns)
+    stats = columnwise_corr(sentiment, returns)
+
+    rolling = sentiment.rolling(window, min_periods=max(5, window // 3)).corr(returns)
+    stats['rolling_correlation'] = rolling.ffill().iloc[-1] if len(rolling) else np.nan
+
+    positive = sentiment >= threshold
+    negative = sentiment <= -threshold
+    valid = returns.notna()
+    stats['positive_events'] = (positive & valid).sum()
+    stats['positive_event_return'] = returns.where(positive).mean()
+    stats['negative_events'] = (negative & valid).sum()
+    stats['negative_event_return'] = returns.where(negative).mean()
+    return stats
+
+
+def _none_if_nan(value) -> Optional[float]:
+    return None if value is None or pd.isna(value) else float(value)
+
+
+def compute_correlations(db: Session, ticker_ids: Optional[List[int]] = None,
+                         cache: Optional[PriceCache] = None) -> int:
+    """Recompute and persist correlation analytics; returns rows written"""
+    cache = cache or get_price_service().cache
+    query = db.query(Ticker.id, Ticker.symbol)
+    if ticker_ids is not None:
+        query = query.filter(Ticker.id.in_(ticker_ids))
+    symbols = dict(query.order_by(Ticker.id).all())
+
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=settings.CORRELATION_LOOKBACK_DAYS)
+    window = settings.CORRELATION_WINDOW_DAYS
+    threshold = settings.CORRELATION_EVENT_THRESHOLD
+    written = 0
+
+    ids = list(symbols)
+    for i in range(0, len(ids), settings.CORRELATION_BATCH_SIZE):
+        batch = {tid: symbols[tid] for tid in ids[i:i + settings.CORRELATION_BATCH_SIZE]}
+        closes = close_matrix(cache, batch)
+        if closes.empty:
+            continue
+        closes = closes[closes.index >= pd.Timestamp(start).normalize()]
+
+        matrices = sentiment_matrices(
+            load_articles(db, list(batch), start, end),
+            load_insights(db, list(batch), start, end),
+            closes.index
+        )
+
+        rows = []
+        for horizon in settings.CORRELATION_HORIZONS:
+            returns = forward_returns(closes, horizon)
+            for provider, sentiment in matrices.items():
+                stats = analyze_batch(sentiment, returns, window, threshold)
+                for ticker_id, row in stats.iterrows():
+                    rows.append(SentimentPriceCorrelation(
+                        ticker_id=int(ticker_id),
+                        provider=provider,
+                        horizon_days=horizon,
+                        window_days=window,
+                        n_obs=int(row['n_obs']),
+                        correlation=_none_if_nan(row['correlation']),
+                        rolling_correlation=_none_if_nan(row['rolling_correlation']),
+                        positive_events=int(row['positive_events']),
+                        positive_event_return=_none_if_nan(row['positive_event_return']),
+                        negative_events=int(row['negative_events']),
+                        negative_event_return=_none_if_nan(row['negative_event_return']),
+                    ))
+
+        # Replace the batch's previous results in one transaction
+        db.query(SentimentPriceCorrelation).filter(
+            SentimentPriceCorrelation.ticker_id.in_(list(batch))
+        ).delete(synchronize_session=False)
+        db.add_all(rows)
+        db.commit()
+        written += len(rows)
+
+    return written
@@ -0,0 +1,235 @@
+"""
+Near-duplicate detection for news articles.
+
+The same story syndicated through several providers usually arrives with a
+slightly different title and a URL carrying tracking parameters. Articles are
+matched on a normalized URL first, then on MinHash signatures of their
+title + summary shingles. Signatures are split into LSH bands whose hashes are
+stored in `article_lsh_buckets`, so finding candidates is an indexed lookup
+rather than a scan of the archive.
+"""
+
+import hashlib
+import re
+import zlib
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import NewsArticle, ArticleFingerprint, ArticleLSHBucket
+
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+SUMMARY_CHARS = 300
+
+# Query parameters that identify the referrer, not the article
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'guccounter',
+    'guce_referrer', 'guce_referrer_sig', 'ncid', 'yptr', 'soc_src', 'soc_trk',
+    'cmpid', 'ref', 'src', 'taid', 'siteid', 'partner', 'feed',
+}
+TRACKING_PREFIXES = ('utm_', '.tsrc', 'itm_')
+
+# Fixed seed: signatures are persisted, so the permutations must never change
+_PRIME = np.uint64(4294967311)
+_rng = np.random.RandomState(20240501)
+_PERM_A = _rng.randint(1, 2 ** 31 - 1, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, 2 ** 31 - 1, size=NUM_PERM).astype(np.uint64)
+
+_NON_WORD = re.compile(r'[^a-z0-9 ]+')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of an article URL for exact-match dedupe"""
+    if not url:
+        return ''
+
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    for prefix in ('www.', 'm.', 'amp.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=False)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip('/') or '/'
+    if path.endswith('/amp'):
+        path = path[:-4] or '/'
+
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def shingles(title: str, summary: Optional[str]) -> Set[int]:
+    """Hashed character shingles of the normalized title + start of summary"""
+    text = f"{title or ''} {(summary or '')[:SUMMARY_CHARS]}".lower()
+    text = _SPACES.sub(' ', _NON_WORD.sub(' ', text)).strip()
+    if len(text) < SHINGLE_SIZE:
+        return {zlib.crc32(text.encode())} if text else set()
+    return {
+        zlib.crc32(text[i:i + SHINGLE_SIZE].encode())
+        for i in range(len(text) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash(shingle_hashes: Set[int]) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint32 values) of a shingle set"""
+    if not shingle_hashes:
+        return np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint32)
+    hashes = np.fromiter(shingle_hashes, dtype=np.uint64, count=len(shingle_hashes))
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def signature_for(article: Dict) -> np.ndarray:
+    return minhash(shingles(article.get('title', ''), article.get('summary')))
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+def lsh_keys(signature: np.ndarray) -> List[int]:
+    """One signed 64-bit key per band (band index is mixed into the hash)"""
+    keys = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()
+        digest = hashlib.blake2b(bytes([band]) + chunk, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
+
+
+class MinHashLSH:
+    """In-memory LSH index, used to dedupe a single fetch batch"""
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = threshold if threshold is not None else settings.DEDUPE_SIMILARITY_THRESHOLD
+        self.buckets: Dict[int, List[int]] = {}
+        self.signatures: List[np.ndarray] = []
+
+    def query(self, signature: np.ndarray) -> Optional[int]:
+        """Return the index of a near-duplicate already in the index"""
+        candidates = set()
+        for key in lsh_keys(signature):
+            candidates.update(self.buckets.get(key, ()))
+        for idx in sorted(candidates):
+            if similarity(signature, self.signatures[idx]) >= self.threshold:
+                return idx
+        return None
+
+    def insert(self, signature: np.ndarray) -> int:
+        idx = len(self.signatures)
+        self.signatures.append(signature)
+        for key in lsh_keys(signature):
+            self.buckets.setdefault(key, []).append(idx)
+        return idx
+
+
+def dedupe_batch(articles: List[Dict]) -> List[Dict]:
+    """
+    Drop articles with a title, normalized URL or MinHash signature seen
+    earlier in the list, keeping the first occurrence. Each kept article gets 'normalized_url' and 'signature' keys
+    so the save step does not have to recompute them.
+    """
+    unique = []
+    seen_urls = set()
+    seen_titles = set()
+    lsh = MinHashLSH()
+
+    for article in articles:
+        title = (article.get('title') or '').strip().lower()
+        if title and title in seen_titles:
+            continue
+
+        normalized = normalize_url(article.get('url', ''))
+        if normalized and normalized in seen_urls:
+            continue
+
+        signature = signature_for(article)
+        if lsh.query(signature) is not None:
+            continue
+
+        lsh.insert(signature)
+        seen_urls.add(normalized)
+        seen_titles.add(title)
+        unique.append({**article, 'normalized_url': normalized, 'signature': signature})
+
+    return unique
+
+
+def find_duplicate(db: Session, ticker_id: int, normalized_url: str, signature: np.ndarray) -> Optional[int]:
+    """Return the id of a stored near-duplicate article for this ticker, if any"""
+    if normalized_url:
+        match = db.query(ArticleFingerprint.article_id).filter(
+            ArticleFingerprint.normalized_url == normalized_url
+        ).first()
+        if match:
+            return match[0]
+
+    candidate_ids = [
+        article_id for (article_id,) in db.query(ArticleLSHBucket.article_id).filter(
+            ArticleLSHBucket.ticker_id == ticker_id,
+            ArticleLSHBucket.lsh_key.in_(lsh_keys(signature))
+        ).distinct().all()
+    ]
+    if not candidate_ids:
+        return None
+
+    threshold = settings.DEDUPE_SIMILARITY_THRESHOLD
+    for article_id, stored in db.query(ArticleFingerprint.article_id, ArticleFingerprint.signature).filter(
+            ArticleFingerprint.article_id.in_(candidate_ids)
+    ).all():
+        if similarity(signature, np.frombuffer(stored, dtype=np.uint32)) >= threshold:
+            return article_id
+    return None
+
+
+def index_article(db: Session, article_id: int, ticker_id: int, normalized_url: str, signature: np.ndarray):
+    """Persist an article's fingerprint and LSH band keys"""
+    db.add(ArticleFingerprint(
+        article_id=article_id,
+        ticker_id=ticker_id,
+        normalized_url=normalized_url,
+        signature=signature.tobytes()
+    ))
+    db.add_all([
+        ArticleLSHBucket(article_id=article_id, ticker_id=ticker_id, lsh_key=key)
+        for key in set(lsh_keys(signature))
+    ])
+
+
+def backfill_fingerprints(db: Session, batch_size: int = 1000) -> int:
+    """Index articles stored before fingerprinting existed"""
+    indexed = 0
+    while True:
+        rows = db.query(
+            NewsArticle.id, NewsArticle.ticker_id, NewsArticle.url, NewsArticle.title, NewsArticle.summary
+        ).outerjoin(
+            ArticleFingerprint, ArticleFingerprint.article_id == NewsArticle.id
+        ).filter(ArticleFingerprint.article_id.is_(None)).order_by(NewsArticle.id).limit(batch_size).all()
+
+        if not rows:
+            return indexed
+
+        for article_id, ticker_id, url, title, summary in rows:
+            index_article(db, article_id, ticker_id, normalize_url(url), minhash(shingles(title, summary)))
+        db.commit()
+        indexed += len(rows)
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(f"Indexed {backfill_fingerprints(db)} articles")
+    finally:
+        db.close()
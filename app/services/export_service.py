@@ -0,0 +1,189 @@
+"""
+Columnar export of sentiment time series for backtesting.
+
+Writes `news_articles` and `ai_insights` to Parquet datasets partitioned by
+ticker and month (hive layout, e.g. `news_articles/ticker=AAPL/month=2024-05/`).
+Exports are incremental: the highest exported row id per table is kept in a
+small state file next to the data, and each run only appends newer rows.
+
+Run manually with:
+    python -m app.services.export_service
+"""
+
+import json
+import os
+import uuid
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Ticker, NewsArticle, AIInsight
+from app.timeutils import as_utc
+
+STATE_FILE = "_export_state.json"
+
+ARTICLE_SCHEMA = pa.schema([
+    ("article_id", pa.int64()),
+    ("ticker", pa.string()),
+    ("news_provider", pa.string()),
+    ("source", pa.string()),
+    ("published_at", pa.timestamp("us", tz="UTC")),
+    ("sentiment_score", pa.float64()),
+    ("month", pa.string()),
+])
+
+INSIGHT_SCHEMA = pa.schema([
+    ("insight_id", pa.int64()),
+    ("ticker", pa.string()),
+    ("insight_type", pa.string()),
+    ("sentiment", pa.string()),
+    ("confidence_score", pa.float64()),
+    ("sources_analyzed", pa.int64()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+    ("month", pa.string()),
+])
+
+
+class SentimentExportService:
+    def __init__(self, export_dir: Optional[str] = None, batch_size: Optional[int] = None):
+        self.export_dir = export_dir or settings.EXPORT_DIR
+        self.batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+        os.makedirs(self.export_dir, exist_ok=True)
+
+    def _state_path(self) -> str:
+        return os.path.join(self.export_dir, STATE_FILE)
+
+    def load_state(self) -> Dict[str, int]:
+        """Return the last exported id for each table"""
+        try:
+            with open(self._state_path()) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_state(self, state: Dict[str, int]):
+        # Write-then-rename so a crash never leaves a truncated state file
+        tmp_path = self._state_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._state_path())
+
+    def _write_batch(self, table_name: str, table: pa.Table, run_token: str, batch_no: int):
+        ds.write_dataset(
+            table,
+            base_dir=os.path.join(self.export_dir, table_name),
+            format="parquet",
+            partitioning=["ticker", "month"],
+            partitioning_flavor="hive",
+            basename_template=f"part-{run_token}-{batch_no}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    def _export(self, table_name: str, query, schema: pa.Schema, to_columns) -> int:
+        state = self.load_state()
+        run_token = uuid.uuid4().hex[:12]
+        exported = 0
+        batch: List[tuple] = []
+        batch_no = 0
+
+        def flush():
+            nonlocal exported, batch_no
+            table = pa.Table.from_pydict(to_columns(batch), schema=schema)
+            self._write_batch(table_name, table, run_token, batch_no)
+            # Rows are streamed in id order, so the last row is the new watermark
+            state[table_name] = batch[-1][0]
+            self._save_state(state)
+            exported += len(batch)
+            batch_no += 1
+            batch.clear()
+
+        last_id = state.get(table_name, 0)
+        for row in query(last_id).yield_per(self.batch_size):
+            batch.append(tuple(row))
+            if len(batch) >= self.batch_size:
+                flush()
+        if batch:
+            flush()
+
+        return exported
+
+    def export_articles(self, db: Session) -> int:
+        """Append news articles newer than the last export"""
+        def query(last_id):
+            return db.query(
+                NewsArticle.id,
+                Ticker.symbol,
+                NewsArticle.news_provider,
+                NewsArticle.source,
+                NewsArticle.published_at,
+                NewsArticle.sentiment_score,
+            ).join(Ticker, Ticker.id == NewsArticle.ticker_id).filter(
+                NewsArticle.id > last_id
+            ).order_by(NewsArticle.id)
+
+        def to_columns(rows):
+            ids, symbols, providers, sources, published, scores = zip(*rows)
+            published = [as_utc(p) for p in published]
+            return {
+                "article_id": ids,
+                "ticker": symbols,
+                "news_provider": providers,
+                "source": sources,
+                "published_at": published,
+                "sentiment_score": scores,
+                "month": [p.strftime("%Y-%m") for p in published],
+            }
+
+        return self._export("news_articles", query, ARTICLE_SCHEMA, to_columns)
+
+    def export_insights(self, db: Session) -> int:
+        """Append AI insights newer than the last export"""
+        def query(last_id):
+            return db.query(
+                AIInsight.id,
+                Ticker.symbol,
+                AIInsight.insight_type,
+                AIInsight.sentiment,
+                AIInsight.confidence_score,
+                AIInsight.sources_analyzed,
+                AIInsight.created_at,
+            ).join(Ticker, Ticker.id == AIInsight.ticker_id).filter(
+                AIInsight.id > last_id
+            ).order_by(AIInsight.id)
+
+        def to_columns(rows):
+            ids, symbols, types, sentiments, confidences, sources, created = zip(*rows)
+            created = [as_utc(c) for c in created]
+            return {
+                "insight_id": ids,
+                "ticker": symbols,
+                "insight_type": types,
+                "sentiment": sentiments,
+                "confidence_score": confidences,
+                "sources_analyzed": sources,
+                "created_at": created,
+                "month": [c.strftime("%Y-%m") for c in created],
+            }
+
+        return self._export("ai_insights", query, INSIGHT_SCHEMA, to_columns)
+
+    def export_all(self, db: Session) -> Dict[str, int]:
+        """Run an incremental export of both tables"""
+        return {
+            "news_articles": self.export_articles(db),
+            "ai_insights": self.export_insights(db),
+        }
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        counts = SentimentExportService().export_all(db)
+        print(f"Exported {counts['news_articles']} articles and {counts['ai_insights']} insights")
+    finally:
+        db.close()
@@ -0,0 +1,294 @@
+"""
+Technical indicators over cached price series.
+
+Every kernel takes a 2-D close matrix (bars x symbols) and works on whole
+columns at once, so a single call covers one symbol or the whole universe
+with no Python loop per bar. Rolling windows use pandas' rolling kernels and
+exponential averages use `ewm(adjust=False)`, both implemented in C over the
+NumPy buffers.
+
+`IndicatorEngine` memoizes results by (symbol, interval, indicator, params).
+When new bars arrive only the tail is recomputed: windowed indicators rerun
+over the last `lookback` bars, and exponential ones resume from the
+averages stored at the last stable bar.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.price_service import PriceCache, get_price_service
+
+TRADING_DAYS = 252
+
+
+def _rolling(values: np.ndarray, window: int):
+    # pandas is imported on first use, not when the API process starts
+    import pandas as pd
+    return pd.DataFrame(values).rolling(window, min_periods=window)
+
+
+def _ewm(values: np.ndarray, alpha: float, prev: Optional[np.ndarray] = None, min_periods: int = 0) -> np.ndarray:
+    """Exponential average down each column, optionally resuming from `prev`"""
+    import pandas as pd
+    if prev is not None:
+        # Seeding with the previous average reproduces the recursion exactly
+        stacked = np.vstack([prev[None, :], values])
+        return pd.DataFrame(stacked).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+    return pd.DataFrame(values).ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean().to_numpy()
+
+
+class Indicator:
+    name = ''
+    outputs: Tuple[str, ...] = ()
+    state: Tuple[str, ...] = ()  # extra columns needed to resume exponential averages
+    exponential = False  # updates resume from the previous row instead of a window
+    defaults: Dict[str, float] = {}
+
+    def lookback(self, params: Dict) -> int:
+        """Bars before the first recomputed bar that an update needs"""
+        return 0
+
+    def compute(self, close: np.ndarray, params: Dict, prev: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        raise NotImplementedError
+
+
+class SMA(Indicator):
+    name = 'sma'
+    outputs = ('sma',)
+    defaults = {'period': 20}
+
+    def lookback(self, params):
+        return int(params['period']) - 1
+
+    def compute(self, close, params, prev=None):
+        return {'sma': _rolling(close, int(params['period'])).mean().to_numpy()}
+
+
+class EMA(Indicator):
+    name = 'ema'
+    exponential = True
+    outputs = ('ema',)
+    defaults = {'period': 20}
+
+    def compute(self, close, params, prev=None):
+        alpha = 2.0 / (params['period'] + 1)
+        seed = prev['ema'] if prev else None
+        return {'ema': _ewm(close, alpha, seed, min_periods=int(params['period']))}
+
+
+class RSI(Indicator):
+    """Wilder's RSI: smoothed average gain / loss with alpha = 1/period"""
+    name = 'rsi'
+    exponential = True
+    outputs = ('rsi',)
+    state = ('avg_gain', 'avg_loss')
+    defaults = {'period': 14}
+
+    def lookback(self, params):
+        return 1
+
+    def compute(self, close, params, prev=None):
+        period = int(params['period'])
+        delta = np.diff(close, axis=0, prepend=np.nan)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        gain[np.isnan(delta)] = np.nan
+        loss[np.isnan(delta)] = np.nan
+
+        if prev:
+            # The first row only supplies the previous close for the diff
+            avg_gain = np.vstack([prev['avg_gain'][None, :], _ewm(gain[1:], 1.0 / period, prev['avg_gain'])])
+            avg_loss = np.vstack([prev['avg_loss'][None, :], _ewm(loss[1:], 1.0 / period, prev['avg_loss'])])
+        else:
+            avg_gain = _ewm(gain, 1.0 / period, min_periods=period)
+            avg_loss = _ewm(loss, 1.0 / period, min_periods=period)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        rsi = np.where((avg_loss == 0) & (avg_gain > 0), 100.0, rsi)
+        return {'rsi': rsi, 'avg_gain': avg_gain, 'avg_loss': avg_loss}
+
+
+class MACD(Indicator):
+    name = 'macd'
+    exponential = True
+    outputs = ('macd', 'signal', 'histogram')
+    state = ('ema_fast', 'ema_slow')
+    defaults = {'fast': 12, 'slow': 26, 'signal': 9}
+
+    def compute(self, close, params, prev=None):
+        fast, slow, signal = int(params['fast']), int(params['slow']), int(params['signal'])
+        ema_fast = _ewm(close, 2.0 / (fast + 1), prev['ema_fast'] if prev else None, min_periods=fast)
+        ema_slow = _ewm(close, 2.0 / (slow + 1), prev['ema_slow'] if prev else None, min_periods=slow)
+        macd = ema_fast - ema_slow
+        signal_line = _ewm(macd, 2.0 / (signal + 1), prev['signal'] if prev else None, min_periods=signal)
+        return {
+            'macd': macd,
+            'signal': signal_line,
+            'histogram': macd - signal_line,
+            'ema_fast': ema_fast,
+            'ema_slow': ema_slow,
+        }
+
+
+class Bollinger(Indicator):
+    name = 'bollinger'
+    outputs = ('middle', 'upper', 'lower')
+    defaults = {'period': 20, 'std': 2.0}
+
+    def lookback(self, params):
+        return int(params['period']) - 1
+
+    def compute(self, close, params, prev=None):
+        rolling = _rolling(close, int(params['period']))
+        middle = rolling.mean().to_numpy()
+        width = params['std'] * rolling.std(ddof=0).to_numpy()
+        return {'middle': middle, 'upper': middle + width, 'lower': middle - width}
+
+
+class Volatility(Indicator):
+    """Annualized rolling standard deviation of log returns"""
+    name = 'volatility'
+    outputs = ('volatility',)
+    defaults = {'period': 20, 'annualization': TRADING_DAYS}
+
+    def lookback(self, params):
+        return int(params['period'])
+
+    def compute(self, close, params, prev=None):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_returns = np.diff(np.log(close), axis=0, prepend=np.nan)
+        std = _rolling(log_returns, int(params['period'])).std().to_numpy()
+        return {'volatility': std * np.sqrt(params['annualization'])}
+
+
+INDICATORS: Dict[str, Indicator] = {
+    indicator.name: indicator
+    for indicator in (SMA(), EMA(), RSI(), MACD(), Bollinger(), Volatility())
+}
+
+
+def resolve_params(name: str, overrides: Optional[Dict] = None) -> Dict:
+    """Indicator defaults updated with any non-None overrides"""
+    params = dict(INDICATORS[name].defaults)
+    params.update({k: v for k, v in (overrides or {}).items() if v is not None and k in params})
+    return params
+
+
+class _Memo:
+    __slots__ = ('ts', 'last_close', 'values')
+
+    def __init__(self, ts: np.ndarray, last_close: float, values: Dict[str, np.ndarray]):
+        self.ts = ts
+        self.last_close = last_close
+        self.values = values
+
+
+class IndicatorEngine:
+    def __init__(self, cache: Optional[PriceCache] = None, max_entries: Optional[int] = None):
+        self.cache = cache or PriceCache()
+        self.max_entries = max_entries or settings.INDICATOR_MEMO_SIZE
+        self._memo: "OrderedDict[tuple, _Memo]" = OrderedDict()
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: tuple, memo: _Memo):
+        self._memo[key] = memo
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.max_entries:
+            self._memo.popitem(last=False)
+
+    def compute_series(self, key: tuple, ts: np.ndarray, close: np.ndarray,
+                       name: str, params: Dict) -> Dict[str, np.ndarray]:
+        """
+        Indicator values for one series, reusing the memo for `key` when the
+        cached history is a prefix of `ts`. The last cached bar is always
+        recomputed since it may have been a partial bar.
+        """
+        indicator = INDICATORS[name]
+        memo = self._memo.get(key)
+        n = len(ts)
+
+        if memo is not None and n and len(memo.ts) == n and memo.ts[-1] == ts[-1] \
+                and memo.last_close == close[-1]:
+            self.hits += 1
+            self._memo.move_to_end(key)
+            return memo.values
+
+        start = len(memo.ts) - 1 if memo is not None else 0
+        resumable = (
+            memo is not None and start > indicator.lookback(params) and n > start
+            and np.array_equal(memo.ts[:start], ts[:start])
+        )
+        prev = None
+        if resumable and indicator.exponential:
+            prev = {k: memo.values[k][start - 1:start] for k in memo.values}
+            # Still warming up: exponential state is not defined yet
+            if any(np.isnan(v).any() for v in prev.values()):
+                resumable = False
+
+        if resumable:
+            self.partial_hits += 1
+            lo = start - indicator.lookback(params)
+            tail = indicator.compute(close[lo:, None], params, prev)
+            values = {
+                k: np.concatenate([memo.values[k][:start], v[start - lo:, 0]])
+                for k, v in tail.items()
+            }
+        else:
+            self.misses += 1
+            values = {k: v[:, 0] for k, v in indicator.compute(close[:, None], params).items()}
+
+        self._remember(key, _Memo(np.array(ts, copy=True), float(close[-1]) if n else np.nan, values))
+        return values
+
+    def get(self, symbol: str, interval: str, name: str, params: Dict) -> Optional[Dict[str, np.ndarray]]:
+        """Full indicator history for a cached symbol, keyed by output name plus 'ts'"""
+        bars = self.cache.read_range(symbol, interval)
+        if bars is None:
+            return None
+
+        key = (symbol.upper(), interval, name, tuple(sorted(params.items())))
+        values = self.compute_series(key, bars['ts'], bars['close'].astype(np.float64), name, params)
+        result = {k: values[k] for k in INDICATORS[name].outputs}
+        result['ts'] = bars['ts']
+        return result
+
+    def compute_universe(self, symbols: List[str], interval: str, name: str, params: Dict) -> Dict[str, Dict[str, float]]:
+        """
+        Latest indicator values for many symbols. Symbols with identical bar
+        timestamps (one exchange calendar) are stacked into a matrix and each
+        kernel runs once per group, so every symbol is computed over its own
+        bars and the result matches `get` for that symbol.
+        """
+        groups: Dict[bytes, tuple] = {}
+        for symbol in symbols:
+            bars = self.cache.read_range(symbol, interval)
+            if bars is not None and len(bars['ts']):
+                _, members, closes = groups.setdefault(bars['ts'].tobytes(), (bars['ts'], [], []))
+                members.append(symbol.upper())
+                closes.append(bars['close'].astype(np.float64))
+
+        indicator = INDICATORS[name]
+        latest = {}
+        for _, members, closes in groups.values():
+            values = indicator.compute(np.column_stack(closes), params)
+            for output in indicator.outputs:
+                for symbol, value in zip(members, values[output][-1]):
+                    latest.setdefault(symbol, {})[output] = None if np.isnan(value) else float(value)
+        return latest
+
+
+_indicator_engine: Optional[IndicatorEngine] = None
+
+
+def get_indicator_engine() -> IndicatorEngine:
+    """Process-wide engine so the memo is shared between requests"""
+    global _indicator_engine
+    if _indicator_engine is None:
+        _indicator_engine = IndicatorEngine(get_price_service().cache)
+    return _indicator_engine
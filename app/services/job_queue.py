@@ -0,0 +1,139 @@
+"""
+Database-backed job queue.
+
+Producers (the API and the scheduler) insert rows into `jobs`; workers claim
+them one at a time. A claim selects candidates with FOR UPDATE SKIP LOCKED on
+Postgres and then flips the row from queued to running with a conditional
+UPDATE, so two workers never run the same job. On SQLite the conditional
+UPDATE alone is atomic.
+
+Failed jobs are retried with exponential backoff up to `max_attempts`.
+Running jobs whose worker died are requeued once they exceed
+JOB_TIMEOUT_MINUTES.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Job
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+RETRY_BASE_SECONDS = 30
+
+
+def enqueue(db: Session, kind: str, payload: Optional[Dict] = None, dedupe_key: Optional[str] = None,
+            priority: int = 0, run_after: Optional[datetime] = None) -> Job:
+    """
+    Add a job. If `dedupe_key` matches a job that is still queued or running,
+    that job is returned instead (with its priority raised if needed).
+    """
+    if dedupe_key:
+        existing = _open_job(db, dedupe_key)
+        if existing:
+            return _raise_priority(db, existing, priority)
+
+    job = Job(
+        kind=kind,
+        payload=payload or {},
+        dedupe_key=dedupe_key,
+        status=QUEUED,
+        priority=priority,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        run_after=run_after or datetime.now(timezone.utc),
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another producer queued the same key between our check and insert
+        db.rollback()
+        existing = _open_job(db, dedupe_key) if dedupe_key else None
+        if existing is None:
+            raise
+        return _raise_priority(db, existing, priority)
+    return job
+
+
+def _open_job(db: Session, dedupe_key: str) -> Optional[Job]:
+    return db.query(Job).filter(
+        Job.dedupe_key == dedupe_key,
+        Job.status.in_([QUEUED, RUNNING])
+    ).first()
+
+
+def _raise_priority(db: Session, job: Job, priority: int) -> Job:
+    if priority > job.priority:
+        job.priority = priority
+        db.commit()
+    return job
+
+
+def claim_next(db: Session, worker_id: str, kinds: Optional[List[str]] = None) -> Optional[Job]:
+    """Mark the next runnable job as running for `worker_id` and return it"""
+    now = datetime.now(timezone.utc)
+    query = db.query(Job.id).filter(Job.status == QUEUED, Job.run_after <= now)
+    if kinds:
+        query = query.filter(Job.kind.in_(kinds))
+    candidates = query.order_by(Job.priority.desc(), Job.id).limit(10).with_for_update(skip_locked=True).all()
+
+    for (job_id,) in candidates:
+        claimed = db.query(Job).filter(Job.id == job_id, Job.status == QUEUED).update(
+            {'status': RUNNING, 'locked_by': worker_id, 'locked_at': now, 'attempts': Job.attempts + 1},
+            synchronize_session=False
+        )
+        if claimed:
+            db.commit()
+            return db.get(Job, job_id)
+
+    db.commit()
+    return None
+
+
+def complete(db: Session, job: Job):
+    job.status = DONE
+    job.finished_at = datetime.now(timezone.utc)
+    job.locked_by = None
+    db.commit()
+
+
+def fail(db: Session, job: Job, error: str):
+    """Requeue with backoff, or mark failed once attempts are used up"""
+    now = datetime.now(timezone.utc)
+    job.last_error = error[:2000]
+    job.locked_by = None
+    if job.attempts >= job.max_attempts:
+        job.status = FAILED
+        job.finished_at = now
+    else:
+        job.status = QUEUED
+        job.run_after = now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+    db.commit()
+
+
+def requeue_stale(db: Session, timeout_minutes: Optional[int] = None) -> int:
+    """Release running jobs older than JOB_TIMEOUT_MINUTES, e.g. from a dead worker"""
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=timeout_minutes or settings.JOB_TIMEOUT_MINUTES)
+    stale = db.query(Job).filter(Job.status == RUNNING, Job.locked_at < cutoff).all()
+    for job in stale:
+        fail(db, job, f"Timed out on worker {job.locked_by}")
+    return len(stale)
+
+
+def purge_finished(db: Session, days: Optional[int] = None) -> int:
+    """Delete done and failed jobs older than JOB_RETENTION_DAYS"""
+    days = settings.JOB_RETENTION_DAYS if days is None else days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    deleted = db.query(Job).filter(
+        Job.status.in_([DONE, FAILED]),
+        Job.finished_at < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
@@ -1,167 +1,228 @@
-import yfinance as yf
-import anthropic
-import requests
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
+from functools import wraps
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import List, Dict, Optional
 import os
+from app.config import settings
 from app.models import Ticker, NewsArticle, AIInsight
+from app.services import summary_service
+from app.services import dedupe
+from app.errors import describe_error
+from app.services.circuit_breaker import get_breaker, hedged
+from app.timeutils import as_utc
+from app.tracing import span, traced, current_span
+from app.metrics import (
+    PROVIDER_FETCH_SECONDS, PROVIDER_FETCH_ERRORS, PROVIDER_FETCH_SKIPPED,
+    LLM_REQUEST_SECONDS, LLM_TOKENS, LLM_ERRORS
+)
+
+
+def provider_call(provider: str, key_attr: Optional[str] = None):
+    """
+    Run a fetch_* method through the provider's circuit breaker. Errors are
+    logged and turned into an empty result; providers that are disabled in
+    NEWS_PROVIDERS or have no API key are skipped without touching the breaker.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, ticker_symbol: str) -> List[Dict]:
+            if provider not in settings.NEWS_PROVIDERS:
+                return []
+            if key_attr and not getattr(self, key_attr):
+                return []
+            breaker = get_breaker(provider)
+            if not breaker.allow():
+                PROVIDER_FETCH_SKIPPED.labels(provider).inc()
+                return []
+
+            start = time.monotonic()
+            try:
+                with span(f"fetch.{provider}", provider=provider, ticker=ticker_symbol) as s:
+                    result = func(self, ticker_symbol)
+                    s.set_attribute('articles', len(result))
+            except Exception as e:
+                elapsed = time.monotonic() - start
+                error = describe_error(e)
+                breaker.record(False, elapsed, error)
+                PROVIDER_FETCH_SECONDS.labels(provider).observe(elapsed)
+                PROVIDER_FETCH_ERRORS.labels(provider).inc()
+                print(f"Error fetching {provider} news for {ticker_symbol}: {error}")
+                return []
+            elapsed = time.monotonic() - start
+            breaker.record(True, elapsed)
+            PROVIDER_FETCH_SECONDS.labels(provider).observe(elapsed)
+            return result
+        return wrapper
+    return decorator
+
+
+def _http_get(url: str, params: Dict):
+    import requests
+    return requests.get(url, params=params, timeout=settings.PROVIDER_TIMEOUT_SECONDS)
 
 
 class NewsService:
     def __init__(self):
-        self.anthropic_client = anthropic.Anthropic(
-            api_key=os.getenv("ANTHROPIC_API_KEY")
-        )
+        self._anthropic_client = None
         self.alphavantage_key = os.getenv("ALPHAVANTAGE_API_KEY")
         self.finnhub_key = os.getenv("FINNHUB_API_KEY")
         self.marketaux_key = os.getenv("MARKETAUX_API_KEY")
 
+    @property
+    def anthropic_client(self):
+        # yfinance, anthropic and requests are imported on first use; they
+        # add seconds to cold starts of processes that never call them
+        if self._anthropic_client is None:
+            import anthropic
+            self._anthropic_client = anthropic.Anthropic(
+                api_key=os.getenv("ANTHROPIC_API_KEY"),
+                base_url=settings.ANTHROPIC_BASE_URL or None
+            )
+        return self._anthropic_client
+
+    @provider_call('yfinance')
     def fetch_yfinance_news(self, ticker_symbol: str) -> List[Dict]:
         """Fetch news from Yahoo Finance"""
-        try:
-            ticker = yf.Ticker(ticker_symbol)
-            news = ticker.news
-
-            parsed_news = []
-            for article in news[:10]:
-                parsed_news.append({
-                    'title': article.get('title', ''),
-                    'summary': article.get('summary', ''),
-                    'url': article.get('link', ''),
-                    'source': article.get('publisher', ''),
-                    'provider': 'yfinance',
-                    'published_at': datetime.fromtimestamp(article.get('providerPublishTime', 0)),
-                    'sentiment': None
-                })
-            return parsed_news
-        except Exception as e:
-            print(f"Error fetching yfinance news for {ticker_symbol}: {e}")
-            return []
+        import yfinance as yf
 
-    def fetch_alphavantage_news(self, ticker_symbol: str) -> List[Dict]:
-        """Fetch news from Alpha Vantage with sentiment"""
-        if not self.alphavantage_key:
-            return []
+        # Hedged: a second request starts if the first is slow, first answer wins
+        news = hedged(
+            lambda: yf.Ticker(ticker_symbol).news,
+            delay=settings.YFINANCE_HEDGE_SECONDS,
+            timeout=settings.PROVIDER_TIMEOUT_SECONDS
+        )
 
-        try:
-            url = "https://www.alphavantage.co/query"
-            params = {
-                'function': 'NEWS_SENTIMENT',
-                'tickers': ticker_symbol,
-                'apikey': self.alphavantage_key,
-                'limit': 50
-            }
+        parsed_news = []
+        for article in news[:10]:
+            parsed_news.append({
+                'title': article.get('title', ''),
+                'summary': article.get('summary', ''),
+                'url': article.get('link', ''),
+                'source': article.get('publisher', ''),
+                'provider': 'yfinance',
+                'published_at': datetime.fromtimestamp(article.get('providerPublishTime', 0), tz=timezone.utc),
+                'sentiment': None
+            })
+        return parsed_news
 
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+    @provider_call('alphavantage', 'alphavantage_key')
+    def fetch_alphavantage_news(self, ticker_symbol: str) -> List[Dict]:
+        """Fetch news from Alpha Vantage with sentiment"""
+        url = settings.ALPHAVANTAGE_URL
+        params = {
+            'function': 'NEWS_SENTIMENT',
+            'tickers': ticker_symbol,
+            'apikey': self.alphavantage_key,
+            'limit': 50
+        }
 
-            if 'feed' not in data:
-                return []
+        response = _http_get(url, params)
+        response.raise_for_status()
+        data = response.json()
 
-            parsed_news = []
-            for article in data['feed'][:10]:
-                sentiment_score = None
-                for ticker_sentiment in article.get('ticker_sentiment', []):
-                    if ticker_sentiment.get('ticker') == ticker_symbol:
-                        sentiment_score = float(ticker_sentiment.get('ticker_sentiment_score', 0))
-                        break
-
-                parsed_news.append({
-                    'title': article.get('title', ''),
-                    'summary': article.get('summary', ''),
-                    'url': article.get('url', ''),
-                    'source': article.get('source', ''),
-                    'provider': 'alphavantage',
-                    'published_at': datetime.strptime(article.get('time_published', ''), '%Y%m%dT%H%M%S'),
-                    'sentiment': sentiment_score
-                })
-            return parsed_news
-        except Exception as e:
-            print(f"Error fetching Alpha Vantage news: {e}")
+        if 'feed' not in data:
+            # Rate limits and key errors come back as 200 with a message instead of a feed
+            message = data.get('Note') or data.get('Information') or data.get('Error Message')
+            if message:
+                raise RuntimeError(message)
             return []
 
+        parsed_news = []
+        for article in data['feed'][:10]:
+            sentiment_score = None
+            for ticker_sentiment in article.get('ticker_sentiment', []):
+                if ticker_sentiment.get('ticker') == ticker_symbol:
+                    sentiment_score = float(ticker_sentiment.get('ticker_sentiment_score', 0))
+                    break
+
+            parsed_news.append({
+                'title': article.get('title', ''),
+                'summary': article.get('summary', ''),
+                'url': article.get('url', ''),
+                'source': article.get('source', ''),
+                'provider': 'alphavantage',
+                'published_at': datetime.strptime(
+                    article.get('time_published', ''), '%Y%m%dT%H%M%S'
+                ).replace(tzinfo=timezone.utc),  # Alpha Vantage times are UTC
+                'sentiment': sentiment_score
+            })
+        return parsed_news
+
+    @provider_call('finnhub', 'finnhub_key')
     def fetch_finnhub_news(self, ticker_symbol: str) -> List[Dict]:
         """Fetch news from Finnhub"""
-        if not self.finnhub_key:
-            return []
-
-        try:
-            from_date = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-            to_date = datetime.now().strftime('%Y-%m-%d')
-
-            url = "https://finnhub.io/api/v1/company-news"
-            params = {
-                'symbol': ticker_symbol,
-                'from': from_date,
-                'to': to_date,
-                'token': self.finnhub_key
-            }
+        from_date = (datetime.now(timezone.utc) - timedelta(days=7)).strftime('%Y-%m-%d')
+        to_date = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+        url = settings.FINNHUB_URL
+        params = {
+            'symbol': ticker_symbol,
+            'from': from_date,
+            'to': to_date,
+            'token': self.finnhub_key
+        }
 
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
-
-            parsed_news = []
-            for article in data[:10]:
-                parsed_news.append({
-                    'title': article.get('headline', ''),
-                    'summary': article.get('summary', ''),
-                    'url': article.get('url', ''),
-                    'source': article.get('source', ''),
-                    'provider': 'finnhub',
-                    'published_at': datetime.fromtimestamp(article.get('datetime', 0)),
-                    'sentiment': None
-                })
-            return parsed_news
-        except Exception as e:
-            print(f"Error fetching Finnhub news: {e}")
-            return []
+        response = _http_get(url, params)
+        response.raise_for_status()
+        data = response.json()
+
+        parsed_news = []
+        for article in data[:10]:
+            parsed_news.append({
+                'title': article.get('headline', ''),
+                'summary': article.get('summary', ''),
+                'url': article.get('url', ''),
+                'source': article.get('source', ''),
+                'provider': 'finnhub',
+                'published_at': datetime.fromtimestamp(article.get('datetime', 0), tz=timezone.utc),
+                'sentiment': None
+            })
+        return parsed_news
 
+    @provider_call('marketaux', 'marketaux_key')
     def fetch_marketaux_news(self, ticker_symbol: str) -> List[Dict]:
         """Fetch news from Marketaux with sentiment"""
-        if not self.marketaux_key:
-            return []
-
-        try:
-            url = "https://api.marketaux.com/v1/news/all"
-            params = {
-                'symbols': ticker_symbol,
-                'filter_entities': 'true',
-                'language': 'en',
-                'api_token': self.marketaux_key,
-                'limit': 10
-            }
-
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+        url = settings.MARKETAUX_URL
+        params = {
+            'symbols': ticker_symbol,
+            'filter_entities': 'true',
+            'language': 'en',
+            'api_token': self.marketaux_key,
+            'limit': 10
+        }
 
-            if 'data' not in data:
-                return []
+        response = _http_get(url, params)
+        response.raise_for_status()
+        data = response.json()
 
-            parsed_news = []
-            for article in data['data']:
-                sentiment_score = None
-                for entity in article.get('entities', []):
-                    if entity.get('symbol') == ticker_symbol:
-                        sentiment = entity.get('sentiment_score')
-                        if sentiment:
-                            sentiment_score = float(sentiment)
-                        break
-
-                parsed_news.append({
-                    'title': article.get('title', ''),
-                    'summary': article.get('description', ''),
-                    'url': article.get('url', ''),
-                    'source': article.get('source', ''),
-                    'provider': 'marketaux',
-                    'published_at': datetime.fromisoformat(article.get('published_at', '').replace('Z', '+00:00')),
-                    'sentiment': sentiment_score
-                })
-            return parsed_news
-        except Exception as e:
-            print(f"Error fetching Marketaux news: {e}")
+        if 'data' not in data:
+            if 'error' in data:
+                raise RuntimeError(data['error'])
             return []
 
+        parsed_news = []
+        for article in data['data']:
+            sentiment_score = None
+            for entity in article.get('entities', []):
+                if entity.get('symbol') == ticker_symbol:
+                    sentiment = entity.get('sentiment_score')
+                    if sentiment:
+                        sentiment_score = float(sentiment)
+                    break
+
+            parsed_news.append({
+                'title': article.get('title', ''),
+                'summary': article.get('description', ''),
+                'url': article.get('url', ''),
+                'source': article.get('source', ''),
+                'provider': 'marketaux',
+                'published_at': as_utc(datetime.fromisoformat(article.get('published_at', '').replace('Z', '+00:00'))),
+                'sentiment': sentiment_score
+            })
+        return parsed_news
+
+    @traced('fetch_all_news')
     def fetch_all_news(self, ticker_symbol: str) -> List[Dict]:
         """Fetch news from all available sources"""
         all_news = []
@@ -172,17 +233,13 @@ class NewsService:
 
         all_news.sort(key=lambda x: x['published_at'], reverse=True)
 
-        # Remove duplicates
-        unique_news = []
-        seen_titles = set()
-        for article in all_news:
-            title_lower = article['title'].lower()
-            if title_lower not in seen_titles:
-                seen_titles.add(title_lower)
-                unique_news.append(article)
+        # Remove exact and near-duplicates (syndicated stories, tracking URLs)
+        with span('dedupe', articles=len(all_news)):
+            unique_news = dedupe.dedupe_batch(all_news)
 
         return unique_news[:20]
 
+    @traced('analyze_news_with_ai')
     def analyze_news_with_ai(self, ticker_symbol: str, news_articles: List[Dict]) -> Dict:
         """Use Claude to analyze news articles from multiple sources"""
         sources_context = {}
@@ -222,12 +279,24 @@ Be objective. Highlight disagreements. Avoid hype.
 
 Format as JSON: summary, sentiment, sentiment_reasoning, short_term_impact, long_term_impact, risks, opportunities, source_agreement, confidence_score"""
 
+        model = "claude-sonnet-4-20250514"
         try:
-            message = self.anthropic_client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=1500,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            start = time.monotonic()
+            try:
+                message = self.anthropic_client.messages.create(
+                    model=model,
+                    max_tokens=1500,
+                    messages=[{"role": "user", "content": prompt}]
+                )
+            except Exception:
+                LLM_ERRORS.labels(model).inc()
+                raise
+            finally:
+                LLM_REQUEST_SECONDS.labels(model).observe(time.monotonic() - start)
+            LLM_TOKENS.labels(model, 'input').inc(message.usage.input_tokens)
+            LLM_TOKENS.labels(model, 'output').inc(message.usage.output_tokens)
+            current_span().set_attribute('input_tokens', message.usage.input_tokens)
+            current_span().set_attribute('output_tokens', message.usage.output_tokens)
 
             response_text = message.content[0].text
 
@@ -262,13 +331,24 @@ Format as JSON: summary, sentiment, sentiment_reasoning, short_term_impact, long
 
         print(f"Found {len(news_articles)} articles for {ticker_symbol}")
 
-        saved_count = 0
-        for article in news_articles:
-            existing = db.query(NewsArticle).filter(
-                NewsArticle.url == article['url']
-            ).first()
+        with span('db.save_articles', articles=len(news_articles)) as save_span:
+            # news_articles is already deduped within the batch, so each one is
+            # only checked against stored rows
+            saved_articles = []
+            new_rows = []
+            for article in news_articles:
+                existing = db.query(NewsArticle.id).filter(
+                    NewsArticle.url == article['url']
+                ).first()
+                if existing:
+                    continue
+
+                duplicate_of = dedupe.find_duplicate(
+                    db, ticker_id, article['normalized_url'], article['signature']
+                )
+                if duplicate_of:
+                    continue
 
-            if not existing:
                 news_obj = NewsArticle(
                     ticker_id=ticker_id,
                     title=article['title'],
@@ -280,10 +360,18 @@ Format as JSON: summary, sentiment, sentiment_reasoning, short_term_impact, long
                     sentiment_score=article.get('sentiment')
                 )
                 db.add(news_obj)
-                saved_count += 1
+                new_rows.append(news_obj)
+                saved_articles.append(article)
+
+            # One flush assigns every new id, then the fingerprints go in together
+            db.flush()
+            for news_obj, article in zip(new_rows, saved_articles):
+                dedupe.index_article(db, news_obj.id, ticker_id, article['normalized_url'], article['signature'])
 
-        db.commit()
-        print(f"Saved {saved_count} new articles")
+            summary_service.apply_articles(db, ticker_id, saved_articles)
+            db.commit()
+            save_span.set_attribute('saved', len(saved_articles))
+        print(f"Saved {len(saved_articles)} new articles")
 
         ai_analysis = self.analyze_news_with_ai(ticker_symbol, news_articles)
         sources_count = len(set(a['provider'] for a in news_articles))
@@ -322,6 +410,8 @@ Format as JSON: summary, sentiment, sentiment_reasoning, short_term_impact, long
             confidence_score=ai_analysis.get('confidence_score', 0) / 100.0,
             sources_analyzed=sources_count
         )
-        db.add(insight)
-        db.commit()
+        with span('db.save_insight'):
+            db.add(insight)
+            summary_service.apply_insight(db, ticker_id, insight.sentiment, datetime.now(timezone.utc))
+            db.commit()
         print(f"Saved AI insight for {ticker_symbol}")
\ No newline at end of file
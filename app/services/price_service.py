@@ -0,0 +1,213 @@
+"""
+OHLCV price bars with a columnar on-disk cache.
+
+Each (symbol, interval) series is one Arrow IPC file under PRICE_CACHE_DIR.
+Files are memory-mapped on read, so serving a range is a binary search on
+the timestamp column plus zero-copy slices. Updates download only the bars
+after the last cached one, many symbols per `yf.download` call.
+"""
+
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+
+from app.config import settings
+from app.metrics import PRICE_CACHE_LOOKUPS
+
+# Supported intervals -> how far back to go when a series is first fetched.
+# Yahoo only serves limited history for intraday bars.
+INTERVAL_LOOKBACK = {
+    '1d': timedelta(days=365 * 5),
+    '1wk': timedelta(days=365 * 10),
+    '1h': timedelta(days=700),
+    '15m': timedelta(days=59),
+    '5m': timedelta(days=59),
+    '1m': timedelta(days=7),
+}
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+PRICE_SCHEMA = pa.schema(
+    [('ts', pa.int64())] + [(c, pa.float64()) for c in PRICE_COLUMNS]
+)
+
+
+class PriceCache:
+    """Arrow IPC file per (symbol, interval), written atomically, read via mmap"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or settings.PRICE_CACHE_DIR
+        self._locks: Dict[tuple, threading.Lock] = defaultdict(threading.Lock)
+
+    def path(self, symbol: str, interval: str) -> str:
+        safe_symbol = symbol.upper().replace('/', '_')
+        return os.path.join(self.cache_dir, interval, f"{safe_symbol}.arrow")
+
+    def load(self, symbol: str, interval: str) -> Optional[pa.Table]:
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+        # The mapping stays alive as long as the returned table references it
+        return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+    def last_timestamp(self, symbol: str, interval: str) -> Optional[int]:
+        table = self.load(symbol, interval)
+        if table is None or table.num_rows == 0:
+            return None
+        return table.column('ts')[-1].as_py()
+
+    def write(self, symbol: str, interval: str, table: pa.Table):
+        path = self.path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, PRICE_SCHEMA) as writer:
+                writer.write_table(table)
+        # Readers holding the old mapping keep a valid file until they close it
+        os.replace(tmp_path, path)
+
+    def merge(self, symbol: str, interval: str, new_bars: pa.Table) -> int:
+        """Replace cached bars from the first new timestamp onward; returns rows added"""
+        if new_bars.num_rows == 0:
+            return 0
+
+        with self._locks[(symbol.upper(), interval)]:
+            existing = self.load(symbol, interval)
+            if existing is None or existing.num_rows == 0:
+                self.write(symbol, interval, new_bars)
+                return new_bars.num_rows
+
+            first_new = new_bars.column('ts')[0].as_py()
+            ts = existing.column('ts').to_numpy()
+            keep = int(np.searchsorted(ts, first_new, side='left'))
+            merged = pa.concat_tables([existing.slice(0, keep), new_bars]).combine_chunks()
+            self.write(symbol, interval, merged)
+            return merged.num_rows - existing.num_rows
+
+    def read_range(self, symbol: str, interval: str, start: Optional[int] = None,
+                   end: Optional[int] = None) -> Optional[Dict[str, np.ndarray]]:
+        """Columns for bars with start <= ts < end (epoch seconds)"""
+        table = self.load(symbol, interval)
+        if table is None:
+            return None
+
+        ts = table.column('ts').to_numpy()
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side='left'))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, end, side='left'))
+        window = table.slice(lo, hi - lo)
+        return {name: window.column(name).to_numpy() for name in window.column_names}
+
+
+def _frame_to_table(frame) -> pa.Table:
+    """yfinance OHLCV frame for one symbol -> Arrow table sorted by ts"""
+    frame = frame.rename(columns=str.lower)
+    frame = frame[[c for c in PRICE_COLUMNS if c in frame.columns]].dropna(subset=['close'])
+    index = frame.index
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    columns = {'ts': (index.asi8 // 1_000_000_000).astype(np.int64)}
+    for name in PRICE_COLUMNS:
+        columns[name] = frame[name].to_numpy(dtype=np.float64) if name in frame else np.full(len(frame), np.nan)
+    return pa.Table.from_pydict(columns, schema=PRICE_SCHEMA)
+
+
+class PriceService:
+    def __init__(self, cache: Optional[PriceCache] = None):
+        self.cache = cache or PriceCache()
+
+    def _download(self, symbols: List[str], interval: str, start: datetime) -> Dict[str, pa.Table]:
+        import yfinance as yf
+
+        data = yf.download(
+            tickers=" ".join(symbols),
+            start=start.strftime('%Y-%m-%d'),
+            interval=interval,
+            group_by='ticker',
+            auto_adjust=True,
+            threads=True,
+            progress=False
+        )
+        if data is None or data.empty:
+            return {}
+
+        tables = {}
+        multi = data.columns.nlevels > 1
+        for symbol in symbols:
+            if multi:
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                frame = data[symbol]
+            else:
+                frame = data
+            table = _frame_to_table(frame)
+            if table.num_rows:
+                tables[symbol] = table
+        return tables
+
+    def update(self, symbols: List[str], interval: str = '1d') -> Dict[str, int]:
+        """
+        Fetch bars missing from the cache for each symbol. Symbols that need
+        the same start date share a download call.
+        """
+        if interval not in INTERVAL_LOOKBACK:
+            raise ValueError(f"Unsupported interval {interval}")
+
+        now = datetime.now(timezone.utc)
+        by_start = defaultdict(list)
+        for symbol in {s.upper() for s in symbols}:
+            last_ts = self.cache.last_timestamp(symbol, interval)
+            if last_ts is None:
+                start = now - INTERVAL_LOOKBACK[interval]
+            else:
+                # Re-fetch the last cached bar: it may have been partial
+                start = datetime.fromtimestamp(last_ts, tz=timezone.utc)
+            by_start[start.date()].append(symbol)
+
+        added = {}
+        batch_size = settings.PRICE_DOWNLOAD_BATCH_SIZE
+        for start_date, group in by_start.items():
+            start = datetime(start_date.year, start_date.month, start_date.day, tzinfo=timezone.utc)
+            for i in range(0, len(group), batch_size):
+                chunk = sorted(group[i:i + batch_size])
+                try:
+                    tables = self._download(chunk, interval, start)
+                except Exception as e:
+                    print(f"Error downloading {interval} prices for {', '.join(chunk)}: {e}")
+                    continue
+                for symbol, table in tables.items():
+                    added[symbol] = self.cache.merge(symbol, interval, table)
+
+        return added
+
+    def get_prices(self, symbol: str, interval: str = '1d', start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> Optional[Dict[str, np.ndarray]]:
+        """Read a range from the cache, fetching the series first if it was never cached"""
+        symbol = symbol.upper()
+        if self.cache.last_timestamp(symbol, interval) is None:
+            PRICE_CACHE_LOOKUPS.labels('miss').inc()
+            self.update([symbol], interval)
+        else:
+            PRICE_CACHE_LOOKUPS.labels('hit').inc()
+
+        return self.cache.read_range(
+            symbol,
+            interval,
+            int(start.timestamp()) if start else None,
+            int(end.timestamp()) if end else None
+        )
+
+
+_price_service: Optional[PriceService] = None
+
+
+def get_price_service() -> PriceService:
+    """Process-wide service so cache writes share the same per-series locks"""
+    global _price_service
+    if _price_service is None:
+        _price_service = PriceService()
+    return _price_service
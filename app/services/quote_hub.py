@@ -0,0 +1,166 @@
+"""
+Shared live quote hub.
+
+One poller per process fetches quotes for the union of all subscribed
+symbols every QUOTE_POLL_SECONDS, however many clients are connected, and
+keeps the latest quote per symbol in memory.
+
+Each client has a pending map of symbol -> latest undelivered quote. A new
+tick for a symbol replaces the pending one, so a slow client skips
+intermediate ticks instead of queueing them: its backlog is bounded by the
+number of symbols it follows.
+"""
+
+import asyncio
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from app.config import settings
+
+
+class QuoteSubscriber:
+    """Per-connection subscription state with coalescing delivery"""
+
+    def __init__(self):
+        self.symbols: Set[str] = set()
+        self.pending: Dict[str, Dict] = {}
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def offer(self, quote: Dict):
+        if quote['symbol'] in self.pending:
+            self.dropped += 1
+        self.pending[quote['symbol']] = quote
+        self._ready.set()
+
+    async def next_batch(self) -> List[Dict]:
+        """Wait for at least one quote, then take everything pending"""
+        await self._ready.wait()
+        self._ready.clear()
+        batch = list(self.pending.values())
+        self.pending.clear()
+        return batch
+
+
+def fetch_quotes(symbols: List[str]) -> List[Dict]:
+    """Latest 1-minute bar per symbol, many symbols per download call"""
+    import yfinance as yf
+
+    quotes = []
+    batch_size = settings.PRICE_DOWNLOAD_BATCH_SIZE
+
+    for i in range(0, len(symbols), batch_size):
+        chunk = symbols[i:i + batch_size]
+        data = yf.download(
+            tickers=" ".join(chunk),
+            period='1d',
+            interval='1m',
+            group_by='ticker',
+            auto_adjust=False,
+            prepost=True,
+            threads=True,
+            progress=False
+        )
+        if data is None or data.empty:
+            continue
+
+        multi = data.columns.nlevels > 1
+        for symbol in chunk:
+            if multi and symbol not in data.columns.get_level_values(0):
+                continue
+            frame = (data[symbol] if multi else data).dropna(subset=['Close'])
+            if frame.empty:
+                continue
+
+            last = frame.iloc[-1]
+            quotes.append({
+                'symbol': symbol,
+                'price': float(last['Close']),
+                'open': float(frame['Open'].iloc[0]),
+                'day_high': float(frame['High'].max()),
+                'day_low': float(frame['Low'].min()),
+                'volume': float(frame['Volume'].sum()),
+                'timestamp': int(frame.index[-1].timestamp()),
+            })
+
+    return quotes
+
+
+class QuoteHub:
+    def __init__(self, poll_seconds: Optional[float] = None,
+                 fetcher: Callable[[List[str]], List[Dict]] = fetch_quotes):
+        self.poll_seconds = poll_seconds or settings.QUOTE_POLL_SECONDS
+        self.fetcher = fetcher
+        self.latest: Dict[str, Dict] = {}
+        self._refcounts: Dict[str, int] = {}
+        self._subscribers: Set[QuoteSubscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def symbols(self) -> List[str]:
+        return sorted(self._refcounts)
+
+    def subscribe(self, subscriber: QuoteSubscriber, symbols: Iterable[str]):
+        self._subscribers.add(subscriber)
+        for symbol in {s.upper() for s in symbols} - subscriber.symbols:
+            subscriber.symbols.add(symbol)
+            self._refcounts[symbol] = self._refcounts.get(symbol, 0) + 1
+            # New subscribers get the cached quote straight away
+            if symbol in self.latest:
+                subscriber.offer(self.latest[symbol])
+
+    def unsubscribe(self, subscriber: QuoteSubscriber, symbols: Iterable[str]):
+        for symbol in {s.upper() for s in symbols} & subscriber.symbols:
+            subscriber.symbols.discard(symbol)
+            subscriber.pending.pop(symbol, None)
+            self._refcounts[symbol] -= 1
+            if self._refcounts[symbol] <= 0:
+                del self._refcounts[symbol]
+
+    def remove(self, subscriber: QuoteSubscriber):
+        self.unsubscribe(subscriber, list(subscriber.symbols))
+        self._subscribers.discard(subscriber)
+
+    def publish(self, quote: Dict):
+        previous = self.latest.get(quote['symbol'])
+        if previous and previous['timestamp'] == quote['timestamp'] and previous['price'] == quote['price']:
+            return
+        self.latest[quote['symbol']] = quote
+        for subscriber in self._subscribers:
+            if quote['symbol'] in subscriber.symbols:
+                subscriber.offer(quote)
+
+    async def poll_once(self):
+        symbols = self.symbols
+        if not symbols:
+            return
+        loop = asyncio.get_running_loop()
+        quotes = await loop.run_in_executor(None, self.fetcher, symbols)
+        for quote in quotes:
+            self.publish(quote)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error polling quotes: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            print("Quote hub started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+quote_hub = QuoteHub()
@@ -0,0 +1,148 @@
+"""
+Priority-based refresh scheduling.
+
+Each ticker gets a score from how many users follow it and how much news it
+has been getting. The global request budget (REFRESH_BUDGET_PER_HOUR ticker
+refreshes) is shared out in proportion to score: every ticker first gets
+the floor rate of one refresh per REFRESH_MAX_INTERVAL_MINUTES, and the rest
+is water-filled by score up to one refresh per REFRESH_MIN_INTERVAL_MINUTES.
+When the floors alone would exceed the budget they are scaled down to an
+equal share, so intervals then run longer than REFRESH_MAX_INTERVAL_MINUTES.
+
+Each scheduler tick refreshes due tickers, most overdue-weighted first, up to
+that tick's share of the budget.
+"""
+
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import func as sql_func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Ticker, NewsArticle, TickerRefreshState, user_tickers
+from app.timeutils import as_utc
+
+SUBSCRIBER_WEIGHT = 1.0
+VELOCITY_WEIGHT = 0.5
+
+
+def allocate_intervals(scores: np.ndarray, budget_per_hour: float,
+                       min_interval: float, max_interval: float) -> np.ndarray:
+    """Refresh interval in minutes per ticker so the total rate fits the budget"""
+    floor_rate = 60.0 / max_interval
+    if len(scores) and len(scores) * floor_rate > budget_per_hour:
+        # Too many tickers to refresh each one every max_interval: share the budget evenly
+        floor_rate = budget_per_hour / len(scores)
+    cap_rate = 60.0 / min_interval
+    rates = np.full(len(scores), floor_rate)
+
+    remaining = budget_per_hour - rates.sum()
+    for _ in range(len(scores)):
+        eligible = (scores > 0) & (rates < cap_rate - 1e-12)
+        if remaining <= 1e-9 or not eligible.any():
+            break
+        share = remaining * scores[eligible] / scores[eligible].sum()
+        added = np.minimum(share, cap_rate - rates[eligible])
+        rates[eligible] += added
+        remaining -= added.sum()
+
+    return 60.0 / rates
+
+
+def score(subscribers: int, velocity: float) -> float:
+    """Tickers nobody follows score zero and stay on the floor rate"""
+    if subscribers <= 0:
+        return 0.0
+    return SUBSCRIBER_WEIGHT * math.log1p(subscribers) + VELOCITY_WEIGHT * math.log1p(velocity)
+
+
+def update_priorities(db: Session, now: datetime) -> List[TickerRefreshState]:
+    """Recompute scores and intervals for every ticker"""
+    ticker_ids = [tid for (tid,) in db.query(Ticker.id).order_by(Ticker.id).all()]
+    if not ticker_ids:
+        return []
+
+    subscribers: Dict[int, int] = dict(db.query(
+        user_tickers.c.ticker_id, sql_func.count(user_tickers.c.user_id)
+    ).group_by(user_tickers.c.ticker_id).all())
+
+    velocity_hours = settings.REFRESH_VELOCITY_HOURS
+    recent_articles: Dict[int, int] = dict(db.query(
+        NewsArticle.ticker_id, sql_func.count(NewsArticle.id)
+    ).filter(
+        NewsArticle.created_at >= now - timedelta(hours=velocity_hours)
+    ).group_by(NewsArticle.ticker_id).all())
+
+    states = {s.ticker_id: s for s in db.query(TickerRefreshState).all()}
+
+    scores = np.zeros(len(ticker_ids))
+    for i, ticker_id in enumerate(ticker_ids):
+        velocity = recent_articles.get(ticker_id, 0) * 24.0 / velocity_hours
+        scores[i] = score(subscribers.get(ticker_id, 0), velocity)
+
+        state = states.get(ticker_id)
+        if state is None:
+            state = TickerRefreshState(ticker_id=ticker_id)
+            db.add(state)
+            states[ticker_id] = state
+        state.subscriber_count = subscribers.get(ticker_id, 0)
+        state.article_velocity = velocity
+        state.priority_score = float(scores[i])
+
+    intervals = allocate_intervals(
+        scores,
+        settings.REFRESH_BUDGET_PER_HOUR,
+        settings.REFRESH_MIN_INTERVAL_MINUTES,
+        settings.REFRESH_MAX_INTERVAL_MINUTES
+    )
+
+    for ticker_id, interval in zip(ticker_ids, intervals):
+        state = states[ticker_id]
+        state.interval_minutes = float(interval)
+        # Never refreshed tickers are due now
+        state.next_refresh_at = (
+            as_utc(state.last_refreshed_at) + timedelta(minutes=float(interval))
+            if state.last_refreshed_at else now
+        )
+
+    db.flush()
+    return [states[tid] for tid in ticker_ids]
+
+
+def select_due_tickers(states: List[TickerRefreshState], now: datetime, limit: int) -> List[int]:
+    """
+    Due tickers ordered by score weighted by how overdue they are relative to
+    their interval, so stale tickers are not starved by hot ones.
+    """
+    due = []
+    for state in states:
+        next_at = as_utc(state.next_refresh_at)
+        if next_at > now:
+            continue
+        overdue = (now - next_at).total_seconds() / 60.0
+        urgency = (state.priority_score + 0.1) * (1.0 + overdue / (state.interval_minutes or 1.0))
+        if state.last_refreshed_at is None:
+            urgency += 1000.0
+        due.append((urgency, state.ticker_id))
+
+    due.sort(reverse=True)
+    return [ticker_id for _, ticker_id in due[:limit]]
+
+
+def tick_budget() -> int:
+    """Refreshes allowed in one scheduler tick"""
+    return max(1, int(round(settings.REFRESH_BUDGET_PER_HOUR * settings.REFRESH_TICK_MINUTES / 60.0)))
+
+
+def mark_refreshed(db: Session, ticker_id: int, now: datetime):
+    state = db.query(TickerRefreshState).filter(TickerRefreshState.ticker_id == ticker_id).first()
+    if state is None:
+        state = TickerRefreshState(ticker_id=ticker_id)
+        db.add(state)
+    state.last_refreshed_at = now
+    interval = state.interval_minutes or settings.REFRESH_MAX_INTERVAL_MINUTES
+    state.next_refresh_at = now + timedelta(minutes=interval)
+    db.commit()
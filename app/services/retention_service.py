@@ -0,0 +1,386 @@
+"""
+Retention, compaction and archival for news_articles and ai_insights.
+
+- News articles older than NEWS_RETENTION_DAYS are archived and deleted.
+- AI insights older than INSIGHT_RETENTION_DAYS are folded into
+  `ai_insight_daily_rollups` (one row per ticker per day), archived and deleted.
+- Archived rows are written as gzip-compressed JSON lines under ARCHIVE_DIR.
+
+On Postgres, `news_articles` can be converted once to a table partitioned by
+month of `published_at` (see `convert_news_articles_to_partitioned`). After
+that, partitions are created ahead of time and expired months are archived
+and dropped whole; rows outside them (the default partition, or the expired
+part of the cutoff month) are still deleted row by row.
+"""
+
+import gzip
+import json
+import os
+import uuid
+from collections import defaultdict
+from datetime import datetime, date, timedelta, timezone
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import (
+    NewsArticle, AIInsight, AIInsightDailyRollup, ArticleFingerprint, ArticleLSHBucket, RefreshTiming
+)
+from app.services.summary_service import rebuild_summary
+from app.services.search_service import ensure_search_index
+
+ARTICLE_ARCHIVE_COLUMNS = [
+    'id', 'ticker_id', 'title', 'summary', 'url', 'source', 'news_provider',
+    'published_at', 'sentiment_score', 'created_at',
+]
+INSIGHT_ARCHIVE_COLUMNS = [
+    'id', 'ticker_id', 'news_article_id', 'insight_type', 'content', 'sentiment',
+    'confidence_score', 'sources_analyzed', 'created_at',
+]
+
+PARTITION_PREFIX = "news_articles_p"
+
+
+def _cutoff(days: int) -> Optional[datetime]:
+    """Start of the day `days` days ago (whole days only), or None if disabled"""
+    if not days or days <= 0:
+        return None
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=days)
+
+
+def archive_rows(table_name: str, rows: List[Dict], archive_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Write rows to a gzip JSON-lines file named after their lowest id and
+    return its path. Batches are taken in id order and archived before the
+    delete commits, so a batch retried after a crash has the same lowest id
+    and replaces its earlier file instead of archiving the rows twice.
+    """
+    if not rows:
+        return None
+
+    directory = os.path.join(archive_dir or settings.ARCHIVE_DIR, table_name)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{min(row['id'] for row in rows):012d}.jsonl.gz")
+    partial = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with gzip.open(partial, 'wt', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, default=str))
+            f.write("\n")
+    os.replace(partial, path)
+    return path
+
+
+def _delete_article_fingerprints(db: Session, article_ids: List[int]):
+    db.query(ArticleLSHBucket).filter(ArticleLSHBucket.article_id.in_(article_ids)).delete(synchronize_session=False)
+    db.query(ArticleFingerprint).filter(ArticleFingerprint.article_id.in_(article_ids)).delete(synchronize_session=False)
+
+
+def purge_old_articles(db: Session, days: Optional[int] = None) -> int:
+    """Archive and delete articles published before the retention cutoff"""
+    cutoff = _cutoff(settings.NEWS_RETENTION_DAYS if days is None else days)
+    if not cutoff:
+        return 0
+
+    columns = [getattr(NewsArticle, c) for c in ARTICLE_ARCHIVE_COLUMNS]
+    purged = 0
+    affected_tickers: Set[int] = set()
+
+    while True:
+        rows = db.query(*columns).filter(
+            NewsArticle.published_at < cutoff
+        ).order_by(NewsArticle.id).limit(settings.RETENTION_BATCH_SIZE).all()
+        if not rows:
+            break
+
+        records = [dict(zip(ARTICLE_ARCHIVE_COLUMNS, row)) for row in rows]
+        archive_rows('news_articles', records)
+
+        ids = [r['id'] for r in records]
+        affected_tickers.update(r['ticker_id'] for r in records)
+        _delete_article_fingerprints(db, ids)
+        db.query(NewsArticle).filter(NewsArticle.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        purged += len(ids)
+
+    _rebuild_summaries(db, affected_tickers)
+    return purged
+
+
+def _merge_rollup(db: Session, ticker_id: int, day: date, stats: Dict):
+    rollup = db.query(AIInsightDailyRollup).filter(
+        AIInsightDailyRollup.ticker_id == ticker_id,
+        AIInsightDailyRollup.day == day
+    ).first()
+
+    if not rollup:
+        rollup = AIInsightDailyRollup(
+            ticker_id=ticker_id, day=day, insight_count=0, confidence_count=0,
+            bullish_count=0, bearish_count=0, neutral_count=0
+        )
+        db.add(rollup)
+
+    def weighted(old_avg, old_n, new_sum, new_n):
+        if not new_n:
+            return old_avg
+        if old_avg is None or not old_n:
+            return new_sum / new_n
+        return (old_avg * old_n + new_sum) / (old_n + new_n)
+
+    # Each average is weighted by the number of insights it was taken over
+    rollup.avg_confidence = weighted(
+        rollup.avg_confidence, rollup.confidence_count, stats['confidence_sum'], stats['confidence_n']
+    )
+    rollup.avg_sources_analyzed = weighted(
+        rollup.avg_sources_analyzed, rollup.insight_count, stats['sources_sum'], stats['count']
+    )
+    rollup.confidence_count += stats['confidence_n']
+    rollup.insight_count += stats['count']
+    rollup.bullish_count += stats['bullish']
+    rollup.bearish_count += stats['bearish']
+    rollup.neutral_count += stats['count'] - stats['bullish'] - stats['bearish']
+
+
+def compact_old_insights(db: Session, days: Optional[int] = None) -> int:
+    """
+    Fold insights older than the retention cutoff into daily rollups, then
+    archive and delete the raw rows. Each batch is merged and deleted in one
+    transaction, so a crash never double counts, and its archive file is keyed
+    by id, so a retried batch never archives rows twice.
+    """
+    cutoff = _cutoff(settings.INSIGHT_RETENTION_DAYS if days is None else days)
+    if not cutoff:
+        return 0
+
+    columns = [getattr(AIInsight, c) for c in INSIGHT_ARCHIVE_COLUMNS]
+    compacted = 0
+    affected_tickers: Set[int] = set()
+
+    while True:
+        rows = db.query(*columns).filter(
+            AIInsight.created_at < cutoff
+        ).order_by(AIInsight.id).limit(settings.RETENTION_BATCH_SIZE).all()
+        if not rows:
+            break
+
+        records = [dict(zip(INSIGHT_ARCHIVE_COLUMNS, row)) for row in rows]
+        groups = defaultdict(lambda: {
+            'count': 0, 'bullish': 0, 'bearish': 0,
+            'confidence_sum': 0.0, 'confidence_n': 0, 'sources_sum': 0
+        })
+        for r in records:
+            stats = groups[(r['ticker_id'], r['created_at'].date())]
+            sentiment = (r['sentiment'] or '').lower()
+            stats['count'] += 1
+            stats['bullish'] += 'bullish' in sentiment
+            stats['bearish'] += 'bearish' in sentiment
+            if r['confidence_score'] is not None:
+                stats['confidence_sum'] += r['confidence_score']
+                stats['confidence_n'] += 1
+            stats['sources_sum'] += r['sources_analyzed'] or 0
+
+        for (ticker_id, day), stats in groups.items():
+            _merge_rollup(db, ticker_id, day, stats)
+            db.flush()
+
+        archive_rows('ai_insights', records)
+        ids = [r['id'] for r in records]
+        affected_tickers.update(r['ticker_id'] for r in records)
+        db.query(AIInsight).filter(AIInsight.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        compacted += len(ids)
+
+    _rebuild_summaries(db, affected_tickers)
+    return compacted
+
+
+def purge_old_rollups(db: Session, days: Optional[int] = None) -> int:
+    cutoff = _cutoff(settings.INSIGHT_ROLLUP_RETENTION_DAYS if days is None else days)
+    if not cutoff:
+        return 0
+    deleted = db.query(AIInsightDailyRollup).filter(
+        AIInsightDailyRollup.day < cutoff.date()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def purge_old_refresh_timings(db: Session, days: Optional[int] = None) -> int:
+    cutoff = _cutoff(settings.REFRESH_TIMING_RETENTION_DAYS if days is None else days)
+    if not cutoff:
+        return 0
+    deleted = db.query(RefreshTiming).filter(
+        RefreshTiming.started_at < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def _rebuild_summaries(db: Session, ticker_ids: Set[int]):
+    """Keep ticker_sentiment_summary consistent after rows were removed"""
+    for ticker_id in ticker_ids:
+        rebuild_summary(db, ticker_id)
+    db.commit()
+
+
+# --- Postgres partitioning -------------------------------------------------
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month.year:04d}{month.month:02d}"
+
+
+def is_news_partitioned(engine: Engine) -> bool:
+    if engine.dialect.name != 'postgresql':
+        return False
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = 'news_articles'"
+        )).first() is not None
+
+
+def _create_partition(conn, month: date):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {_partition_name(month)} PARTITION OF news_articles "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+    ))
+
+
+def ensure_news_partitions(engine: Engine, months_ahead: Optional[int] = None) -> int:
+    """Create monthly partitions from the current month up to `months_ahead` ahead"""
+    if not is_news_partitioned(engine):
+        return 0
+
+    months_ahead = settings.NEWS_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    month = _month_start(datetime.now(timezone.utc).date())
+    with engine.begin() as conn:
+        for _ in range(months_ahead + 1):
+            _create_partition(conn, month)
+            month = _next_month(month)
+    return months_ahead + 1
+
+
+def drop_expired_partitions(engine: Engine, db: Optional[Session] = None, days: Optional[int] = None) -> List[str]:
+    """
+    Archive and drop monthly partitions entirely older than the cutoff.
+    Pass a session to rebuild the sentiment summaries of affected tickers.
+    """
+    cutoff = _cutoff(settings.NEWS_RETENTION_DAYS if days is None else days)
+    if not cutoff or not is_news_partitioned(engine):
+        return []
+
+    with engine.connect() as conn:
+        names = [row[0] for row in conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'news_articles' AND c.relname LIKE :prefix"
+        ), {'prefix': f"{PARTITION_PREFIX}%"})]
+
+    dropped = []
+    affected_tickers: Set[int] = set()
+    for name in sorted(names):
+        suffix = name[len(PARTITION_PREFIX):]
+        upper = _next_month(date(int(suffix[:4]), int(suffix[4:6]), 1))
+        if upper > cutoff.date():
+            continue
+
+        with engine.begin() as conn:
+            result = conn.execute(text(f"SELECT {', '.join(ARTICLE_ARCHIVE_COLUMNS)} FROM {name} ORDER BY id"))
+            while True:
+                batch = result.fetchmany(settings.RETENTION_BATCH_SIZE)
+                if not batch:
+                    break
+                records = [dict(row._mapping) for row in batch]
+                archive_rows('news_articles', records)
+                affected_tickers.update(r['ticker_id'] for r in records)
+
+            conn.execute(text(f"DELETE FROM article_lsh_buckets WHERE article_id IN (SELECT id FROM {name})"))
+            conn.execute(text(f"DELETE FROM article_fingerprints WHERE article_id IN (SELECT id FROM {name})"))
+            conn.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+
+    if db is not None:
+        _rebuild_summaries(db, affected_tickers)
+    return dropped
+
+
+def convert_news_articles_to_partitioned(engine: Engine):
+    """
+    One-off migration of news_articles to a table partitioned by month of
+    published_at. This gives up two database guarantees:
+
+    - url is no longer unique on its own. Postgres requires the partition key
+      in every unique constraint, so the primary key becomes (id, published_at)
+      and the url constraint (url, published_at). The same url with a
+      different published_at is only kept out by ingest, which looks urls up
+      before inserting, so two concurrent refreshes can both store it.
+    - Foreign keys that referenced news_articles.id (ai_insights,
+      article_fingerprints, article_lsh_buckets) cannot target a partitioned
+      table and are dropped along with the legacy table, so deletes no longer
+      cascade. Retention deletes fingerprints and LSH buckets itself, and
+      insights are compacted long before their articles expire.
+    """
+    if engine.dialect.name != 'postgresql':
+        raise RuntimeError("Partitioning is only supported on Postgres")
+    if is_news_partitioned(engine):
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE news_articles RENAME TO news_articles_legacy"))
+        conn.execute(text(
+            "CREATE TABLE news_articles (LIKE news_articles_legacy INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (published_at)"
+        ))
+        conn.execute(text("ALTER TABLE news_articles ADD PRIMARY KEY (id, published_at)"))
+        conn.execute(text(
+            "ALTER TABLE news_articles ADD CONSTRAINT uq_news_articles_url_published UNIQUE (url, published_at)"
+        ))
+        conn.execute(text(
+            "ALTER TABLE news_articles ADD CONSTRAINT news_articles_ticker_id_fkey "
+            "FOREIGN KEY (ticker_id) REFERENCES tickers (id) ON DELETE CASCADE"
+        ))
+        conn.execute(text("CREATE INDEX ix_news_articles_ticker_published ON news_articles (ticker_id, published_at)"))
+        conn.execute(text("CREATE TABLE news_articles_default PARTITION OF news_articles DEFAULT"))
+
+        oldest = conn.execute(text("SELECT min(published_at) FROM news_articles_legacy")).scalar()
+        month = _month_start(oldest.date() if oldest else datetime.now(timezone.utc).date())
+        last = _month_start(datetime.now(timezone.utc).date())
+        for _ in range(settings.NEWS_PARTITION_MONTHS_AHEAD):
+            last = _next_month(last)
+        while month <= last:
+            _create_partition(conn, month)
+            month = _next_month(month)
+
+        conn.execute(text("INSERT INTO news_articles SELECT * FROM news_articles_legacy"))
+        conn.execute(text("ALTER SEQUENCE news_articles_id_seq OWNED BY news_articles.id"))
+        conn.execute(text("DROP TABLE news_articles_legacy CASCADE"))
+
+    # The full-text index went away with the legacy table
+    ensure_search_index(engine)
+
+
+def run_retention(db: Session, engine: Engine) -> Dict[str, int]:
+    """Run every retention step once"""
+    result = {'partitions_created': ensure_news_partitions(engine)}
+
+    if is_news_partitioned(engine):
+        result['partitions_dropped'] = len(drop_expired_partitions(engine, db))
+    # Also the partitioned path: rows in news_articles_default, or older than
+    # the cutoff in a month that hasn't fully expired, are deleted row by row
+    result['articles_purged'] = purge_old_articles(db)
+
+    result['insights_compacted'] = compact_old_insights(db)
+    result['rollups_purged'] = purge_old_rollups(db)
+    result['refresh_timings_purged'] = purge_old_refresh_timings(db)
+    return result
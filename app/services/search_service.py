@@ -0,0 +1,154 @@
+"""
+Full-text search over news article titles and summaries.
+
+Postgres uses a GIN index on a `to_tsvector` expression, which the database
+keeps current on every insert. SQLite uses an FTS5 external-content table
+kept in sync by triggers. Both paths return ranked rows with a highlighted
+snippet.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text, bindparam
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+
+PG_DOCUMENT = "to_tsvector('english', coalesce(a.title, '') || ' ' || coalesce(a.summary, ''))"
+
+PG_INDEX_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_news_articles_fts ON news_articles USING GIN "
+    "(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(summary, '')))",
+]
+
+SQLITE_INDEX_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS news_articles_fts USING fts5("
+    "title, summary, content='news_articles', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS news_articles_fts_ai AFTER INSERT ON news_articles BEGIN "
+    "INSERT INTO news_articles_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary); END",
+    "CREATE TRIGGER IF NOT EXISTS news_articles_fts_ad AFTER DELETE ON news_articles BEGIN "
+    "INSERT INTO news_articles_fts(news_articles_fts, rowid, title, summary) "
+    "VALUES ('delete', old.id, old.title, old.summary); END",
+    "CREATE TRIGGER IF NOT EXISTS news_articles_fts_au AFTER UPDATE ON news_articles BEGIN "
+    "INSERT INTO news_articles_fts(news_articles_fts, rowid, title, summary) "
+    "VALUES ('delete', old.id, old.title, old.summary); "
+    "INSERT INTO news_articles_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary); END",
+]
+
+RESULT_COLUMNS = (
+    "a.id, a.ticker_id, t.symbol AS ticker_symbol, a.title, a.summary, a.url, a.source, "
+    "a.news_provider, a.published_at, a.sentiment_score, a.created_at"
+)
+
+
+def ensure_search_index(engine: Engine):
+    """Create the full-text index for the current database if missing"""
+    with engine.begin() as conn:
+        if engine.dialect.name == 'postgresql':
+            for ddl in PG_INDEX_DDL:
+                conn.execute(text(ddl))
+        elif engine.dialect.name == 'sqlite':
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'news_articles_fts'"
+            )).first()
+            for ddl in SQLITE_INDEX_DDL:
+                conn.execute(text(ddl))
+            if not exists:
+                # Index rows inserted before the FTS table existed
+                conn.execute(text("INSERT INTO news_articles_fts(news_articles_fts) VALUES ('rebuild')"))
+        else:
+            print(f"Full-text search is not supported on {engine.dialect.name}")
+
+
+def _filters(ticker_ids: List[int], provider: Optional[str], start: Optional[datetime],
+             end: Optional[datetime], params: Dict) -> str:
+    clauses = ["a.ticker_id IN :ticker_ids"]
+    params['ticker_ids'] = ticker_ids
+    if provider:
+        clauses.append("a.news_provider = :provider")
+        params['provider'] = provider
+    if start:
+        clauses.append("a.published_at >= :start")
+        params['start'] = start
+    if end:
+        clauses.append("a.published_at < :end")
+        params['end'] = end
+    return " AND ".join(clauses)
+
+
+def _fts5_query(query: str) -> str:
+    """Quote each term so user input cannot inject FTS5 syntax"""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"' for term in terms if term)
+
+
+def _search_postgres(db: Session, query: str, where: str, params: Dict) -> List[Dict]:
+    # Rank and limit first, then build headlines only for the returned page
+    sql = text(f"""
+        WITH q AS (SELECT websearch_to_tsquery('english', :query) AS query),
+        hits AS (
+            SELECT a.id, ts_rank_cd({PG_DOCUMENT}, q.query) AS rank
+            FROM news_articles a, q
+            WHERE {PG_DOCUMENT} @@ q.query AND {where}
+            ORDER BY rank DESC, a.published_at DESC
+            LIMIT :limit OFFSET :offset
+        )
+        SELECT {RESULT_COLUMNS}, hits.rank,
+               ts_headline('english', coalesce(a.summary, '') || ' ' || a.title, q.query,
+                           'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxWords=35, MinWords=15, MaxFragments=2')
+                   AS snippet
+        FROM hits
+        JOIN news_articles a ON a.id = hits.id
+        JOIN tickers t ON t.id = a.ticker_id, q
+        ORDER BY hits.rank DESC, a.published_at DESC
+    """).bindparams(bindparam('ticker_ids', expanding=True))
+
+    params['query'] = query
+    return [dict(row) for row in db.execute(sql, params).mappings()]
+
+
+def _search_sqlite(db: Session, query: str, where: str, params: Dict) -> List[Dict]:
+    match = _fts5_query(query)
+    if not match:
+        return []
+
+    # bm25 is lower-is-better; titles weigh more than summaries
+    sql = text(f"""
+        SELECT {RESULT_COLUMNS},
+               -bm25(news_articles_fts, 5.0, 1.0) AS rank,
+               snippet(news_articles_fts, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_STOP}', '…', 24) AS snippet
+        FROM news_articles_fts
+        JOIN news_articles a ON a.id = news_articles_fts.rowid
+        JOIN tickers t ON t.id = a.ticker_id
+        WHERE news_articles_fts MATCH :query AND {where}
+        ORDER BY bm25(news_articles_fts, 5.0, 1.0), a.published_at DESC
+        LIMIT :limit OFFSET :offset
+    """).bindparams(bindparam('ticker_ids', expanding=True))
+
+    params['query'] = match
+    return [dict(row) for row in db.execute(sql, params).mappings()]
+
+
+def search_articles(
+        db: Session,
+        query: str,
+        ticker_ids: List[int],
+        provider: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 20,
+        offset: int = 0
+) -> List[Dict]:
+    """Ranked full-text search restricted to the given tickers"""
+    if not ticker_ids:
+        return []
+
+    params = {'limit': limit, 'offset': offset}
+    where = _filters(ticker_ids, provider, start, end, params)
+
+    if db.get_bind().dialect.name == 'postgresql':
+        return _search_postgres(db, query, where, params)
+    return _search_sqlite(db, query, where, params)
@@ -0,0 +1,199 @@
+"""
+Vectorized sentiment rollups over news articles and AI insights.
+
+Rows are loaded once into DataFrames and every aggregate is computed with
+grouped pandas/NumPy operations, so the cost is a handful of passes over the
+data regardless of how many tickers, providers or buckets are involved.
+"""
+
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.models import NewsArticle, AIInsight
+
+# Supported bucket sizes -> pandas offset aliases
+BUCKETS = {
+    '1h': '60min',
+    '4h': '240min',
+    '1d': '1D',
+    '1w': '7D',
+}
+
+# Same scale save_news_and_insights uses when mapping Claude's verdict to a score
+INSIGHT_SENTIMENT_VALUES = {
+    'very_bullish': 0.9, 'bullish': 0.7, 'neutral': 0.0,
+    'bearish': -0.7, 'very_bearish': -0.9,
+}
+
+ARTICLE_COLUMNS = ['ticker_id', 'provider', 'published_at', 'sentiment_score']
+INSIGHT_COLUMNS = ['ticker_id', 'created_at', 'sentiment', 'confidence_score']
+
+
+def load_articles(db: Session, ticker_ids: List[int], start: datetime, end: datetime) -> pd.DataFrame:
+    """Load the columns needed for rollups, without hydrating ORM objects"""
+    rows = db.query(
+        NewsArticle.ticker_id,
+        NewsArticle.news_provider,
+        NewsArticle.published_at,
+        NewsArticle.sentiment_score,
+    ).filter(
+        NewsArticle.ticker_id.in_(ticker_ids),
+        NewsArticle.published_at >= start,
+        NewsArticle.published_at < end
+    ).all()
+
+    df = pd.DataFrame.from_records(rows, columns=ARTICLE_COLUMNS)
+    df['published_at'] = pd.to_datetime(df['published_at'], utc=True)
+    df['sentiment_score'] = df['sentiment_score'].astype(float)
+    return df
+
+
+def load_insights(db: Session, ticker_ids: List[int], start: datetime, end: datetime) -> pd.DataFrame:
+    rows = db.query(
+        AIInsight.ticker_id,
+        AIInsight.created_at,
+        AIInsight.sentiment,
+        AIInsight.confidence_score,
+    ).filter(
+        AIInsight.ticker_id.in_(ticker_ids),
+        AIInsight.created_at >= start,
+        AIInsight.created_at < end
+    ).all()
+
+    df = pd.DataFrame.from_records(rows, columns=INSIGHT_COLUMNS)
+    df['created_at'] = pd.to_datetime(df['created_at'], utc=True)
+    df['confidence_score'] = df['confidence_score'].astype(float)
+    return df
+
+
+def insight_sentiment_scores(sentiments: pd.Series) -> pd.Series:
+    """Map free-form insight sentiment labels to the -1..1 scale"""
+    labels = sentiments.fillna('').str.lower().str.strip()
+    scores = labels.map(INSIGHT_SENTIMENT_VALUES)
+    # Labels like "moderately bullish" fall back to substring matching
+    fallback = np.where(
+        labels.str.contains('bullish'), 0.7,
+        np.where(labels.str.contains('bearish'), -0.7, 0.0)
+    )
+    return scores.fillna(pd.Series(fallback, index=labels.index)).where(labels != '')
+
+
+def _empty_rollup(keys: List[str], columns: List[str]) -> pd.DataFrame:
+    index = pd.MultiIndex.from_arrays([[] for _ in keys], names=keys)
+    return pd.DataFrame(columns=columns, index=index, dtype=float)
+
+
+def rollup_articles(df: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """
+    Per (ticker, bucket): article volume, mean and provider-weighted sentiment,
+    number of providers and disagreement between providers.
+
+    The weighted mean gives each provider equal say within a bucket, so a
+    provider that returns many articles cannot dominate the score.
+    Disagreement is the standard deviation of the per-provider means.
+    """
+    keys = ['ticker_id', 'bucket']
+    if df.empty:
+        return _empty_rollup(keys, ['article_count', 'providers_count', 'mean_sentiment',
+                                    'weighted_sentiment', 'provider_disagreement'])
+
+    df = df.assign(bucket=df['published_at'].dt.floor(freq))
+
+    volume = df.groupby(keys).size().rename('article_count')
+    providers = df.groupby(keys)['provider'].nunique().rename('providers_count')
+
+    scored = df[df['sentiment_score'].notna()]
+    per_provider = scored.groupby(keys + ['provider'])['sentiment_score']
+    weights = 1.0 / per_provider.transform('count')
+    weighted_sum = (scored['sentiment_score'] * weights).groupby([scored[k] for k in keys]).sum()
+    weight_total = weights.groupby([scored[k] for k in keys]).sum()
+
+    provider_means = per_provider.mean()
+    disagreement = provider_means.groupby(level=keys).std(ddof=0)
+    disagreement = disagreement.where(provider_means.groupby(level=keys).count() > 1)
+
+    return pd.concat([
+        volume,
+        providers,
+        scored.groupby(keys)['sentiment_score'].mean().rename('mean_sentiment'),
+        (weighted_sum / weight_total).rename('weighted_sentiment'),
+        disagreement.rename('provider_disagreement'),
+    ], axis=1)
+
+
+def rollup_providers(df: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """Per (ticker, bucket, provider): article volume and mean sentiment"""
+    if df.empty:
+        return _empty_rollup(['ticker_id', 'bucket', 'provider'], ['article_count', 'mean_sentiment'])
+
+    df = df.assign(bucket=df['published_at'].dt.floor(freq))
+    grouped = df.groupby(['ticker_id', 'bucket', 'provider'])['sentiment_score']
+    return pd.concat([
+        grouped.size().rename('article_count'),
+        grouped.mean().rename('mean_sentiment'),
+    ], axis=1)
+
+
+def rollup_insights(df: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """Per (ticker, bucket): insight count, mean insight sentiment and confidence"""
+    if df.empty:
+        return _empty_rollup(['ticker_id', 'bucket'], ['insight_count', 'insight_sentiment', 'insight_confidence'])
+
+    df = df.assign(
+        bucket=df['created_at'].dt.floor(freq),
+        score=insight_sentiment_scores(df['sentiment']),
+    )
+    grouped = df.groupby(['ticker_id', 'bucket'])
+    return pd.concat([
+        grouped.size().rename('insight_count'),
+        grouped['score'].mean().rename('insight_sentiment'),
+        grouped['confidence_score'].mean().rename('insight_confidence'),
+    ], axis=1)
+
+
+def _records(df: pd.DataFrame) -> List[Dict]:
+    """DataFrame -> list of dicts with NaN turned into None"""
+    df = df.reset_index()
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def compute_sentiment_rollups(
+        db: Session,
+        ticker_ids: List[int],
+        start: datetime,
+        end: datetime,
+        bucket: str = '1d'
+) -> Dict[int, Dict[str, List[Dict]]]:
+    """
+    Compute time-bucketed sentiment rollups for one or more tickers.
+    Returns {ticker_id: {'buckets': [...], 'providers': [...]}}.
+    """
+    freq = BUCKETS[bucket]
+    articles = load_articles(db, ticker_ids, start, end)
+    insights = load_insights(db, ticker_ids, start, end)
+
+    combined = rollup_articles(articles, freq).join(rollup_insights(insights, freq), how='outer')
+    count_columns = ['article_count', 'providers_count', 'insight_count']
+    combined[count_columns] = combined[count_columns].fillna(0).astype(int)
+    providers = rollup_providers(articles, freq)
+
+    results = {ticker_id: {'buckets': [], 'providers': []} for ticker_id in ticker_ids}
+    for row in _records(combined.sort_index()):
+        results[row.pop('ticker_id')]['buckets'].append(row)
+    for row in _records(providers.sort_index()):
+        results[row.pop('ticker_id')]['providers'].append(row)
+    return results
+
+
+def rollup_ticker(
+        db: Session,
+        ticker_id: int,
+        start: datetime,
+        end: datetime,
+        bucket: str = '1d'
+) -> Dict[str, List[Dict]]:
+    return compute_sentiment_rollups(db, [ticker_id], start, end, bucket)[ticker_id]
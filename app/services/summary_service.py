@@ -0,0 +1,200 @@
+"""
+Per-ticker sentiment summaries.
+
+`ticker_sentiment_summary` holds one row per ticker so the dashboard does not
+have to recompute `overall_sentiment` and `news_sources_count` from raw rows.
+Ingest updates the row incrementally; `reconcile_summaries` rebuilds rows from
+the raw tables and reports any drift.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func as sql_func, desc, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import Ticker, NewsArticle, AIInsight, TickerSentimentSummary
+from app.timeutils import as_utc
+
+# The dashboard has always derived overall sentiment from the latest 3 insights
+RECENT_INSIGHTS_KEPT = 3
+
+
+def overall_sentiment(sentiments: List[str]) -> str:
+    """Majority vote of bullish vs bearish labels"""
+    bullish = sum(1 for s in sentiments if s and 'bullish' in s.lower())
+    bearish = sum(1 for s in sentiments if s and 'bearish' in s.lower())
+    return 'bullish' if bullish > bearish else ('bearish' if bearish > bullish else 'neutral')
+
+
+def get_summary_for_update(db: Session, ticker_id: int) -> TickerSentimentSummary:
+    """Fetch (row-locked on Postgres) or create the summary row for a ticker"""
+    summary = db.query(TickerSentimentSummary).filter(
+        TickerSentimentSummary.ticker_id == ticker_id
+    ).with_for_update().first()
+
+    if not summary:
+        summary = TickerSentimentSummary(
+            ticker_id=ticker_id,
+            overall_sentiment='neutral',
+            article_count=0,
+            sentiment_score_sum=0.0,
+            sentiment_score_count=0,
+            provider_last_seen={},
+            recent_insights=[]
+        )
+        db.add(summary)
+    return summary
+
+
+def apply_articles(db: Session, ticker_id: int, articles: List[Dict]):
+    """Fold newly saved articles (news_service dicts) into the summary"""
+    if not articles:
+        return
+
+    summary = get_summary_for_update(db, ticker_id)
+    provider_last_seen = dict(summary.provider_last_seen or {})
+
+    for article in articles:
+        published_at = as_utc(article['published_at'])
+        provider = article['provider']
+        seen = provider_last_seen.get(provider)
+        if not seen or datetime.fromisoformat(seen) < published_at:
+            provider_last_seen[provider] = published_at.isoformat()
+
+        if article.get('sentiment') is not None:
+            summary.sentiment_score_sum += article['sentiment']
+            summary.sentiment_score_count += 1
+
+    summary.article_count += len(articles)
+    # Reassign so SQLAlchemy notices the JSON change
+    summary.provider_last_seen = provider_last_seen
+    summary.last_article_at = max(datetime.fromisoformat(v) for v in provider_last_seen.values())
+
+
+def apply_insight(db: Session, ticker_id: int, sentiment: Optional[str], created_at: datetime):
+    """Push a new insight into the summary's recent window"""
+    summary = get_summary_for_update(db, ticker_id)
+    created_at = as_utc(created_at)
+
+    recent = [{'sentiment': sentiment, 'created_at': created_at.isoformat()}]
+    recent.extend(summary.recent_insights or [])
+    summary.recent_insights = recent[:RECENT_INSIGHTS_KEPT]
+    summary.overall_sentiment = overall_sentiment([i['sentiment'] for i in summary.recent_insights])
+    summary.last_insight_at = created_at
+
+
+def summary_for_window(summary: Optional[TickerSentimentSummary], since: datetime) -> Tuple[str, int]:
+    """Return (overall_sentiment, news_sources_count) restricted to rows after `since`"""
+    if not summary:
+        return 'neutral', 0
+
+    since = as_utc(since)
+    sentiments = [
+        i['sentiment'] for i in summary.recent_insights or []
+        if datetime.fromisoformat(i['created_at']) >= since and i['sentiment']
+    ]
+    sources_count = sum(
+        1 for seen in (summary.provider_last_seen or {}).values()
+        if datetime.fromisoformat(seen) >= since
+    )
+    return overall_sentiment(sentiments), sources_count
+
+
+def rebuild_summary(db: Session, ticker_id: int) -> TickerSentimentSummary:
+    """Recompute a ticker's summary from the raw tables"""
+    summary = get_summary_for_update(db, ticker_id)
+
+    article_count, score_sum, score_count = db.query(
+        sql_func.count(NewsArticle.id),
+        sql_func.coalesce(sql_func.sum(NewsArticle.sentiment_score), 0.0),
+        sql_func.count(NewsArticle.sentiment_score)
+    ).filter(NewsArticle.ticker_id == ticker_id).one()
+
+    provider_rows = db.query(
+        NewsArticle.news_provider,
+        sql_func.max(NewsArticle.published_at)
+    ).filter(
+        NewsArticle.ticker_id == ticker_id,
+        NewsArticle.news_provider.isnot(None)
+    ).group_by(NewsArticle.news_provider).all()
+
+    insight_rows = db.query(AIInsight.sentiment, AIInsight.created_at).filter(
+        AIInsight.ticker_id == ticker_id
+    ).order_by(desc(AIInsight.created_at)).limit(RECENT_INSIGHTS_KEPT).all()
+
+    provider_last_seen = {provider: as_utc(seen).isoformat() for provider, seen in provider_rows}
+    recent_insights = [
+        {'sentiment': sentiment, 'created_at': as_utc(created_at).isoformat()}
+        for sentiment, created_at in insight_rows
+    ]
+
+    summary.article_count = article_count
+    summary.sentiment_score_sum = float(score_sum)
+    summary.sentiment_score_count = score_count
+    summary.provider_last_seen = provider_last_seen
+    summary.recent_insights = recent_insights
+    summary.overall_sentiment = overall_sentiment([i['sentiment'] for i in recent_insights])
+    summary.last_article_at = max((datetime.fromisoformat(v) for v in provider_last_seen.values()), default=None)
+    summary.last_insight_at = datetime.fromisoformat(recent_insights[0]['created_at']) if recent_insights else None
+    return summary
+
+
+def _snapshot(summary: TickerSentimentSummary) -> Dict:
+    return {
+        'overall_sentiment': summary.overall_sentiment,
+        'article_count': summary.article_count,
+        'sentiment_score_sum': round(summary.sentiment_score_sum or 0.0, 6),
+        'sentiment_score_count': summary.sentiment_score_count,
+        'provider_last_seen': dict(summary.provider_last_seen or {}),
+        'recent_insights': list(summary.recent_insights or []),
+    }
+
+
+def create_empty_summaries(db: Session, ticker_ids: List[int]):
+    """Summary rows for newly created tickers, so readers never have to create them"""
+    if ticker_ids:
+        db.execute(insert(TickerSentimentSummary), [{'ticker_id': ticker_id} for ticker_id in ticker_ids])
+
+
+def backfill_missing_summaries(db: Session) -> int:
+    """Build summaries for tickers that have none, e.g. ones that predate the table"""
+    missing = [ticker_id for (ticker_id,) in db.query(Ticker.id).outerjoin(
+        TickerSentimentSummary, TickerSentimentSummary.ticker_id == Ticker.id
+    ).filter(TickerSentimentSummary.ticker_id.is_(None)).all()]
+    for ticker_id in missing:
+        rebuild_summary(db, ticker_id)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another process backfilled the same tickers first
+        db.rollback()
+    return len(missing)
+
+
+def reconcile_summaries(db: Session) -> Dict[str, int]:
+    """
+    Rebuild every ticker's summary from raw data and report drift.
+    Missing rows are created; drifted rows are corrected.
+    """
+    existing = {
+        s.ticker_id: _snapshot(s)
+        for s in db.query(TickerSentimentSummary).all()
+    }
+    checked = missing = drifted = 0
+
+    for (ticker_id,) in db.query(Ticker.id).all():
+        before = existing.get(ticker_id)
+        after = _snapshot(rebuild_summary(db, ticker_id))
+        checked += 1
+
+        if before is None:
+            missing += 1
+        elif before != after:
+            drifted += 1
+            changed = [k for k in after if before[k] != after[k]]
+            print(f"Sentiment summary drift for ticker {ticker_id}: {', '.join(changed)}")
+
+    db.commit()
+    return {'checked': checked, 'missing': missing, 'drifted': drifted}
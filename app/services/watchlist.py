@@ -0,0 +1,196 @@
+"""
+Users' ticker lists, read and written through `user_tickers` directly.
+
+Routes only need a few ticker columns and a yes/no membership answer, so
+nothing here loads `User.tickers` or builds ORM instances. Reads return
+column rows that the response schemas (`from_attributes`) validate as-is.
+
+`add_symbols` adds a whole list at once (bulk API and CSV import): one
+lookup for the known symbols, concurrent cached validation of the rest, and
+single INSERTs for new tickers, their empty sentiment summaries and links,
+all in one transaction. The INSERTs skip rows that already exist, so a
+concurrent add of the same symbol doesn't fail the request.
+"""
+
+import csv
+import io
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, delete, exists, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.models import Ticker, user_tickers
+from app.services.summary_service import create_empty_summaries
+from app.ticker_validator import validate_tickers
+
+TICKER_COLUMNS = (Ticker.id, Ticker.symbol, Ticker.name, Ticker.type, Ticker.created_at)
+
+
+def ticker_rows(db: Session, skip: int = 0, limit: int = 100) -> List[Row]:
+    return db.execute(select(*TICKER_COLUMNS).order_by(Ticker.id).offset(skip).limit(limit)).all()
+
+
+def ticker_by_symbol(db: Session, symbol: str) -> Optional[Row]:
+    return db.execute(select(*TICKER_COLUMNS).where(Ticker.symbol == symbol)).first()
+
+
+def _followed(user_id: int):
+    return exists().where(
+        and_(user_tickers.c.user_id == user_id, user_tickers.c.ticker_id == Ticker.id)
+    ).label('followed')
+
+
+def ticker_with_membership(db: Session, user_id: int, symbol: str) -> Optional[Row]:
+    """Ticker columns plus `followed`, in one query; None if the symbol is unknown"""
+    return db.execute(select(*TICKER_COLUMNS, _followed(user_id)).where(Ticker.symbol == symbol)).first()
+
+
+def tickers_with_membership(db: Session, user_id: int, symbols: List[str]) -> Dict[str, Row]:
+    """`ticker_with_membership` for many symbols; unknown ones are left out"""
+    rows = db.execute(select(*TICKER_COLUMNS, _followed(user_id)).where(Ticker.symbol.in_(symbols))).all()
+    return {row.symbol: row for row in rows}
+
+
+def followed_ticker(db: Session, user_id: int, symbol: str) -> Optional[Row]:
+    """The ticker if the user follows it, else None"""
+    return db.execute(
+        select(*TICKER_COLUMNS)
+        .join(user_tickers, user_tickers.c.ticker_id == Ticker.id)
+        .where(user_tickers.c.user_id == user_id, Ticker.symbol == symbol)
+    ).first()
+
+
+def follows_ticker(db: Session, user_id: int, ticker_id: int) -> bool:
+    return db.execute(select(exists().where(
+        and_(user_tickers.c.user_id == user_id, user_tickers.c.ticker_id == ticker_id)
+    ))).scalar()
+
+
+def user_ticker_rows(db: Session, user_id: int) -> List[Row]:
+    """The user's tickers, oldest added first"""
+    return db.execute(
+        select(*TICKER_COLUMNS)
+        .join(user_tickers, user_tickers.c.ticker_id == Ticker.id)
+        .where(user_tickers.c.user_id == user_id)
+        .order_by(user_tickers.c.added_at, Ticker.id)
+    ).all()
+
+
+def insert_ticker(db: Session, symbol: str, name: str, type: str) -> Row:
+    """Create a ticker and return its columns, without a second SELECT"""
+    return db.execute(
+        insert(Ticker).values(symbol=symbol, name=name, type=type).returning(*TICKER_COLUMNS)
+    ).one()
+
+
+def add_user_ticker(db: Session, user_id: int, ticker_id: int):
+    db.execute(insert(user_tickers).values(user_id=user_id, ticker_id=ticker_id))
+
+
+def remove_user_ticker(db: Session, user_id: int, ticker_id: int) -> bool:
+    """Unlink a ticker; False if the user did not follow it"""
+    result = db.execute(delete(user_tickers).where(
+        user_tickers.c.user_id == user_id,
+        user_tickers.c.ticker_id == ticker_id
+    ))
+    return result.rowcount > 0
+
+
+def normalize_symbols(symbols: List[str]) -> List[str]:
+    """Upper-cased, stripped, without blanks or repeats, in the given order"""
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+
+
+def _insert_ignoring_duplicates(db: Session, table):
+    """INSERT ... ON CONFLICT DO NOTHING, so rows a concurrent request added first are skipped"""
+    dialect_insert = pg_insert if db.get_bind().dialect.name == 'postgresql' else sqlite_insert
+    return dialect_insert(table).on_conflict_do_nothing()
+
+
+async def add_symbols(db: Session, user_id: int, symbols: List[str]) -> List[Dict]:
+    """
+    Add normalized symbols to a user's list in one transaction, creating
+    tickers that pass validation. One result per symbol, in order.
+    """
+    known = tickers_with_membership(db, user_id, symbols)
+    unknown = [s for s in symbols if s not in known]
+
+    validated = {}
+    created = {}
+    if unknown:
+        # Don't hold a connection open while Yahoo is queried
+        db.rollback()
+        validated = await validate_tickers(unknown)
+
+        new_tickers = [
+            {'symbol': symbol, 'name': info['name'], 'type': info['type']}
+            for symbol, info in validated.items() if isinstance(info, dict)
+        ]
+        if new_tickers:
+            # Only the rows actually inserted come back; another request may have
+            # created some of these symbols while we were validating
+            rows = db.execute(
+                _insert_ignoring_duplicates(db, Ticker).returning(*TICKER_COLUMNS), new_tickers
+            ).all()
+            created = {row.symbol: row for row in rows}
+            create_empty_summaries(db, [row.id for row in rows])
+
+        # Membership may have changed during validation, so read it again
+        known = tickers_with_membership(db, user_id, symbols)
+
+    results = []
+    links = []
+    for symbol in symbols:
+        if symbol in created:
+            ticker = created[symbol]
+            result_status = 'created'
+        elif symbol in known:
+            ticker = known[symbol]
+            if ticker.followed:
+                results.append({'symbol': symbol, 'status': 'exists', 'ticker': ticker})
+                continue
+            result_status = 'added'
+        else:
+            results.append({'symbol': symbol, 'status': 'invalid', 'detail': validated[symbol]})
+            continue
+        links.append({'user_id': user_id, 'ticker_id': ticker.id})
+        results.append({'symbol': symbol, 'status': result_status, 'ticker': ticker})
+
+    if links:
+        db.execute(_insert_ignoring_duplicates(db, user_tickers), links)
+    db.commit()
+    return results
+
+
+def parse_symbols_csv(content: bytes) -> List[str]:
+    """Symbols from a CSV's `symbol` column, or its first column if there is no header"""
+    rows = list(csv.reader(io.StringIO(content.decode('utf-8-sig'))))
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    index = 0
+    if 'symbol' in header:
+        index = header.index('symbol')
+        rows = rows[1:]
+    return [row[index] for row in rows if len(row) > index]
+
+
+def watchlist_csv(db: Session, user_id: int) -> str:
+    """The user's list as CSV: symbol, name, type, added_at"""
+    rows = db.execute(
+        select(Ticker.symbol, Ticker.name, Ticker.type, user_tickers.c.added_at)
+        .join(user_tickers, user_tickers.c.ticker_id == Ticker.id)
+        .where(user_tickers.c.user_id == user_id)
+        .order_by(user_tickers.c.added_at, Ticker.id)
+    ).all()
+
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['symbol', 'name', 'type', 'added_at'])
+    for row in rows:
+        writer.writerow([row.symbol, row.name, row.type, row.added_at.isoformat() if row.added_at else ''])
+    return out.getvalue()
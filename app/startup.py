@@ -0,0 +1,82 @@
+"""
+Startup work that runs after the server starts listening.
+
+Uvicorn accepts no connections until the lifespan startup returns, so slow
+work there holds back liveness probes as well as traffic. The lifespan only
+schedules `Startup.run`. It prepares the database in a thread, retrying
+while the database is unreachable. It then marks the process ready and calls
+`on_ready`, which starts the scheduler and the embedded worker.
+
+/health/live answers as soon as the event loop runs. /health/ready returns
+503 until startup has finished.
+"""
+
+import asyncio
+import time
+from typing import Callable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models import Base
+from app.services.search_service import ensure_search_index
+from app.services.summary_service import backfill_missing_summaries
+
+MAX_RETRY_SECONDS = 30
+
+
+def prepare_database():
+    """Create missing tables, the search index and missing sentiment summaries"""
+    if settings.CREATE_TABLES_ON_STARTUP:
+        Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+
+    db = SessionLocal()
+    try:
+        backfilled = backfill_missing_summaries(db)
+        if backfilled:
+            print(f"Backfilled sentiment summaries for {backfilled} tickers")
+    finally:
+        db.close()
+
+
+class Startup:
+    def __init__(self):
+        self.ready = False
+        self.seconds: Optional[float] = None  # from start() to ready
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, on_ready: Optional[Callable[[], None]] = None):
+        self._task = asyncio.create_task(self.run(on_ready))
+
+    async def run(self, on_ready: Optional[Callable[[], None]] = None):
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                await run_in_threadpool(prepare_database)
+                break
+            except Exception as e:
+                attempt += 1
+                delay = min(MAX_RETRY_SECONDS, 2 ** attempt)
+                print(f"Startup failed ({type(e).__name__}: {e}); retrying in {delay}s")
+                await asyncio.sleep(delay)
+
+        self.seconds = time.perf_counter() - started
+        self.ready = True
+        print(f"Ready after {self.seconds:.2f}s")
+
+        if on_ready:
+            try:
+                on_ready()
+            except Exception as e:
+                print(f"Error starting background jobs: {e}")
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
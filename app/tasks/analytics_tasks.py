@@ -0,0 +1,20 @@
+from app.database import SessionLocal
+from datetime import datetime
+
+
+def update_sentiment_price_correlations():
+    """Background task to recompute price-sentiment analytics for all tickers"""
+    # pandas is only needed here; keep it out of API process startup
+    from app.services.correlation_service import compute_correlations
+
+    db = SessionLocal()
+
+    try:
+        print(f"Computing price-sentiment correlations at {datetime.now()}")
+        written = compute_correlations(db)
+        print(f"Correlation update completed: {written} rows")
+    except Exception as e:
+        db.rollback()
+        print(f"Error in correlation update: {e}")
+    finally:
+        db.close()
@@ -1,49 +1,191 @@
+import math
+from functools import partial
+
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.events import EVENT_JOB_SUBMITTED
 from app.database import SessionLocal
-from app.models import Ticker
+from app.models import Ticker, TickerRefreshState, RefreshTiming
 from app.services.news_service import NewsService
-from datetime import datetime
+from app.services.summary_service import reconcile_summaries
+from app.tasks.retention_tasks import apply_retention_policies
+from app.tasks.price_tasks import update_prices_for_all_tickers
+from app.tasks.analytics_tasks import update_sentiment_price_correlations
+from app.config import settings
+from app.services.refresh_priority import update_priorities, select_due_tickers, tick_budget, mark_refreshed
+from app.services.coordination import claim, run_exclusive, run_shard, in_shard, LEASE_FRACTION
+from app.services.job_queue import enqueue
+from app.metrics import SCHEDULER_JOB_LAG_SECONDS
+from app.tracing import Span, span, durations_by_name
+from datetime import datetime, timedelta, timezone
+
+
+REFRESH_TICKER_JOB = 'refresh_ticker'
+
+
+def enqueue_ticker_refresh(db, ticker_id: int, priority: int = 0):
+    """Queue a news refresh; a ticker has at most one open refresh job"""
+    return enqueue(db, REFRESH_TICKER_JOB, {'ticker_id': ticker_id},
+                   dedupe_key=f"{REFRESH_TICKER_JOB}:{ticker_id}", priority=priority)
+
+
+def record_refresh_timing(db, ticker_id: int, root: Span):
+    """Store the per-stage breakdown of a refresh from its trace"""
+    totals = durations_by_name(root.trace)
+    save = next((s for s in root.trace if s.name == 'db.save_articles'), None)
+
+    db.add(RefreshTiming(
+        ticker_id=ticker_id,
+        trace_id=root.trace_id,
+        started_at=datetime.fromtimestamp(root.start_ns / 1e9, tz=timezone.utc),
+        total_ms=root.duration_ms,
+        # Dedupe runs inside fetch_all_news
+        fetch_ms=totals.get('fetch_all_news', 0.0) - totals.get('dedupe', 0.0),
+        dedupe_ms=totals.get('dedupe', 0.0),
+        db_ms=totals.get('db.save_articles', 0.0) + totals.get('db.save_insight', 0.0),
+        llm_ms=totals.get('analyze_news_with_ai', 0.0),
+        provider_ms={name[len('fetch.'):]: round(ms, 3) for name, ms in totals.items() if name.startswith('fetch.')},
+        articles_fetched=save.attributes.get('articles', 0) if save else 0,
+        articles_saved=save.attributes.get('saved', 0) if save else 0,
+        status=root.status,
+    ))
+    db.commit()
+
+
+def refresh_ticker_news(db, ticker_id: int):
+    """Job handler: fetch news and AI insights for one ticker"""
+    ticker = db.get(Ticker, ticker_id)
+    if not ticker:
+        return
+    symbol = ticker.symbol
+    print(f"Processing {symbol}")
 
+    with span('refresh_ticker', ticker=symbol, ticker_id=ticker_id) as root:
+        try:
+            NewsService().save_news_and_insights(ticker_id, symbol, db)
+        except Exception:
+            db.rollback()
+            root.status = 'error'
+            raise
+        finally:
+            try:
+                record_refresh_timing(db, ticker_id, root)
+            except Exception as e:
+                db.rollback()
+                print(f"Error recording refresh timing for {symbol}: {e}")
 
-def update_news_for_all_tickers():
-    """Background task to update news for all tickers"""
+    mark_refreshed(db, ticker_id, datetime.now(timezone.utc))
+
+
+def update_news_for_all_tickers(shard: int = 0, shards: int = 1):
+    """Background task to queue news updates for all tickers in a shard"""
     db = SessionLocal()
-    news_service = NewsService()
 
     try:
-        tickers = db.query(Ticker).all()
-        print(f"Updating news for {len(tickers)} tickers at {datetime.now()}")
-
-        for ticker in tickers:
-            print(f"Processing {ticker.symbol}")
-            news_service.save_news_and_insights(ticker.id, ticker.symbol, db)
+        ticker_ids = [tid for (tid,) in db.query(Ticker.id).filter(in_shard(Ticker.id, shard, shards)).all()]
+        print(f"Queueing news updates for {len(ticker_ids)} tickers at {datetime.now()}")
 
-        print(f"Update completed at {datetime.now()}")
+        for ticker_id in ticker_ids:
+            enqueue_ticker_refresh(db, ticker_id)
     except Exception as e:
         print(f"Error in news update: {e}")
     finally:
         db.close()
 
 
+def refresh_due_tickers(shard: int = 0, shards: int = 1):
+    """Background task to queue refreshes for the highest-priority due tickers in a shard"""
+    db = SessionLocal()
+
+    try:
+        now = datetime.now(timezone.utc)
+        # Scores cover every ticker, so one shard job per tick recomputes them
+        if claim(db, 'refresh_priorities', settings.REFRESH_TICK_MINUTES * 60 * LEASE_FRACTION):
+            update_priorities(db, now)
+            db.commit()
+
+        states = db.query(TickerRefreshState).filter(
+            in_shard(TickerRefreshState.ticker_id, shard, shards)
+        ).all()
+        due = select_due_tickers(states, now, math.ceil(tick_budget() / shards))
+        if not due:
+            return
+        print(f"Queueing {len(due)} due tickers at {datetime.now()}")
+
+        for ticker_id in due:
+            enqueue_ticker_refresh(db, ticker_id)
+    except Exception as e:
+        print(f"Error in priority refresh: {e}")
+    finally:
+        db.close()
+
+
+def reconcile_sentiment_summaries():
+    """Background task to check ticker_sentiment_summary against raw rows"""
+    db = SessionLocal()
+
+    try:
+        result = reconcile_summaries(db)
+        print(f"Reconciled {result['checked']} sentiment summaries: "
+              f"{result['missing']} missing, {result['drifted']} drifted")
+    except Exception as e:
+        print(f"Error reconciling sentiment summaries: {e}")
+    finally:
+        db.close()
+
+
+def _add_job(scheduler: BackgroundScheduler, func, name: str, seconds: float,
+             run_at_startup: bool = False, **kwargs):
+    """Interval job guarded by a lease named after the job id; shard jobs pass shard and shards"""
+    runner = run_shard if 'shard' in kwargs else run_exclusive
+    job = partial(runner, name, seconds * LEASE_FRACTION, func, **kwargs)
+    # Jitter spreads shard claims across replicas whose timers line up
+    jitter = min(60, int(seconds * 0.05)) if settings.SCHEDULER_MODE == 'lease' else None
+
+    scheduler.add_job(job, 'interval', seconds=seconds, id=name, jitter=jitter)
+    if run_at_startup:
+        # Same lease as the interval job, so N replicas starting together run it once.
+        # Delayed so a fresh process serves its first requests before refreshing
+        run_date = datetime.now() + timedelta(seconds=settings.STARTUP_REFRESH_DELAY_SECONDS)
+        scheduler.add_job(job, 'date', run_date=run_date, id=f"{name}_startup")
+
+
 def start_news_scheduler():
-    """Start the background scheduler"""
+    """Start the background scheduler; returns None when SCHEDULER_MODE is 'off'"""
+    if settings.SCHEDULER_MODE == 'off':
+        print("News scheduler disabled")
+        return None
+
     scheduler = BackgroundScheduler()
+    shards = max(1, settings.SCHEDULER_SHARDS)
+
+    for shard in range(shards):
+        name = 'news_update_job' if shards == 1 else f"news_update_job:{shard}"
+        if settings.REFRESH_MODE == 'fixed':
+            # Update every 4 hours
+            _add_job(scheduler, update_news_for_all_tickers, name, 4 * 3600,
+                     run_at_startup=True, shard=shard, shards=shards)
+        else:
+            # Refresh due tickers by priority within the request budget
+            _add_job(scheduler, refresh_due_tickers, name, settings.REFRESH_TICK_MINUTES * 60,
+                     run_at_startup=True, shard=shard, shards=shards)
+
+    # Check incremental summaries against raw data once a day
+    _add_job(scheduler, reconcile_sentiment_summaries, 'summary_reconcile_job', 24 * 3600)
+
+    # Pull new daily price bars into the cache
+    _add_job(scheduler, update_prices_for_all_tickers, 'price_update_job', settings.PRICE_REFRESH_MINUTES * 60)
+
+    # Recompute price-sentiment analytics once a day
+    _add_job(scheduler, update_sentiment_price_correlations, 'correlation_job', 24 * 3600)
+
+    # Archive, compact and purge old rows once a day
+    _add_job(scheduler, apply_retention_policies, 'retention_job', 24 * 3600)
 
-    # Update every 4 hours
-    scheduler.add_job(
-        update_news_for_all_tickers,
-        'interval',
-        hours=4,
-        id='news_update_job'
-    )
-
-    # Run on startup
-    scheduler.add_job(
-        update_news_for_all_tickers,
-        'date',
-        run_date=datetime.now()
-    )
+    def record_lag(event):
+        lag = (datetime.now(timezone.utc) - event.scheduled_run_times[0]).total_seconds()
+        SCHEDULER_JOB_LAG_SECONDS.labels(event.job_id).observe(max(0.0, lag))
 
+    scheduler.add_listener(record_lag, EVENT_JOB_SUBMITTED)
     scheduler.start()
-    print("News scheduler started")
-    return scheduler
\ No newline at end of file
+    print(f"News scheduler started ({settings.SCHEDULER_MODE} mode, {shards} shard(s))")
+    return scheduler
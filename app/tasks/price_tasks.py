@@ -0,0 +1,21 @@
+from app.database import SessionLocal
+from app.models import Ticker
+from app.services.price_service import get_price_service
+from datetime import datetime
+
+
+def update_prices_for_all_tickers(interval: str = '1d'):
+    """Background task to pull missing price bars for every ticker"""
+    db = SessionLocal()
+
+    try:
+        symbols = [symbol for (symbol,) in db.query(Ticker.symbol).all()]
+        print(f"Updating {interval} prices for {len(symbols)} tickers at {datetime.now()}")
+
+        added = get_price_service().update(symbols, interval)
+
+        print(f"Price update completed: {sum(added.values())} bars across {len(added)} tickers")
+    except Exception as e:
+        print(f"Error in price update: {e}")
+    finally:
+        db.close()
@@ -0,0 +1,28 @@
+import sys
+
+from app.database import SessionLocal, engine
+from app.services.retention_service import run_retention, convert_news_articles_to_partitioned
+from datetime import datetime
+
+
+def apply_retention_policies():
+    """Background task to archive, compact and purge old news and insights"""
+    db = SessionLocal()
+
+    try:
+        print(f"Running retention at {datetime.now()}")
+        result = run_retention(db, engine)
+        print(f"Retention completed: {result}")
+    except Exception as e:
+        db.rollback()
+        print(f"Error in retention job: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    # python -m app.tasks.retention_tasks [--partition-news]
+    if "--partition-news" in sys.argv:
+        convert_news_articles_to_partitioned(engine)
+        print("news_articles is now partitioned by month of published_at")
+    apply_retention_policies()
@@ -1,5 +1,73 @@
-import yfinance as yf
-from fastapi import HTTPException, status, Depends
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+
+# Symbols Yahoo does not know are remembered for less time than real ones
+NOT_FOUND_TTL_SECONDS = 3600
+MAX_CACHED_SYMBOLS = 10_000
+
+# symbol -> (expires at, info or None if not found)
+_cache: Dict[str, Tuple[float, Optional[dict]]] = {}
+_cache_lock = threading.Lock()
+
+
+def _lookup(symbol: str) -> Optional[dict]:
+    """Ticker information from yfinance, or None if the symbol is invalid"""
+    import yfinance as yf
+
+    # Try to fetch ticker data from yfinance
+    info = yf.Ticker(symbol).info
+
+    # Check if we got valid data
+    if not info or 'symbol' not in info:
+        return None
+
+    # Determine if it's stock or crypto
+    quote_type = info.get('quoteType', '').lower()
+
+    if quote_type == 'cryptocurrency':
+        ticker_type = 'crypto'
+    elif quote_type in ['equity', 'etf']:
+        ticker_type = 'stock'
+    else:
+        # Fallback: check if symbol ends with common crypto suffixes
+        if symbol.endswith('-USD') or symbol.endswith('USD'):
+            ticker_type = 'crypto'
+        else:
+            ticker_type = 'stock'
+
+    # Get the long name or short name
+    name = info.get('longName') or info.get('shortName') or symbol
+
+    return {
+        'name': name,
+        'type': ticker_type,
+        'exchange': info.get('exchange', 'Unknown'),
+        'currency': info.get('currency', 'USD')
+    }
+
+
+def _cached_lookup(symbol: str) -> Optional[dict]:
+    """`_lookup` through the cache; lookup errors are raised and not cached"""
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(symbol)
+    if hit and hit[0] > now:
+        return hit[1]
+
+    info = _lookup(symbol)
+    ttl = settings.TICKER_VALIDATION_CACHE_HOURS * 3600 if info else NOT_FOUND_TTL_SECONDS
+    with _cache_lock:
+        if symbol not in _cache and len(_cache) >= MAX_CACHED_SYMBOLS:
+            _cache.pop(next(iter(_cache)))
+        _cache[symbol] = (now + ttl, info)
+    return info
 
 
 # Helper function to validate ticker
@@ -12,43 +80,33 @@ async def validate_ticker(symbol: str) -> dict:
     symbol = symbol.upper()
 
     try:
-        # Try to fetch ticker data from yfinance
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-
-        # Check if we got valid data
-        if not info or 'symbol' not in info:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Ticker {symbol} not found or is invalid"
-            )
-
-        # Determine if it's stock or crypto
-        quote_type = info.get('quoteType', '').lower()
-
-        if quote_type == 'cryptocurrency':
-            ticker_type = 'crypto'
-        elif quote_type in ['equity', 'etf']:
-            ticker_type = 'stock'
-        else:
-            # Fallback: check if symbol ends with common crypto suffixes
-            if symbol.endswith('-USD') or symbol.endswith('USD'):
-                ticker_type = 'crypto'
-            else:
-                ticker_type = 'stock'
-
-        # Get the long name or short name
-        name = info.get('longName') or info.get('shortName') or symbol
-
-        return {
-            'name': name,
-            'type': ticker_type,
-            'exchange': info.get('exchange', 'Unknown'),
-            'currency': info.get('currency', 'USD')
-        }
-
+        # yfinance blocks, so keep it off the event loop
+        info = await run_in_threadpool(_cached_lookup, symbol)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Unable to validate ticker {symbol}: {str(e)}"
         )
+
+    if info is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Ticker {symbol} not found or is invalid"
+        )
+
+    return info
+
+
+async def validate_tickers(symbols: List[str]) -> Dict[str, Union[dict, str]]:
+    """Validate many symbols concurrently: symbol -> information, or the error detail"""
+    semaphore = asyncio.Semaphore(settings.TICKER_VALIDATION_CONCURRENCY)
+
+    async def validate_one(symbol: str):
+        async with semaphore:
+            try:
+                return await validate_ticker(symbol)
+            except HTTPException as e:
+                return e.detail
+
+    results = await asyncio.gather(*(validate_one(symbol) for symbol in symbols))
+    return dict(zip(symbols, results))
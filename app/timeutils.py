@@ -0,0 +1,16 @@
+"""
+Timestamps are UTC throughout the app. Naive datetimes, which SQLite returns
+and some providers send, are taken to be UTC.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Aware UTC datetime; naive values are assumed to already be UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
@@ -0,0 +1,167 @@
+"""
+Lightweight tracing for the refresh pipeline.
+
+Spans follow the OpenTelemetry model: 32-hex trace ids, 16-hex span ids,
+parent links, nanosecond timestamps, attributes and a status. The current
+span lives in a contextvar, so nested `span()` blocks form a tree without
+passing anything around.
+
+When a root span ends, the whole trace is exported as one JSON object per
+span to TRACE_FILE, and posted as OTLP/HTTP JSON to TRACE_OTLP_ENDPOINT when
+that is set (for example a local collector on :4318).
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, List, Optional
+
+from app.config import settings
+from app.errors import describe_error
+
+
+class Span:
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'attributes',
+                 'start_ns', 'end_ns', 'status', 'trace')
+
+    def __init__(self, name: str, parent: Optional['Span'], attributes: Dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = 'ok'
+        # Finished spans of the whole trace, shared by every span in it
+        self.trace: List['Span'] = parent.trace if parent else []
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict:
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id,
+            'name': self.name,
+            'startTimeUnixNano': self.start_ns,
+            'endTimeUnixNano': self.end_ns,
+            'durationMs': round(self.duration_ms, 3),
+            'status': self.status,
+            'attributes': self.attributes,
+        }
+
+
+_current: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+_file_lock = threading.Lock()
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    parent = _current.get()
+    s = Span(name, parent, attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except Exception as e:
+        s.status = 'error'
+        s.attributes['error'] = describe_error(e)
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current.reset(token)
+        s.trace.append(s)
+        if parent is None:
+            export(s.trace)
+
+
+def traced(name: str):
+    """Decorator form of `span`"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _write_file(spans: List[Span]):
+    path = settings.TRACE_FILE
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    lines = "".join(json.dumps(s.to_dict(), default=str) + "\n" for s in spans)
+    with _file_lock:
+        # Keep one rotated file so traces cannot fill the disk
+        if os.path.exists(path) and os.path.getsize(path) > settings.TRACE_FILE_MAX_MB * 1024 * 1024:
+            os.replace(path, f"{path}.1")
+        with open(path, 'a') as f:
+            f.write(lines)
+
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _post_otlp(spans: List[Span]):
+    import requests
+
+    payload = {'resourceSpans': [{
+        'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': settings.APP_NAME}}]},
+        'scopeSpans': [{
+            'scope': {'name': 'app.tracing'},
+            'spans': [{
+                'traceId': s.trace_id,
+                'spanId': s.span_id,
+                'parentSpanId': s.parent_id or '',
+                'name': s.name,
+                'kind': 1,
+                'startTimeUnixNano': str(s.start_ns),
+                'endTimeUnixNano': str(s.end_ns),
+                'attributes': [{'key': k, 'value': _otlp_value(v)} for k, v in s.attributes.items()],
+                'status': {'code': 2 if s.status == 'error' else 1},
+            } for s in spans],
+        }],
+    }]}
+    requests.post(settings.TRACE_OTLP_ENDPOINT, json=payload, timeout=2)
+
+
+def export(spans: List[Span]):
+    """Write a finished trace; export errors never affect the traced work"""
+    try:
+        if settings.TRACE_FILE:
+            _write_file(spans)
+        if settings.TRACE_OTLP_ENDPOINT:
+            _post_otlp(spans)
+    except Exception as e:
+        print(f"Error exporting trace: {e}")
+
+
+def durations_by_name(spans: List[Span]) -> Dict[str, float]:
+    """Total milliseconds per span name"""
+    totals: Dict[str, float] = {}
+    for s in spans:
+        totals[s.name] = totals.get(s.name, 0.0) + s.duration_ms
+    return totals
@@ -0,0 +1,88 @@
+"""
+Static assets and page shells for the web interface.
+
+Static files are served under content-hashed names, for example
+css/styles.3f2a9c1b0d4e.css, with a long `immutable` Cache-Control. Browsers
+then never revalidate them, and a changed file gets a new URL. Templates link
+to them with `{{ static_url('css/styles.css') }}`. Unhashed names still
+work, with `no-cache`.
+
+The login and dashboard pages hold no per-request data. They are rendered
+once per process and stored precompressed. They are served with an ETag and
+`no-cache`, so browsers revalidate (usually a 304) and pick up new asset URLs
+after a deploy.
+"""
+
+import hashlib
+import os
+from typing import Dict, Iterable
+
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.staticfiles import StaticFiles
+from fastapi.templating import Jinja2Templates
+
+from app.compression import accepted_encoding, brotli, compress
+from app.config import settings
+
+
+class StaticManifest:
+    """Maps static paths to content-hashed names and back"""
+
+    def __init__(self, directory: str):
+        self.urls: Dict[str, str] = {}
+        self.files: Dict[str, str] = {}
+        for root, _, names in os.walk(directory):
+            for name in names:
+                full_path = os.path.join(root, name)
+                path = os.path.relpath(full_path, directory).replace(os.sep, '/')
+                with open(full_path, 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()[:12]
+                stem, ext = os.path.splitext(path)
+                hashed = f"{stem}.{digest}{ext}"
+                self.urls[path] = hashed
+                self.files[hashed] = path
+
+    def url(self, path: str) -> str:
+        return f"/static/{self.urls.get(path, path)}"
+
+
+class HashedStaticFiles(StaticFiles):
+    def __init__(self, *, directory: str, manifest: StaticManifest, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope):
+        original = self.manifest.files.get(path.replace(os.sep, '/'))
+        response = await super().get_response(original or path, scope)
+        if original:
+            response.headers['Cache-Control'] = f"public, max-age={settings.STATIC_MAX_AGE_SECONDS}, immutable"
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+
+class ShellPages:
+    """Templates rendered once, with gzip and Brotli variants"""
+
+    def __init__(self, templates: Jinja2Templates, names: Iterable[str]):
+        self.pages = {}
+        for name in names:
+            body = templates.get_template(name).render().encode()
+            variants = {None: body, 'gzip': compress(body, 'gzip')}
+            if brotli is not None:
+                variants['br'] = compress(body, 'br')
+            # Weak, since the compressed variants share it
+            etag = f'W/"{hashlib.sha256(body).hexdigest()[:16]}"'
+            self.pages[name] = (etag, variants)
+
+    def response(self, name: str, request: Request) -> Response:
+        etag, variants = self.pages[name]
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        if etag in request.headers.get('if-none-match', ''):
+            return Response(status_code=304, headers=headers)
+
+        encoding = accepted_encoding(request.headers)
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return Response(content=variants[encoding], media_type='text/html', headers=headers)
@@ -0,0 +1,139 @@
+"""
+Background worker: runs the scheduler and executes queued jobs.
+
+    python -m app.worker
+
+Run any number of workers; scheduled jobs are coordinated through leases and
+queued jobs are claimed one worker at a time. With EMBEDDED_WORKER enabled
+the API process starts the same loop in a thread instead.
+"""
+
+import signal
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+from prometheus_client import start_http_server
+
+from app.config import settings
+from app.database import SessionLocal, engine, POOL_CAPACITY
+from app.models import Job
+from app.services import job_queue
+from app.services.coordination import INSTANCE_ID
+from app.services.circuit_breaker import publish_breaker_states
+from app.metrics import instrument_engine, instrument_pool, QUEUE_JOB_WAIT_SECONDS, QUEUE_JOB_SECONDS
+from app.tasks.news_tasks import REFRESH_TICKER_JOB, refresh_ticker_news, start_news_scheduler
+from app.startup import prepare_database
+
+# Job kind -> handler(db, **payload)
+JOB_HANDLERS: Dict[str, Callable] = {
+    REFRESH_TICKER_JOB: refresh_ticker_news,
+}
+
+HOUSEKEEPING_SECONDS = 60
+
+
+class Worker:
+    def __init__(self, worker_id: str = INSTANCE_ID, poll_seconds: Optional[float] = None):
+        self.worker_id = worker_id
+        self.poll_seconds = poll_seconds or settings.WORKER_POLL_SECONDS
+        self.stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_housekeeping = 0.0
+
+    def run_once(self) -> bool:
+        """Claim and run one job; returns False when the queue had nothing runnable"""
+        db = SessionLocal()
+        try:
+            job = job_queue.claim_next(db, self.worker_id, list(JOB_HANDLERS))
+            if job is None:
+                return False
+
+            kind = job.kind
+            run_after = job.run_after if job.run_after.tzinfo else job.run_after.replace(tzinfo=timezone.utc)
+            QUEUE_JOB_WAIT_SECONDS.labels(kind).observe(
+                max(0.0, (datetime.now(timezone.utc) - run_after).total_seconds())
+            )
+
+            start = time.monotonic()
+            try:
+                JOB_HANDLERS[kind](db, **job.payload)
+            except Exception as e:
+                db.rollback()
+                print(f"Job {job.id} ({kind}) failed: {e}")
+                job_queue.fail(db, db.get(Job, job.id), str(e))
+                QUEUE_JOB_SECONDS.labels(kind, 'failed').observe(time.monotonic() - start)
+            else:
+                job_queue.complete(db, job)
+                QUEUE_JOB_SECONDS.labels(kind, 'done').observe(time.monotonic() - start)
+            return True
+        finally:
+            db.close()
+
+    def housekeeping(self):
+        db = SessionLocal()
+        try:
+            released = job_queue.requeue_stale(db)
+            if released:
+                print(f"Requeued {released} stale jobs")
+            job_queue.purge_finished(db)
+            publish_breaker_states(db, self.worker_id)
+        except Exception as e:
+            db.rollback()
+            print(f"Error in job housekeeping: {e}")
+        finally:
+            db.close()
+
+    def run(self):
+        print(f"Worker {self.worker_id} started")
+        while not self.stop_event.is_set():
+            if time.monotonic() - self._last_housekeeping > HOUSEKEEPING_SECONDS:
+                self._last_housekeeping = time.monotonic()
+                self.housekeeping()
+            try:
+                ran = self.run_once()
+            except Exception as e:
+                print(f"Error claiming job: {e}")
+                ran = False
+            if not ran:
+                self.stop_event.wait(self.poll_seconds)
+        print(f"Worker {self.worker_id} stopped")
+
+    def start(self):
+        """Run in a daemon thread, for the embedded worker"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="job-worker", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+
+def main():
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine)
+        instrument_pool(engine, POOL_CAPACITY)
+        if settings.WORKER_METRICS_PORT:
+            start_http_server(settings.WORKER_METRICS_PORT)
+
+    prepare_database()
+
+    worker = Worker()
+    # Let the current job finish on docker stop / Ctrl-C
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop_event.set())
+
+    scheduler = start_news_scheduler()
+    try:
+        worker.run()
+    finally:
+        if scheduler:
+            scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: Parquet export vs the JSON endpoint path on a synthetic dataset.
+
+    python -m benchmarks.bench_export --articles 1000000
+
+The JSON path mirrors what `/api/news/ticker/{symbol}/news` does for every
+row: load ORM objects, validate them through `NewsArticleSchema` and encode.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.synthetic import make_session, seed
+from app.models import NewsArticle
+from app.schemas import NewsArticleSchema
+from app.services.export_service import SentimentExportService
+
+
+def dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
+
+
+def bench_json(db, batch_size: int):
+    start = time.perf_counter()
+    total_bytes = 0
+    for article in db.query(NewsArticle).order_by(NewsArticle.id).yield_per(batch_size):
+        total_bytes += len(NewsArticleSchema.model_validate(article).model_dump_json())
+    return time.perf_counter() - start, total_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=1_000_000)
+    parser.add_argument("--tickers", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_export_")
+    try:
+        db, _ = make_session(os.path.join(workdir, "bench.db"))
+        print(f"Seeding {args.articles} articles across {args.tickers} tickers...")
+        seed(db, n_tickers=args.tickers, n_articles=args.articles, n_insights=args.articles // 10)
+
+        json_seconds, json_bytes = bench_json(db, args.batch_size)
+        db.expunge_all()
+
+        export_dir = os.path.join(workdir, "export")
+        service = SentimentExportService(export_dir=export_dir, batch_size=args.batch_size)
+        start = time.perf_counter()
+        exported = service.export_articles(db)
+        parquet_seconds = time.perf_counter() - start
+        parquet_bytes = dir_size(export_dir)
+
+        # Incremental run with nothing new should be close to free
+        start = time.perf_counter()
+        service.export_articles(db)
+        noop_seconds = time.perf_counter() - start
+
+        print(json.dumps({
+            "rows": args.articles,
+            "json": {"seconds": round(json_seconds, 2), "bytes": json_bytes,
+                     "rows_per_sec": int(args.articles / json_seconds)},
+            "parquet": {"seconds": round(parquet_seconds, 2), "bytes": parquet_bytes,
+                        "rows_per_sec": int(exported / parquet_seconds)},
+            "incremental_noop_seconds": round(noop_seconds, 3),
+        }, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
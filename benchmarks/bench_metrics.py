@@ -0,0 +1,115 @@
+"""
+Benchmark: overhead of Prometheus instrumentation on hot endpoints.
+
+    python -m benchmarks.bench_metrics --requests 2000
+
+Serves the same routes from two apps over one synthetic SQLite database:
+one plain, one with MetricsMiddleware and SQLAlchemy query events. Requests
+alternate between the two so drift affects both equally. Reports per-route
+latency and the relative overhead, which should stay under 2%.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.synthetic import make_session, seed
+from app.auth import create_access_token, get_password_hash
+from app.database import get_db
+from app.metrics import MetricsMiddleware, instrument_engine
+from app.models import User, Ticker
+from app.routers import dashboard, news, tickers
+
+ROUTES = [
+    "/api/news/dashboard-news?hours=168",
+    "/api/news/ticker/T00001/news",
+    "/api/news/ticker/T00001/sentiment?bucket=1d",
+    "/api/tickers/all",
+    "/api/dashboard/",
+]
+
+
+def build_app(db_url: str, instrumented: bool) -> FastAPI:
+    engine = create_engine(db_url)
+    if instrumented:
+        instrument_engine(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    app.include_router(dashboard.router, prefix="/api/dashboard")
+    app.include_router(tickers.router, prefix="/api/tickers")
+    app.include_router(news.router, prefix="/api/news")
+    app.dependency_overrides[get_db] = override_db
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--user-tickers", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_metrics_")
+    try:
+        db_path = os.path.join(workdir, "bench.db")
+        db, _ = make_session(db_path)
+        seed(db, n_tickers=args.tickers, n_articles=args.articles, n_insights=args.articles // 10, days=30)
+        user = User(email="bench@example.com", username="bench", hashed_password=get_password_hash("bench"))
+        user.tickers = db.query(Ticker).order_by(Ticker.id).limit(args.user_tickers).all()
+        db.add(user)
+        db.commit()
+        db.close()
+
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench'})}"}
+        clients = {
+            "plain": TestClient(build_app(f"sqlite:///{db_path}", False)),
+            "instrumented": TestClient(build_app(f"sqlite:///{db_path}", True)),
+        }
+
+        results = {}
+        for route in ROUTES:
+            timings = {name: [] for name in clients}
+            # Warm up: connection pools, route caches
+            for client in clients.values():
+                client.get(route, headers=headers).raise_for_status()
+            for _ in range(args.requests):
+                for name, client in clients.items():
+                    start = time.perf_counter()
+                    client.get(route, headers=headers)
+                    timings[name].append(time.perf_counter() - start)
+
+            plain = statistics.median(timings["plain"])
+            instrumented = statistics.median(timings["instrumented"])
+            results[route] = {
+                "plain_p50_ms": round(plain * 1000, 3),
+                "instrumented_p50_ms": round(instrumented * 1000, 3),
+                "overhead_pct": round((instrumented / plain - 1) * 100, 2),
+            }
+
+        print(json.dumps(results, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Benchmark: dashboard-news serialization, Pydantic path vs row tuples + orjson.
+
+    python -m benchmarks.bench_serialization --requests 500 --user-tickers 40 --hours 168
+
+Serves /api/news/dashboard-news from two apps over one synthetic SQLite
+database. "pydantic" is the previous path: ORM instances validated into
+TickerDashboardData and encoded by the default JSONResponse. "orjson" is the
+current router: column tuples to dicts, encoded by ORJSONResponse. Both use
+the same queries. Requests alternate between the apps. Reports wall time, CPU
+time per request and bytes/sec per app.
+
+A second section times serialization alone over the same loaded data.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, desc, func
+from sqlalchemy.orm import Session, sessionmaker
+
+from benchmarks.synthetic import make_session, seed
+from app.auth import create_access_token, get_current_active_user, get_password_hash
+from app.database import get_db
+from app.models import User, Ticker, NewsArticle, AIInsight, TickerSentimentSummary
+from app.responses import ORJSONResponse
+from app.routers import news
+from app.schemas import TickerDashboardData
+from app.services.summary_service import summary_for_window
+from app.services.watchlist import user_ticker_rows
+
+PATH = "/api/news/dashboard-news"
+
+
+def _orm_latest_per_ticker(db: Session, model, time_column, ticker_ids, since, limit):
+    """The same windowed query as the router, loading ORM instances"""
+    rank = func.row_number().over(partition_by=model.ticker_id, order_by=desc(time_column)).label('rank')
+    ranked = db.query(model.id.label('id'), rank).filter(
+        model.ticker_id.in_(ticker_ids), time_column >= since
+    ).subquery()
+    rows = db.query(model).join(ranked, model.id == ranked.c.id).filter(
+        ranked.c.rank <= limit
+    ).order_by(desc(time_column)).all()
+    grouped = {ticker_id: [] for ticker_id in ticker_ids}
+    for row in rows:
+        grouped[row.ticker_id].append(row)
+    return grouped
+
+
+def load_pydantic(db: Session, user_id: int, hours: int) -> List[TickerDashboardData]:
+    since = datetime.now() - timedelta(hours=hours)
+    tickers = user_ticker_rows(db, user_id)
+    ticker_ids = [t.id for t in tickers]
+    summaries = {s.ticker_id: s for s in db.query(TickerSentimentSummary).filter(
+        TickerSentimentSummary.ticker_id.in_(ticker_ids)
+    )}
+    latest_news = _orm_latest_per_ticker(db, NewsArticle, NewsArticle.published_at, ticker_ids, since, 10)
+    latest_insights = _orm_latest_per_ticker(db, AIInsight, AIInsight.created_at, ticker_ids, since, 3)
+
+    dashboards = []
+    for ticker in tickers:
+        overall_sentiment, sources_count = summary_for_window(summaries.get(ticker.id), since)
+        dashboards.append(TickerDashboardData(
+            ticker_symbol=ticker.symbol,
+            ticker_name=ticker.name,
+            ticker_type=ticker.type,
+            latest_news=latest_news[ticker.id],
+            ai_insights=latest_insights[ticker.id],
+            overall_sentiment=overall_sentiment,
+            news_sources_count=sources_count
+        ))
+    return dashboards
+
+
+def build_app(db_url: str, fast: bool) -> FastAPI:
+    engine = create_engine(db_url)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    if fast:
+        app = FastAPI(default_response_class=ORJSONResponse)
+        app.include_router(news.router, prefix="/api/news")
+    else:
+        app = FastAPI()
+        router = APIRouter()
+
+        @router.get(PATH, response_model=List[TickerDashboardData])
+        async def dashboard_news(hours: int = 24, db: Session = Depends(get_db),
+                                 current_user: User = Depends(get_current_active_user)):
+            return load_pydantic(db, current_user.id, hours)
+
+        app.include_router(router)
+    app.dependency_overrides[get_db] = override_db
+    return app
+
+
+def serialization_only(session_factory, user_id: int, hours: int, repeats: int):
+    """Time turning already-loaded data into JSON bytes, per path"""
+    db = session_factory()
+    try:
+        models = load_pydantic(db, user_id, hours)
+        dicts = [m.model_dump() for m in models]
+    finally:
+        db.close()
+
+    adapter = TypeAdapter(List[TickerDashboardData])
+    results = {}
+    for name, encode in (
+        # What FastAPI does with a response_model: dump, validate, serialize, then json.dumps
+        ("pydantic", lambda: json.dumps(
+            adapter.dump_python(adapter.validate_python([m.model_dump() for m in models]), mode="json"),
+            ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode()),
+        ("orjson", lambda: ORJSONResponse(dicts).body),
+    ):
+        encode()
+        start_cpu = time.process_time()
+        for _ in range(repeats):
+            body = encode()
+        cpu = time.process_time() - start_cpu
+        results[name] = {
+            "cpu_ms_per_response": round(cpu / repeats * 1000, 3),
+            "bytes": len(body),
+            "mb_per_cpu_second": round(len(body) * repeats / cpu / 1e6, 1),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--articles", type=int, default=200_000)
+    parser.add_argument("--user-tickers", type=int, default=40)
+    parser.add_argument("--hours", type=int, default=168)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_serialization_")
+    try:
+        db_path = os.path.join(workdir, "bench.db")
+        db, _ = make_session(db_path)
+        seed(db, n_tickers=args.tickers, n_articles=args.articles, n_insights=args.articles // 10, days=30)
+        user = User(email="bench@example.com", username="bench", hashed_password=get_password_hash("bench"))
+        user.tickers = db.query(Ticker).order_by(Ticker.id).limit(args.user_tickers).all()
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        db.close()
+
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench'})}"}
+        url = f"{PATH}?hours={args.hours}"
+        clients = {
+            "pydantic": TestClient(build_app(f"sqlite:///{db_path}", False)),
+            "orjson": TestClient(build_app(f"sqlite:///{db_path}", True)),
+        }
+        # Warm up both apps before timing
+        for name in ("orjson", "pydantic"):
+            clients[name].get(url, headers=headers).raise_for_status()
+
+        totals = {name: {"wall": 0.0, "cpu": 0.0, "bytes": 0} for name in clients}
+        for _ in range(args.requests):
+            for name, client in clients.items():
+                start_wall, start_cpu = time.perf_counter(), time.process_time()
+                response = client.get(url, headers=headers)
+                totals[name]["wall"] += time.perf_counter() - start_wall
+                totals[name]["cpu"] += time.process_time() - start_cpu
+                totals[name]["bytes"] += len(response.content)
+
+        end_to_end = {
+            name: {
+                "wall_ms_per_request": round(t["wall"] / args.requests * 1000, 3),
+                "cpu_ms_per_request": round(t["cpu"] / args.requests * 1000, 3),
+                "response_bytes": t["bytes"] // args.requests,
+                "mb_per_second": round(t["bytes"] / t["wall"] / 1e6, 2),
+            }
+            for name, t in totals.items()
+        }
+        end_to_end["cpu_speedup"] = round(totals["pydantic"]["cpu"] / totals["orjson"]["cpu"], 2)
+
+        session_factory = sessionmaker(bind=create_engine(f"sqlite:///{db_path}"))
+        print(json.dumps({
+            "end_to_end": end_to_end,
+            "serialization_only": serialization_only(session_factory, user_id, args.hours, args.requests),
+        }, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
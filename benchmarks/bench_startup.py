@@ -0,0 +1,164 @@
+"""
+Benchmark: API process cold start.
+
+    python -m benchmarks.bench_startup --runs 5
+
+Every measurement runs in fresh interpreters against an empty SQLite
+database, with the scheduler off. The OS file cache is warm after the first
+run.
+
+- import: median time of `import main`, and which heavy packages that import
+  loaded. yfinance, pandas, anthropic and requests should not be among them;
+  they load on first use.
+- deferred: median time to import those packages, which the first refresh,
+  ticker validation or analytics job now pays instead of startup.
+- importtime: the slowest modules by cumulative time, from
+  `python -X importtime -c "import main"`.
+- ready: median time from spawning `uvicorn main:app` to the first 200 from
+  /health/live and from /health/ready.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["yfinance", "pandas", "pyarrow", "numpy", "anthropic", "requests"]
+DEFERRED_MODULES = ["yfinance", "pandas", "anthropic", "requests"]
+
+IMPORT_MAIN = (
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import main\n"
+    "print(json.dumps({'seconds': time.perf_counter() - start,\n"
+    "                  'loaded': [m for m in %r if m in sys.modules]}))\n"
+) % HEAVY_MODULES
+
+IMPORT_DEFERRED = (
+    "import importlib, json, time\n"
+    "start = time.perf_counter()\n"
+    "for name in %r:\n"
+    "    importlib.import_module(name)\n"
+    "print(json.dumps({'seconds': time.perf_counter() - start}))\n"
+) % DEFERRED_MODULES
+
+
+def run_python(env, code, *flags) -> subprocess.CompletedProcess:
+    result = subprocess.run([sys.executable, *flags, "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return result
+
+
+def median_seconds(env, code, runs: int):
+    """Median in-process seconds over fresh interpreters, and the last run's output"""
+    samples, output = [], None
+    for _ in range(runs):
+        output = json.loads(run_python(env, code).stdout.strip().splitlines()[-1])
+        samples.append(output["seconds"])
+    return statistics.median(samples), output
+
+
+def slowest_imports(env, top: int):
+    """Modules with the largest cumulative import time under `import main`"""
+    stderr = run_python(env, "import main", "-X", "importtime").stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "cumulative_ms": round(int(cumulative_us) / 1000, 1),
+            "self_ms": round(int(self_us) / 1000, 1),
+        })
+    modules.sort(key=lambda m: m["cumulative_ms"], reverse=True)
+    return modules[:top]
+
+
+def time_to_ready(env, port: int, timeout: float = 60):
+    """Seconds from spawning uvicorn to the first 200 from /health/live and /health/ready"""
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL
+    )
+    timings = {}
+    try:
+        while len(timings) < 2:
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError(f"App did not become ready at {url}")
+            for name in ("live", "ready"):
+                if name in timings:
+                    continue
+                try:
+                    if httpx.get(f"{url}/health/{name}", timeout=1).status_code == 200:
+                        timings[name] = time.perf_counter() - start
+                except httpx.HTTPError:
+                    pass
+            time.sleep(0.02)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'startup.db')}",
+            DEBUG="false",
+            SCHEDULER_MODE="off",
+            EMBEDDED_WORKER="false",
+            TRACE_FILE=os.path.join(workdir, "spans.jsonl"),
+            PRICE_CACHE_DIR=os.path.join(workdir, "price_cache"),
+        )
+        import_seconds, output = median_seconds(env, IMPORT_MAIN, args.runs)
+        deferred_seconds, _ = median_seconds(env, IMPORT_DEFERRED, args.runs)
+
+        ready = []
+        for run in range(args.runs):
+            # A new database each run, so create_all does its full work
+            run_env = dict(env, DATABASE_URL=f"sqlite:///{os.path.join(workdir, f'startup{run}.db')}")
+            ready.append(time_to_ready(run_env, args.port))
+
+        print(json.dumps({
+            "import": {
+                "median_ms": round(import_seconds * 1000, 1),
+                "heavy_modules_loaded": output["loaded"],
+            },
+            "deferred": {
+                "modules": DEFERRED_MODULES,
+                "median_ms": round(deferred_seconds * 1000, 1),
+            },
+            "importtime": slowest_imports(env, args.top),
+            "ready": {
+                f"{name}_median_ms": round(statistics.median(r[name] for r in ready) * 1000, 1)
+                for name in ("live", "ready")
+            },
+        }, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Local stand-ins for the news providers and the Anthropic API.
+
+    fakes = FakeProviders(latency=0.05, llm_latency=0.5).start()
+    fakes.configure()   # point settings and API keys at the fakes
+    ...
+    fakes.stop()
+
+One threaded HTTP server answers Alpha Vantage, Finnhub, Marketaux and
+Anthropic Messages requests with synthetic payloads in each provider's
+format. Latency, jitter and error rate are configurable. Every article gets
+a fresh URL so refreshes keep inserting rows.
+
+    python -m benchmarks.fake_providers --port 9900 --latency 0.1
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks.synthetic import WORDS
+
+ANALYSIS = {
+    "summary": "Synthetic analysis for benchmarking.",
+    "sentiment": "neutral",
+    "sentiment_reasoning": "Generated by the fake provider server.",
+    "short_term_impact": "None",
+    "long_term_impact": "None",
+    "risks": "None",
+    "opportunities": "None",
+    "source_agreement": "High",
+    "confidence_score": 50,
+}
+
+
+class FakeProviders:
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, error_rate: float = 0.0,
+                 llm_latency: float = 0.5, articles: int = 10, port: int = 0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.llm_latency = llm_latency
+        self.articles = articles
+        self.port = port
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._ids = itertools.count()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "FakeProviders":
+        fakes = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fakes._handle(self)
+
+            def do_POST(self):
+                fakes._handle(self)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def configure(self, providers=("alphavantage", "finnhub", "marketaux")):
+        """Point the app's provider settings at this server"""
+        from app.config import settings
+
+        settings.NEWS_PROVIDERS = list(providers)
+        settings.ALPHAVANTAGE_URL = f"{self.base_url}/alphavantage/query"
+        settings.FINNHUB_URL = f"{self.base_url}/finnhub/company-news"
+        settings.MARKETAUX_URL = f"{self.base_url}/marketaux/news/all"
+        settings.ANTHROPIC_BASE_URL = f"{self.base_url}/anthropic"
+        for key in ("ANTHROPIC_API_KEY", "ALPHAVANTAGE_API_KEY", "FINNHUB_API_KEY", "MARKETAUX_API_KEY"):
+            os.environ[key] = "fake"
+
+    # --- request handling ---------------------------------------------------
+
+    def _sleep(self, base: float):
+        with self._rng_lock:
+            extra = self._rng.uniform(0, self.jitter) if self.jitter else 0.0
+            fail = self._rng.random() < self.error_rate
+        time.sleep(base + extra)
+        return fail
+
+    def _articles(self, symbol: str):
+        now = datetime.now(timezone.utc)
+        with self._rng_lock:
+            rows = []
+            for _ in range(self.articles):
+                rows.append({
+                    "id": next(self._ids),
+                    "title": " ".join(self._rng.choice(WORDS) for _ in range(8)),
+                    "summary": " ".join(self._rng.choice(WORDS) for _ in range(30)),
+                    "published": now - timedelta(minutes=self._rng.randint(0, 24 * 60)),
+                    "sentiment": round(self._rng.uniform(-1, 1), 3),
+                })
+        for row in rows:
+            row["url"] = f"https://fake.example.com/{symbol}/{row['id']}"
+        return rows
+
+    def _handle(self, request: BaseHTTPRequestHandler):
+        self.requests += 1
+        parsed = urlparse(request.path)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        if request.command == "POST":
+            length = int(request.headers.get("Content-Length") or 0)
+            request.rfile.read(length)
+
+        is_llm = parsed.path.startswith("/anthropic")
+        if self._sleep(self.llm_latency if is_llm else self.latency):
+            return self._send(request, 500, {"error": "injected failure"})
+
+        if parsed.path == "/alphavantage/query":
+            symbol = query.get("tickers", "")
+            body = {"feed": [{
+                "title": a["title"], "summary": a["summary"], "url": a["url"], "source": "Fake AV",
+                "time_published": a["published"].strftime("%Y%m%dT%H%M%S"),
+                "ticker_sentiment": [{"ticker": symbol, "ticker_sentiment_score": str(a["sentiment"])}],
+            } for a in self._articles(symbol)]}
+        elif parsed.path == "/finnhub/company-news":
+            body = [{
+                "headline": a["title"], "summary": a["summary"], "url": a["url"], "source": "Fake Finnhub",
+                "datetime": int(a["published"].timestamp()),
+            } for a in self._articles(query.get("symbol", ""))]
+        elif parsed.path == "/marketaux/news/all":
+            symbol = query.get("symbols", "")
+            body = {"data": [{
+                "title": a["title"], "description": a["summary"], "url": a["url"], "source": "Fake Marketaux",
+                "published_at": a["published"].strftime("%Y-%m-%dT%H:%M:%S.000000Z"),
+                "entities": [{"symbol": symbol, "sentiment_score": a["sentiment"]}],
+            } for a in self._articles(symbol)]}
+        elif parsed.path == "/anthropic/v1/messages":
+            body = {
+                "id": f"msg_{next(self._ids)}",
+                "type": "message",
+                "role": "assistant",
+                "model": "fake",
+                "content": [{"type": "text", "text": json.dumps(ANALYSIS)}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": 1200, "output_tokens": 300},
+            }
+        else:
+            return self._send(request, 404, {"error": f"unknown path {parsed.path}"})
+        self._send(request, 200, body)
+
+    def _send(self, request: BaseHTTPRequestHandler, status: int, body):
+        payload = json.dumps(body).encode()
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(payload)))
+        request.end_headers()
+        request.wfile.write(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9900)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    fakes = FakeProviders(args.latency, args.jitter, args.error_rate, args.llm_latency, port=args.port).start()
+    print(f"Fake providers on {fakes.base_url}")
+    print(f"  ALPHAVANTAGE_URL={fakes.base_url}/alphavantage/query")
+    print(f"  FINNHUB_URL={fakes.base_url}/finnhub/company-news")
+    print(f"  MARKETAUX_URL={fakes.base_url}/marketaux/news/all")
+    print(f"  ANTHROPIC_BASE_URL={fakes.base_url}/anthropic")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fakes.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Load test: simulated dashboard users against a locally started app.
+
+    python -m benchmarks.loadtest --users 2000 --duration 120 --workers 4
+    python -m benchmarks.loadtest --url http://localhost:8000 --users 500   # existing server
+
+Seeds a synthetic SQLite database. Starts the fake providers and
+`uvicorn main:app`, configured to use them with the embedded worker and no
+scheduler. Then ramps up virtual users. Each user logs in, then repeatedly
+polls the dashboard, reads ticker news, adds and removes tickers and
+triggers refreshes, with exponential think time between actions.
+
+Prints throughput, p50/p95/p99 latency and error rate per endpoint as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.synthetic import make_session, seed, seed_users
+from benchmarks.fake_providers import FakeProviders
+from app.auth import get_password_hash
+
+PASSWORD = "loadtest"
+
+# action -> relative weight
+ACTIONS = {
+    "dashboard_news": 60,
+    "ticker_news": 15,
+    "add_ticker": 8,
+    "remove_ticker": 8,
+    "refresh": 4,
+    "dashboard": 5,
+}
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.client_errors = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, status: int):
+        self.latencies[endpoint].append(seconds)
+        if status >= 500 or status == 0:
+            self.errors[endpoint] += 1
+        elif status >= 400:
+            self.client_errors[endpoint] += 1
+
+    def report(self, elapsed: float):
+        def pick(samples, p):
+            return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+        result = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            samples = sorted(samples)
+            result[endpoint] = {
+                "requests": len(samples),
+                "rps": round(len(samples) / elapsed, 2),
+                "p50_ms": round(pick(samples, 0.50) * 1000, 1),
+                "p95_ms": round(pick(samples, 0.95) * 1000, 1),
+                "p99_ms": round(pick(samples, 0.99) * 1000, 1),
+                "error_rate": round(self.errors[endpoint] / len(samples), 4),
+                "client_error_rate": round(self.client_errors[endpoint] / len(samples), 4),
+            }
+        total = sum(len(s) for s in self.latencies.values())
+        result["_total"] = {
+            "requests": total,
+            "rps": round(total / elapsed, 2),
+            "error_rate": round(sum(self.errors.values()) / total, 4) if total else 0.0,
+        }
+        return result
+
+
+async def timed(client: httpx.AsyncClient, stats: Stats, endpoint: str, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        status = response.status_code
+    except httpx.HTTPError:
+        response, status = None, 0
+    stats.record(endpoint, time.perf_counter() - start, status)
+    return response
+
+
+async def virtual_user(client: httpx.AsyncClient, stats: Stats, username: str, n_tickers: int,
+                       deadline: float, think: float, rng: random.Random):
+    response = await timed(client, stats, "login", "POST", "/api/auth/login",
+                           data={"username": username, "password": PASSWORD})
+    if response is None or response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await timed(client, stats, "dashboard_tickers", "GET", "/api/dashboard/tickers", headers=headers)
+    symbols = {t["symbol"] for t in response.json()} if response is not None and response.status_code == 200 else set()
+
+    actions, weights = zip(*ACTIONS.items())
+    while time.monotonic() < deadline:
+        await asyncio.sleep(rng.expovariate(1 / think) if think else 0)
+        action = rng.choices(actions, weights)[0]
+
+        if action == "dashboard_news":
+            await timed(client, stats, action, "GET", "/api/news/dashboard-news?hours=24", headers=headers)
+        elif action == "dashboard":
+            await timed(client, stats, action, "GET", "/api/dashboard/", headers=headers)
+        elif action == "ticker_news" and symbols:
+            symbol = rng.choice(sorted(symbols))
+            await timed(client, stats, action, "GET", f"/api/news/ticker/{symbol}/news", headers=headers)
+        elif action == "refresh" and symbols:
+            symbol = rng.choice(sorted(symbols))
+            await timed(client, stats, action, "POST", f"/api/news/ticker/{symbol}/refresh", headers=headers)
+        elif action == "add_ticker":
+            symbol = f"T{rng.randint(1, n_tickers):05d}"
+            if symbol in symbols:
+                continue
+            response = await timed(client, stats, action, "POST", "/api/tickers/add",
+                                   json={"symbol": symbol}, headers=headers)
+            if response is not None and response.status_code == 200:
+                symbols.add(symbol)
+        elif action == "remove_ticker" and len(symbols) > 1:
+            symbol = rng.choice(sorted(symbols))
+            response = await timed(client, stats, action, "DELETE", f"/api/tickers/remove/{symbol}", headers=headers)
+            if response is not None and response.status_code == 200:
+                symbols.discard(symbol)
+
+
+async def run_load(url: str, usernames, n_tickers: int, duration: float, ramp: float,
+                   think: float, max_connections: int, seed_value: int = 1):
+    stats = Stats()
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        start = time.monotonic()
+        deadline = start + ramp + duration
+        tasks = []
+        for i, username in enumerate(usernames):
+            # Spread logins over the ramp-up period
+            await asyncio.sleep(max(0.0, start + ramp * i / len(usernames) - time.monotonic()))
+            rng = random.Random(seed_value + i)
+            tasks.append(asyncio.create_task(
+                virtual_user(client, stats, username, n_tickers, deadline, think, rng)
+            ))
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - start
+    return stats.report(elapsed)
+
+
+def wait_for_server(url: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health/ready", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"App did not become ready at {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=60, help="Seconds after ramp-up")
+    parser.add_argument("--ramp", type=float, default=30, help="Seconds to start all users")
+    parser.add_argument("--think", type=float, default=2.0, help="Mean seconds between a user's actions")
+    parser.add_argument("--max-connections", type=int, default=500)
+    parser.add_argument("--tickers", type=int, default=2000)
+    parser.add_argument("--articles", type=int, default=500_000)
+    parser.add_argument("--tickers-per-user", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--provider-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--url", default=None, help="Use an already running app seeded with user1..userN")
+    args = parser.parse_args()
+
+    if args.url:
+        usernames = [f"user{i}" for i in range(1, args.users + 1)]
+        report = asyncio.run(run_load(args.url, usernames, args.tickers, args.duration, args.ramp,
+                                      args.think, args.max_connections))
+        print(json.dumps(report, indent=2))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="loadtest_")
+    fakes = FakeProviders(latency=args.provider_latency, llm_latency=args.llm_latency).start()
+    server = None
+    try:
+        db_path = os.path.join(workdir, "loadtest.db")
+        db, engine = make_session(db_path)
+        print(f"Seeding {args.articles} articles and {args.users} users...")
+        seed(db, n_tickers=args.tickers, n_articles=args.articles, n_insights=args.articles // 10, days=30)
+        usernames = seed_users(db, args.users, args.tickers_per_user, args.tickers,
+                               password_hash=get_password_hash(PASSWORD))
+        db.close()
+        engine.dispose()
+
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{db_path}",
+            DEBUG="false",
+            SCHEDULER_MODE="off",
+            EMBEDDED_WORKER="true",
+            NEWS_PROVIDERS='["alphavantage", "finnhub", "marketaux"]',
+            ALPHAVANTAGE_URL=f"{fakes.base_url}/alphavantage/query",
+            FINNHUB_URL=f"{fakes.base_url}/finnhub/company-news",
+            MARKETAUX_URL=f"{fakes.base_url}/marketaux/news/all",
+            ANTHROPIC_BASE_URL=f"{fakes.base_url}/anthropic",
+            ANTHROPIC_API_KEY="fake",
+            ALPHAVANTAGE_API_KEY="fake",
+            FINNHUB_API_KEY="fake",
+            MARKETAUX_API_KEY="fake",
+            TRACE_FILE=os.path.join(workdir, "spans.jsonl"),
+            PRICE_CACHE_DIR=os.path.join(workdir, "price_cache"),
+        )
+        url = f"http://127.0.0.1:{args.port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            env=env
+        )
+        wait_for_server(url)
+
+        print(f"Running {args.users} users for {args.ramp + args.duration:.0f}s...")
+        report = asyncio.run(run_load(url, usernames, args.tickers, args.duration, args.ramp,
+                                      args.think, args.max_connections))
+        report["_config"] = {
+            "users": args.users, "workers": args.workers, "articles": args.articles,
+            "think_seconds": args.think, "provider_requests": fakes.requests,
+        }
+        print(json.dumps(report, indent=2))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        fakes.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Latency and memory of the dashboard read endpoints"""
+
+import tracemalloc
+
+import pytest
+
+from app.models import User
+
+ROUTES = {
+    "dashboard_news": "/api/news/dashboard-news?hours=24",
+    "dashboard_news_week": "/api/news/dashboard-news?hours=168",
+    "ticker_news": "/api/news/ticker/{symbol}/news",
+    "ticker_sentiment": "/api/news/ticker/{symbol}/sentiment?bucket=1d",
+    "search": "/api/news/search?q=earnings+guidance",
+    "dashboard": "/api/dashboard/",
+}
+
+
+@pytest.fixture(scope="module")
+def symbol(bench_db, session_factory):
+    _, usernames = bench_db
+    db = session_factory()
+    try:
+        user = db.query(User).filter(User.username == usernames[0]).one()
+        return user.tickers[0].symbol
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("name", list(ROUTES))
+def test_read_latency(benchmark, client, auth_headers, symbol, baselines, name):
+    path = ROUTES[name].format(symbol=symbol)
+    # Warm up: connection pool, route caches
+    client.get(path, headers=auth_headers).raise_for_status()
+
+    response = benchmark(client.get, path, headers=auth_headers)
+
+    assert response.status_code == 200
+    baselines.check(f"latency_seconds:{name}", benchmark.stats.stats.median)
+
+
+def test_dashboard_memory(client, auth_headers, baselines):
+    path = ROUTES["dashboard_news_week"]
+    client.get(path, headers=auth_headers).raise_for_status()
+
+    tracemalloc.start()
+    try:
+        client.get(path, headers=auth_headers).raise_for_status()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    baselines.check("peak_mb:dashboard_news_week", peak / 1e6)
@@ -0,0 +1,45 @@
+"""Refresh pipeline throughput and memory against the fake providers"""
+
+import itertools
+import resource
+import tracemalloc
+
+from app.tasks.news_tasks import refresh_ticker_news
+
+BATCH = 10
+
+
+def test_refresh_throughput(benchmark, session_factory, fake_providers, bench_config, baselines):
+    ticker_ids = itertools.cycle(range(1, bench_config["tickers"] + 1))
+
+    def refresh_batch():
+        db = session_factory()
+        try:
+            for _ in range(BATCH):
+                refresh_ticker_news(db, next(ticker_ids))
+        finally:
+            db.close()
+
+    benchmark.pedantic(refresh_batch, rounds=5, iterations=1, warmup_rounds=1)
+
+    seconds_per_ticker = benchmark.stats.stats.median / BATCH
+    benchmark.extra_info["tickers_per_second"] = round(1 / seconds_per_ticker, 2)
+    benchmark.extra_info["provider_latency"] = fake_providers.latency
+    benchmark.extra_info["llm_latency"] = fake_providers.llm_latency
+    baselines.check("refresh_seconds_per_ticker", seconds_per_ticker)
+
+
+def test_refresh_memory(session_factory, fake_providers, bench_config, baselines):
+    db = session_factory()
+    tracemalloc.start()
+    try:
+        for ticker_id in range(1, min(BATCH, bench_config["tickers"]) + 1):
+            refresh_ticker_news(db, ticker_id)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        db.close()
+
+    baselines.check("peak_mb:refresh_batch", peak / 1e6)
+    # ru_maxrss is in kilobytes on Linux; reported only, it includes the seeding
+    print(f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
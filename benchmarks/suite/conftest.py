@@ -0,0 +1,166 @@
+"""
+Offline benchmark suite.
+
+    pip install -r benchmarks/requirements.txt
+    pytest benchmarks/suite                        # compare with baselines.json
+    pytest benchmarks/suite --update-baselines     # record new baselines
+    BENCH_ARTICLES=5000000 pytest benchmarks/suite
+
+Runs against a synthetic SQLite database (or BENCH_DATABASE_URL, which must
+name a scratch database since every table is dropped) and the local fake
+providers from `benchmarks.fake_providers`, so no network access or API keys
+are needed. A test fails when its measurement is worse than the
+stored baseline by more than --regression-tolerance, or when it has no
+stored baseline and this isn't a --update-baselines (--record-baselines) run.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.synthetic import is_scratch_database, make_session, seed, seed_users
+from benchmarks.fake_providers import FakeProviders
+from app.auth import create_access_token, get_password_hash
+from app.config import settings
+from app.database import get_db
+from app.services.search_service import ensure_search_index
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def pytest_addoption(parser):
+    parser.addoption("--update-baselines", "--record-baselines", action="store_true", dest="update_baselines",
+                     help="Write measurements to baselines.json")
+    parser.addoption("--regression-tolerance", type=float, default=0.25,
+                     help="Allowed slowdown relative to the baseline (0.25 = 25%%)")
+
+
+class Baselines:
+    """Stored reference measurements; lower is better for all of them"""
+
+    def __init__(self, path: str, tolerance: float, update: bool):
+        self.path = path
+        self.tolerance = tolerance
+        self.update = update
+        self.values = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.values = json.load(f)
+        self.measured = {}
+
+    def check(self, name: str, value: float):
+        self.measured[name] = value
+        if self.update:
+            return
+        baseline = self.values.get(name)
+        if baseline is None:
+            # Without this the regression gate would silently never fire
+            pytest.fail(f"No baseline for {name} in {os.path.basename(self.path)}; "
+                        f"record one with --update-baselines")
+        limit = baseline * (1 + self.tolerance)
+        if value > limit:
+            pytest.fail(f"{name} regressed: {value:.4g} vs baseline {baseline:.4g} (limit {limit:.4g})")
+
+    def save(self):
+        self.values.update(self.measured)
+        with open(self.path, "w") as f:
+            json.dump(self.values, f, indent=2, sort_keys=True)
+
+
+@pytest.fixture(scope="session")
+def baselines(request):
+    store = Baselines(
+        BASELINE_FILE,
+        request.config.getoption("--regression-tolerance"),
+        request.config.getoption("update_baselines"),
+    )
+    yield store
+    if store.update:
+        store.save()
+
+
+@pytest.fixture(scope="session")
+def bench_config():
+    return {
+        "tickers": _env_int("BENCH_TICKERS", 2000),
+        "articles": _env_int("BENCH_ARTICLES", 1_000_000),
+        "insights": _env_int("BENCH_INSIGHTS", 100_000),
+        "users": _env_int("BENCH_USERS", 1000),
+        "tickers_per_user": _env_int("BENCH_TICKERS_PER_USER", 20),
+    }
+
+
+@pytest.fixture(scope="session")
+def bench_db(bench_config):
+    """Seeded database shared by the whole session: (engine, usernames)"""
+    database_url = os.environ.get("BENCH_DATABASE_URL")
+    if database_url and not is_scratch_database(database_url):
+        # The suite drops and recreates every table
+        pytest.exit("BENCH_DATABASE_URL must name a scratch database "
+                    "(its name must contain 'bench', 'scratch' or 'test')", returncode=4)
+    workdir = tempfile.mkdtemp(prefix="bench_suite_")
+    settings.TRACE_FILE = os.path.join(workdir, "spans.jsonl")
+    db, engine = make_session(os.path.join(workdir, "bench.db"), database_url, reset=True)
+    try:
+        seed(db, n_tickers=bench_config["tickers"], n_articles=bench_config["articles"],
+             n_insights=bench_config["insights"])
+        usernames = seed_users(db, bench_config["users"], bench_config["tickers_per_user"],
+                               bench_config["tickers"], password_hash=get_password_hash("bench"))
+        db.close()
+        ensure_search_index(engine)
+        yield engine, usernames
+    finally:
+        engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def session_factory(bench_db):
+    engine, _ = bench_db
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="session")
+def fake_providers():
+    fakes = FakeProviders(
+        latency=float(os.environ.get("BENCH_PROVIDER_LATENCY", 0.05)),
+        llm_latency=float(os.environ.get("BENCH_LLM_LATENCY", 0.2)),
+    ).start()
+    fakes.configure()
+    yield fakes
+    fakes.stop()
+
+
+@pytest.fixture(scope="session")
+def client(session_factory):
+    """The real app and middleware stack, without lifespan (no scheduler or quote poller)"""
+    from main import app
+
+    def override_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_db
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture(scope="session")
+def auth_headers(bench_db):
+    _, usernames = bench_db
+    return {"Authorization": f"Bearer {create_access_token({'sub': usernames[0]})}"}
@@ -0,0 +1,137 @@
+"""
+Synthetic dataset helpers shared by the benchmark scripts.
+
+Benchmarks run against a throwaway SQLite database so they need no network
+access, API keys or Postgres instance.
+"""
+
+import os
+import random
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, Ticker, NewsArticle, AIInsight, User, user_tickers
+from app.services.summary_service import backfill_missing_summaries
+
+PROVIDERS = ['yfinance', 'alphavantage', 'finnhub', 'marketaux']
+SENTIMENTS = ['bullish', 'bearish', 'neutral']
+WORDS = (
+    "earnings revenue guidance upgrade downgrade merger acquisition lawsuit "
+    "dividend buyback outlook forecast analyst rating shares rally slump "
+    "record quarter growth margin supply chain regulators approval launch"
+).split()
+
+
+# Database names that mark a server database as disposable
+SCRATCH_NAME_MARKERS = ('bench', 'scratch', 'test')
+
+
+def is_scratch_database(database_url: str) -> bool:
+    """SQLite files, or server databases whose name says they are disposable"""
+    url = make_url(database_url)
+    if url.get_backend_name() == 'sqlite':
+        return True
+    name = (url.database or '').lower()
+    return any(marker in name for marker in SCRATCH_NAME_MARKERS)
+
+
+def make_session(db_path: str = None, database_url: str = None, reset: bool = False):
+    """
+    Create fresh tables and return (session, engine).
+    Defaults to a SQLite file; pass database_url to benchmark Postgres. That
+    drops every table first, so it also needs reset=True and a scratch
+    database (see is_scratch_database).
+    """
+    if database_url:
+        if not reset:
+            raise ValueError("make_session drops every table in database_url; pass reset=True")
+        if not is_scratch_database(database_url):
+            raise ValueError(f"Refusing to drop tables in {make_url(database_url).database!r}: "
+                             f"its name must contain one of {', '.join(SCRATCH_NAME_MARKERS)}")
+        engine = create_engine(database_url)
+        Base.metadata.drop_all(bind=engine)
+    else:
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)(), engine
+
+
+def _text(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def seed(db, n_tickers: int = 2000, n_articles: int = 1_000_000, n_insights: int = 100_000,
+         days: int = 365, seed_value: int = 42, chunk: int = 50_000):
+    """Bulk insert tickers, articles and insights spread over `days` days, plus their summaries"""
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+
+    db.execute(Ticker.__table__.insert(), [
+        {'id': i, 'symbol': f"T{i:05d}", 'name': f"Ticker {i}", 'type': 'stock'}
+        for i in range(1, n_tickers + 1)
+    ])
+
+    for start in range(0, n_articles, chunk):
+        rows = []
+        for i in range(start, min(start + chunk, n_articles)):
+            rows.append({
+                'ticker_id': rng.randint(1, n_tickers),
+                'title': _text(rng, 8),
+                'summary': _text(rng, 30),
+                'url': f"https://news.example.com/{i}",
+                'source': 'Synthetic Wire',
+                'news_provider': rng.choice(PROVIDERS),
+                'published_at': now - timedelta(seconds=rng.randint(0, days * 86400)),
+                'sentiment_score': round(rng.uniform(-1, 1), 3),
+            })
+        db.execute(NewsArticle.__table__.insert(), rows)
+
+    for start in range(0, n_insights, chunk):
+        rows = []
+        for _ in range(start, min(start + chunk, n_insights)):
+            rows.append({
+                'ticker_id': rng.randint(1, n_tickers),
+                'insight_type': 'market_analysis',
+                'content': _text(rng, 40),
+                'sentiment': rng.choice(SENTIMENTS),
+                'confidence_score': round(rng.uniform(0, 1), 3),
+                'sources_analyzed': rng.randint(1, 4),
+                'created_at': now - timedelta(seconds=rng.randint(0, days * 86400)),
+            })
+        db.execute(AIInsight.__table__.insert(), rows)
+
+    db.commit()
+    # As the app does at startup
+    backfill_missing_summaries(db)
+
+
+def seed_users(db, n_users: int, tickers_per_user: int = 20, n_tickers: int = 2000,
+               password_hash: str = "", seed_value: int = 42):
+    """
+    Users named user{i} (password hash shared, hashing thousands is slow),
+    each following a random set of tickers
+    """
+    rng = random.Random(seed_value)
+    start_id = (db.query(User.id).order_by(User.id.desc()).limit(1).scalar() or 0) + 1
+    users, links = [], []
+    for user_id in range(start_id, start_id + n_users):
+        users.append({
+            'id': user_id,
+            'email': f"user{user_id}@example.com",
+            'username': f"user{user_id}",
+            'hashed_password': password_hash,
+            'is_active': True,
+        })
+        for ticker_id in rng.sample(range(1, n_tickers + 1), min(tickers_per_user, n_tickers)):
+            links.append({'user_id': user_id, 'ticker_id': ticker_id})
+    db.execute(User.__table__.insert(), users)
+    db.execute(user_tickers.insert(), links)
+    db.commit()
+    return [u['username'] for u in users]
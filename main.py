@@ -1,33 +1,78 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response
 from contextlib import asynccontextmanager
 
-from app.database import engine
-from app.models import Base
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_active_user
+from app.database import engine, get_db, POOL_CAPACITY
+from app.models import User
 from app.routers import auth, dashboard, tickers
 from app.routers import news  # NEW
+from app.routers import quotes
 from app.config import settings
 from app.tasks.news_tasks import start_news_scheduler  # NEW
+from app.worker import Worker
+from app.services.quote_hub import quote_hub
+from app.services.circuit_breaker import breaker_states, provider_health
+from app.services.coordination import INSTANCE_ID
+from app.metrics import MetricsMiddleware, instrument_engine, instrument_pool, render_metrics
+from app.query_budget import QueryBudgetMiddleware, query_budget
+from app.responses import ORJSONResponse
+from app.compression import CompressionMiddleware
+from app.web import StaticManifest, HashedStaticFiles, ShellPages
+from app.startup import Startup
+
+startup = Startup()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    Base.metadata.create_all(bind=engine)
-    scheduler = start_news_scheduler()
+    # Startup: database setup runs in the background; jobs start once it is ready
+    scheduler = None
+    worker = None
+
+    def start_background_jobs():
+        nonlocal scheduler, worker
+        if settings.EMBEDDED_WORKER:
+            # Otherwise jobs are only enqueued here and `python -m app.worker` runs them
+            scheduler = start_news_scheduler()
+            worker = Worker()
+            worker.start()
+
+    startup.start(on_ready=start_background_jobs)
+    quote_hub.start()
     yield
     # Shutdown
-    scheduler.shutdown()
+    await startup.stop()
+    await quote_hub.stop()
+    if worker:
+        worker.stop()
+    if scheduler:
+        scheduler.shutdown()
 
 app = FastAPI(
     title="Stock & Crypto Dashboard API",
     description="Microservice with AI-powered news analysis",
     version="2.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Innermost, so metrics and budgets see the time spent compressing
+app.add_middleware(CompressionMiddleware)
+
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    instrument_pool(engine, POOL_CAPACITY)
+    app.add_middleware(MetricsMiddleware)
+
+if settings.DEBUG or settings.QUERY_BUDGET_ACTION != "off":
+    instrument_engine(engine)
+    app.add_middleware(QueryBudgetMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
@@ -36,15 +81,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files and setup templates
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Mount static files under content-hashed names and prerender the page shells
+static_manifest = StaticManifest("static")
+app.mount("/static", HashedStaticFiles(directory="static", manifest=static_manifest), name="static")
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["static_url"] = static_manifest.url
+shells = ShellPages(templates, ["login.html", "dashboard.html"])
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
 app.include_router(tickers.router, prefix="/api/tickers", tags=["Tickers"])
 app.include_router(news.router, prefix="/api/news", tags=["News & AI"])  # NEW
+app.include_router(quotes.router, prefix="/api/quotes", tags=["Quotes"])
 
 @app.get("/")
 async def root():
@@ -54,14 +103,15 @@ async def root():
 @app.get("/login")
 async def login_page(request: Request):
     """Serve login page"""
-    return templates.TemplateResponse("login.html", {"request": request})
+    return shells.response("login.html", request)
 
 @app.get("/dashboard")
 async def dashboard_page(request: Request):
     """Serve dashboard page"""
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+    return shells.response("dashboard.html", request)
 
 @app.get("/api")
+@query_budget(0)
 async def api_root():
     """API root endpoint"""
     return {
@@ -74,5 +124,40 @@ async def api_root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/live")
+async def liveness_check():
+    """The process is serving requests; restart it if this stops answering"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+@query_budget(1)
+async def readiness_check(db: Session = Depends(get_db)):
+    """503 until startup has finished and while the database is unreachable"""
+    # Errors are logged, not returned: they can name hosts and credentials
+    if not startup.ready:
+        return ORJSONResponse({"status": "starting"}, status_code=503)
+    try:
+        db.execute(text("SELECT 1"))
+    except Exception as e:
+        print(f"Readiness check failed: {type(e).__name__}: {e}")
+        return ORJSONResponse({"status": "unavailable"}, status_code=503)
+    return {"status": "ready", "startup_seconds": round(startup.seconds, 3)}
 
+@app.get("/health/providers")
+@query_budget(2)
+async def provider_health_check(
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_active_user)
+):
+    """Circuit breaker state per news provider, for this process and recent workers"""
+    return {
+        "instance": INSTANCE_ID,
+        "providers": breaker_states(),
+        "workers": provider_health(db)
+    }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,72 @@
+"""
+Behavior tests.
+
+    pytest tests
+
+They run against a small synthetic SQLite database in a temporary directory,
+with no network access, API keys or benchmark plugins. The environment is
+set before the app is imported, so the app's own engine and SessionLocal
+point at that database.
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+WORKDIR = tempfile.mkdtemp(prefix="tests_")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(WORKDIR, 'app.db')}",
+    "TRACE_FILE": os.path.join(WORKDIR, "spans.jsonl"),
+    "PRICE_CACHE_DIR": os.path.join(WORKDIR, "price_cache"),
+    "ARCHIVE_DIR": os.path.join(WORKDIR, "archive"),
+    "SCHEDULER_MODE": "off",
+    "EMBEDDED_WORKER": "false",
+})
+
+from fastapi.testclient import TestClient
+
+from app.auth import create_access_token, get_password_hash
+from app.database import SessionLocal, engine
+from app.models import Base
+from app.services.search_service import ensure_search_index
+from benchmarks.synthetic import seed, seed_users
+
+N_TICKERS = 50
+
+
+@pytest.fixture(scope="session")
+def seeded_db():
+    """Small seeded database shared by the session: (engine, usernames)"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db, n_tickers=N_TICKERS, n_articles=2000, n_insights=200, days=30)
+        usernames = seed_users(db, 5, tickers_per_user=10, n_tickers=N_TICKERS,
+                               password_hash=get_password_hash("test"))
+    finally:
+        db.close()
+    ensure_search_index(engine)
+    yield engine, usernames
+    engine.dispose()
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def session_factory(seeded_db):
+    return SessionLocal
+
+
+@pytest.fixture(scope="session")
+def client(seeded_db):
+    """The real app and middleware stack, without lifespan (no scheduler or quote poller)"""
+    from main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def auth_headers(seeded_db):
+    _, usernames = seeded_db
+    return {"Authorization": f"Bearer {create_access_token({'sub': usernames[0]})}"}
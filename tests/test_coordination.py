@@ -0,0 +1,56 @@
+"""Scheduler leases: one run per period, and shards split across processes"""
+
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.services.coordination import acquire_lease, heartbeat, shard_assignee
+
+SHARDS = 4
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'leases.db')}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _tick(db, owners):
+    """Every owner's shard jobs fire once; returns the shards each one ran"""
+    ran = {owner: [] for owner in owners}
+    for owner in owners:
+        heartbeat(db, 600, owner=owner)
+    for owner in owners:
+        for shard in range(SHARDS):
+            if shard_assignee(db, shard) == owner and acquire_lease(db, f"news_update_job:{shard}", 270, owner=owner):
+                ran[owner].append(shard)
+    return ran
+
+
+def test_live_lease_is_not_renewed_by_its_owner(db):
+    assert acquire_lease(db, "refresh_priorities", 60, owner="a")
+    assert not acquire_lease(db, "refresh_priorities", 60, owner="a")
+    assert not acquire_lease(db, "refresh_priorities", 60, owner="b")
+
+
+def test_expired_lease_can_be_claimed(db):
+    assert acquire_lease(db, "retention_job", -1, owner="a")
+    assert acquire_lease(db, "retention_job", 60, owner="b")
+
+
+def test_shards_split_between_two_owners(db):
+    assert _tick(db, ["a", "b"]) == {"a": [0, 2], "b": [1, 3]}
+
+
+def test_shards_move_to_the_remaining_owner(db):
+    _tick(db, ["a", "b"])
+    heartbeat(db, -1, owner="b")  # b stopped
+
+    assert [shard_assignee(db, shard) for shard in range(SHARDS)] == ["a"] * SHARDS
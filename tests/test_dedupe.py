@@ -0,0 +1,40 @@
+"""Batch dedupe: exact titles, tracking-URL variants and reworded copies"""
+
+from app.services.dedupe import dedupe_batch
+
+
+def _article(title, url, summary="Shares rose after the company raised its full-year guidance."):
+    return {"title": title, "url": url, "summary": summary}
+
+
+def test_same_title_kept_once():
+    articles = [
+        _article("Apple beats estimates", f"https://site{i}.example.com/a", summary=f"Different body {i}")
+        for i in range(3)
+    ]
+    assert len(dedupe_batch(articles)) == 1
+
+
+def test_same_title_ignores_case():
+    articles = [
+        _article("Apple Beats Estimates", "https://a.example.com/1", summary="One"),
+        _article("apple beats estimates", "https://b.example.com/2", summary="Two"),
+    ]
+    assert len(dedupe_batch(articles)) == 1
+
+
+def test_tracking_url_variant_dropped():
+    articles = [
+        _article("Apple beats estimates", "https://news.example.com/apple"),
+        _article("Apple tops forecasts", "https://www.news.example.com/apple?utm_source=feed", summary="Other"),
+    ]
+    assert len(dedupe_batch(articles)) == 1
+
+
+def test_distinct_articles_kept():
+    articles = [
+        _article("Apple beats estimates", "https://news.example.com/1"),
+        _article("Oil slumps on supply worries", "https://news.example.com/2",
+                 summary="Crude prices fell as inventories rose for a third week."),
+    ]
+    assert len(dedupe_batch(articles)) == 2
@@ -0,0 +1,57 @@
+"""compute_universe agrees with the single-symbol path across exchange calendars"""
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from app.config import settings
+from app.services.indicators import INDICATORS, IndicatorEngine, resolve_params
+from app.services.price_service import PriceCache, PRICE_SCHEMA
+
+DAY = 86400
+START = 1_600_000_000 - 1_600_000_000 % DAY
+
+
+def _bars(ts: np.ndarray, close: np.ndarray) -> pa.Table:
+    return pa.Table.from_pydict({
+        'ts': ts, 'open': close, 'high': close * 1.01, 'low': close * 0.99,
+        'close': close, 'volume': np.full(len(ts), 1e6),
+    }, schema=PRICE_SCHEMA)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    rng = np.random.default_rng(7)
+    daily = START + np.arange(400, dtype=np.int64) * DAY
+    weekdays = daily[((daily // DAY) + 4) % 7 < 5]  # 1970-01-01 was a Thursday
+
+    cache = PriceCache(str(tmp_path))
+    for symbol, ts in [("AAPL", weekdays), ("MSFT", weekdays), ("BTC-USD", daily), ("ETH-USD", daily[:-3])]:
+        close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size=len(ts))))
+        cache.write(symbol, '1d', _bars(ts, close))
+    return IndicatorEngine(cache)
+
+
+@pytest.mark.parametrize("name", list(INDICATORS))
+def test_universe_matches_single_symbol(engine, name):
+    params = resolve_params(name, {})
+    symbols = ["AAPL", "BTC-USD", "MSFT", "ETH-USD"]
+
+    universe = engine.compute_universe(symbols, '1d', name, params)
+
+    assert set(universe) == set(symbols)
+    for symbol in symbols:
+        series = engine.get(symbol, '1d', name, params)
+        for output in INDICATORS[name].outputs:
+            assert universe[symbol][output] is not None
+            assert universe[symbol][output] == pytest.approx(float(series[output][-1]), rel=1e-12)
+
+
+def test_snapshot_requires_login(client):
+    assert client.get("/api/tickers/indicators/sma/latest?symbols=AAPL").status_code == 401
+
+
+def test_snapshot_symbol_cap(client, auth_headers):
+    symbols = ",".join(f"S{i}" for i in range(settings.INDICATOR_SNAPSHOT_MAX_SYMBOLS + 1))
+    response = client.get(f"/api/tickers/indicators/sma/latest?symbols={symbols}", headers=auth_headers)
+    assert response.status_code == 422
@@ -0,0 +1,48 @@
+"""Price and indicator ranges: naive start/end values are UTC, whatever the server's zone"""
+
+import time
+
+import numpy as np
+import pytest
+
+from app.models import Ticker
+from app.services.price_service import get_price_service
+from tests.test_indicators import DAY, START, _bars
+
+
+@pytest.fixture(scope="module")
+def cached_symbol(seeded_db, session_factory):
+    """A seeded ticker with 60 daily bars in the price cache, so nothing reaches Yahoo"""
+    db = session_factory()
+    try:
+        symbol = db.query(Ticker.symbol).order_by(Ticker.id).first().symbol
+    finally:
+        db.close()
+    ts = START + np.arange(60, dtype=np.int64) * DAY
+    get_price_service().cache.write(symbol, '1d', _bars(ts, np.linspace(100.0, 160.0, len(ts))))
+    return symbol
+
+
+@pytest.fixture
+def local_zone_behind_utc(monkeypatch):
+    monkeypatch.setenv("TZ", "EST+5")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.mark.parametrize("path", ["/api/tickers/{symbol}/prices", "/api/tickers/{symbol}/indicators/sma"])
+def test_naive_range_is_utc(client, auth_headers, cached_symbol, local_zone_behind_utc, path):
+    first = START + 10 * DAY
+    last = START + 20 * DAY
+    naive = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(first))
+    naive_end = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(last))
+
+    url = path.format(symbol=cached_symbol)
+    response = client.get(url, params={'start': naive, 'end': naive_end}, headers=auth_headers)
+    aware = client.get(url, params={'start': naive + "Z", 'end': naive_end + "Z"}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()['timestamps'] == aware.json()['timestamps']
+    assert response.json()['timestamps'][0] == first
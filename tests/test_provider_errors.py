@@ -0,0 +1,78 @@
+"""Provider errors are reported without the API keys in their request URLs"""
+
+import requests
+
+from app import tracing
+from app.config import settings
+from app.errors import describe_error
+from app.services import news_service
+from app.services.circuit_breaker import CircuitBreaker
+
+URL = "https://www.alphavantage.co/query?function=NEWS_SENTIMENT&tickers=AAPL&apikey=SECRET123"
+
+
+def _http_error(status: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    response.url = URL
+    try:
+        response.raise_for_status()
+    except requests.HTTPError as e:
+        return e
+
+
+def test_http_error_keeps_class_status_and_path_only():
+    error = _http_error(429)
+    assert "SECRET123" in str(error)
+    assert describe_error(error) == "HTTPError HTTP 429 https://www.alphavantage.co/query"
+
+
+def test_connection_error_drops_message():
+    error = requests.ConnectionError(f"Max retries exceeded with url: {URL}",
+                                     request=requests.Request("GET", URL).prepare())
+    assert describe_error(error) == "ConnectionError https://www.alphavantage.co/query"
+
+
+def test_breaker_stores_sanitized_error():
+    breaker = CircuitBreaker("test", min_calls=1, failure_rate=0.5)
+
+    def fetch():
+        raise _http_error(500)
+
+    try:
+        breaker.call(fetch)
+    except requests.HTTPError:
+        pass
+    assert "SECRET123" not in breaker.snapshot()["last_error"]
+
+
+def test_failed_fetch_span_has_no_key(tmp_path, monkeypatch):
+    trace_file = tmp_path / "spans.jsonl"
+    monkeypatch.setattr(settings, "TRACE_FILE", str(trace_file))
+    monkeypatch.setattr(settings, "NEWS_PROVIDERS", ["alphavantage"])
+    exported = []
+    export = tracing.export
+    monkeypatch.setattr(tracing, "export", lambda spans: (exported.extend(spans), export(spans)))
+
+    def unauthorized(url, params):
+        response = requests.Response()
+        response.status_code = 401
+        response.url = URL
+        return response
+
+    monkeypatch.setattr(news_service, "_http_get", unauthorized)
+    service = news_service.NewsService()
+    service.alphavantage_key = "SECRET123"
+
+    assert service.fetch_alphavantage_news("AAPL") == []
+
+    (fetch,) = [s for s in exported if s.name == "fetch.alphavantage"]
+    assert fetch.status == "error"
+    assert fetch.attributes["error"] == "HTTPError HTTP 401 https://www.alphavantage.co/query"
+    assert "SECRET123" not in trace_file.read_text()
+    otlp_values = [tracing._otlp_value(v) for s in exported for v in s.attributes.values()]
+    assert "SECRET123" not in str(otlp_values)
+
+
+def test_provider_health_requires_login(client):
+    assert client.get("/health/providers").status_code == 401
@@ -0,0 +1,140 @@
+"""Query counts: every API route declares a budget, and stays within it"""
+
+import pytest
+from fastapi.routing import APIRoute
+
+from app.auth import create_access_token
+from app.config import settings
+from app.metrics import instrument_engine
+from app.models import User, Ticker
+from app.query_budget import QueryBudgetMiddleware
+
+# Routes that reach Yahoo or the live quote stream are left out to stay offline,
+# except /create, whose validation is stubbed. A third element is a JSON body.
+REQUESTS = {
+    "me": ("GET", "/api/auth/me"),
+    "dashboard": ("GET", "/api/dashboard/"),
+    "dashboard_tickers": ("GET", "/api/dashboard/tickers"),
+    "dashboard_news": ("GET", "/api/news/dashboard-news?hours=24"),
+    "dashboard_news_week": ("GET", "/api/news/dashboard-news?hours=168"),
+    "search": ("GET", "/api/news/search?q=earnings+guidance"),
+    "ticker_news": ("GET", "/api/news/ticker/{symbol}/news"),
+    "ticker_insights": ("GET", "/api/news/ticker/{symbol}/insights"),
+    "ticker_sentiment": ("GET", "/api/news/ticker/{symbol}/sentiment?bucket=1d"),
+    "ticker_correlation": ("GET", "/api/news/ticker/{symbol}/correlation"),
+    "refresh_timings": ("GET", "/api/news/ticker/{symbol}/refresh-timings"),
+    "refresh": ("POST", "/api/news/ticker/{symbol}/refresh"),
+    "create": ("POST", "/api/tickers/create", {"symbol": "NEWCO", "name": "", "type": "stock"}),
+    "all_tickers": ("GET", "/api/tickers/all"),
+    "ticker_search": ("GET", "/api/tickers/search/{symbol}"),
+    "indicator_snapshot": ("GET", "/api/tickers/indicators/sma/latest?symbols={symbol}"),
+    "provider_health": ("GET", "/health/providers"),
+}
+
+
+@pytest.fixture
+def strict_budgets(seeded_db, monkeypatch):
+    """Over-budget requests raise QueryBudgetExceeded through the TestClient"""
+    from main import app
+
+    if not any(m.cls is QueryBudgetMiddleware for m in app.user_middleware):
+        pytest.skip("QueryBudgetMiddleware is disabled (QUERY_BUDGET_ACTION=off and DEBUG off)")
+    engine, _ = seeded_db
+    instrument_engine(engine)
+    monkeypatch.setattr(settings, "QUERY_BUDGET_ACTION", "fail")
+
+
+@pytest.fixture(scope="module")
+def symbols(seeded_db, session_factory):
+    """(a ticker the user follows, one they do not)"""
+    _, usernames = seeded_db
+    db = session_factory()
+    try:
+        user = db.query(User).filter(User.username == usernames[0]).one()
+        followed = {t.id for t in user.tickers}
+        other = db.query(Ticker).filter(Ticker.id.notin_(followed)).first()
+        return user.tickers[0].symbol, other.symbol
+    finally:
+        db.close()
+
+
+def test_every_api_route_declares_a_budget():
+    from main import app
+
+    missing = [
+        route.path for route in app.routes
+        if isinstance(route, APIRoute) and route.path.startswith("/api")
+        and not hasattr(route.endpoint, "query_budget")
+    ]
+    assert not missing, f"Routes without @query_budget: {missing}"
+
+
+@pytest.fixture
+def offline_validation(monkeypatch):
+    async def validate_ticker(symbol):
+        return {'symbol': symbol, 'name': f"{symbol} Inc.", 'type': 'stock'}
+
+    monkeypatch.setattr("app.routers.tickers.validate_ticker", validate_ticker)
+
+
+@pytest.mark.parametrize("name", list(REQUESTS))
+def test_within_budget(client, auth_headers, symbols, strict_budgets, offline_validation, name):
+    method, path, *body = REQUESTS[name]
+    path = path.format(symbol=symbols[0])
+    response = client.request(method, path, headers=auth_headers, json=body[0] if body else None)
+
+    assert response.status_code < 500
+
+
+def test_login_within_budget(client, seeded_db, strict_budgets):
+    _, usernames = seeded_db
+    response = client.post("/api/auth/login", data={"username": usernames[0], "password": "test"})
+    assert response.status_code == 200
+
+
+def test_add_and_remove_within_budget(client, auth_headers, symbols, strict_budgets):
+    _, other = symbols
+    response = client.post("/api/tickers/add", json={"symbol": other}, headers=auth_headers)
+    assert response.status_code == 200
+    response = client.delete(f"/api/tickers/remove/{other}", headers=auth_headers)
+    assert response.status_code == 200
+
+
+def test_dashboard_news_within_budget_after_bulk_create(client, seeded_db, strict_budgets, monkeypatch):
+    """New tickers come with their summary rows, so the dashboard has nothing to backfill"""
+    _, usernames = seeded_db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': usernames[1]})}"}
+    new_symbols = [f"NEW{i}" for i in range(5)]
+
+    async def validate_tickers(symbols):
+        return {s: {"name": f"New {s}", "type": "stock"} for s in symbols}
+
+    monkeypatch.setattr("app.services.watchlist.validate_tickers", validate_tickers)
+    response = client.post("/api/tickers/bulk", json={"symbols": new_symbols}, headers=headers)
+    assert [r["status"] for r in response.json()] == ["created"] * 5
+
+    response = client.get("/api/news/dashboard-news?hours=24", headers=headers)
+    assert response.status_code == 200
+
+
+
+def test_job_status_only_for_followed_tickers(client, auth_headers, session_factory, symbols, strict_budgets):
+    job_id = client.post(f"/api/news/ticker/{symbols[0]}/refresh", headers=auth_headers).json()["job_id"]
+    assert client.get(f"/api/news/jobs/{job_id}", headers=auth_headers).status_code == 200
+
+    db = session_factory()
+    try:
+        if not db.query(User).filter(User.username == "no_tickers").first():
+            db.add(User(email="no_tickers@example.com", username="no_tickers", hashed_password="", is_active=True))
+            db.commit()
+    finally:
+        db.close()
+    stranger = {"Authorization": f"Bearer {create_access_token({'sub': 'no_tickers'})}"}
+    assert client.get(f"/api/news/jobs/{job_id}", headers=stranger).status_code == 404
+
+
+def test_oversized_import_rejected(client, auth_headers, strict_budgets):
+    content = b"symbol\n" + b"AAPL\n" * (settings.WATCHLIST_MAX_SYMBOLS * 100)
+    response = client.post("/api/tickers/import", files={"file": ("list.csv", content, "text/csv")},
+                           headers=auth_headers)
+    assert response.status_code == 413
@@ -0,0 +1,27 @@
+"""Refresh interval allocation stays within the hourly budget"""
+
+import numpy as np
+import pytest
+
+from app.services.refresh_priority import allocate_intervals
+
+
+def _rate_per_hour(intervals: np.ndarray) -> float:
+    return float((60.0 / intervals).sum())
+
+
+def test_spare_budget_goes_to_higher_scores():
+    intervals = allocate_intervals(np.array([0.0, 1.0, 3.0]), 10.0, 5.0, 1440.0)
+
+    assert _rate_per_hour(intervals) == pytest.approx(10.0)
+    assert intervals[0] == pytest.approx(1440.0)
+    assert intervals[2] < intervals[1] < intervals[0]
+
+
+def test_floors_scaled_down_when_they_exceed_budget():
+    # 2000 tickers at one refresh a day would need ~83 refreshes an hour
+    scores = np.linspace(0.0, 5.0, 2000)
+    intervals = allocate_intervals(scores, 60.0, 5.0, 1440.0)
+
+    assert _rate_per_hour(intervals) == pytest.approx(60.0)
+    assert np.allclose(intervals, 2000.0)  # 60 refreshes an hour shared by 2000 tickers
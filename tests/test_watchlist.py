@@ -0,0 +1,42 @@
+"""add_symbols tolerates a concurrent add of the same symbols while it validates"""
+
+import asyncio
+
+import pytest
+
+from app.models import Ticker, User, user_tickers
+from app.services import watchlist
+
+
+@pytest.fixture
+def user_id(seeded_db, session_factory):
+    _, usernames = seeded_db
+    db = session_factory()
+    try:
+        return db.query(User.id).filter(User.username == usernames[-1]).one().id
+    finally:
+        db.close()
+
+
+def test_concurrent_add_during_validation(session_factory, user_id, monkeypatch):
+    async def validate_tickers(symbols):
+        # Another request creates RACE1 and links it to the user meanwhile
+        other = session_factory()
+        try:
+            ticker = Ticker(symbol="RACE1", name="Race One", type="stock")
+            other.add(ticker)
+            other.flush()
+            other.execute(user_tickers.insert().values(user_id=user_id, ticker_id=ticker.id))
+            other.commit()
+        finally:
+            other.close()
+        return {symbol: {'name': f"{symbol} Inc.", 'type': 'stock'} for symbol in symbols}
+
+    monkeypatch.setattr(watchlist, "validate_tickers", validate_tickers)
+    db = session_factory()
+    try:
+        results = asyncio.run(watchlist.add_symbols(db, user_id, ["RACE1", "RACE2"]))
+        assert [(r['symbol'], r['status']) for r in results] == [("RACE1", "exists"), ("RACE2", "created")]
+        assert watchlist.follows_ticker(db, user_id, results[1]['ticker'].id)
+    finally:
+        db.close()